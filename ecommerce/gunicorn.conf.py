@@ -0,0 +1,21 @@
+# File: gunicorn.conf.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Gunicorn settings for serving the site over ASGI with uvicorn workers, so the async read
+# views can handle many requests per worker process. Run with:
+#     ASYNC_READ_VIEWS=1 gunicorn -c ecommerce/gunicorn.conf.py
+import multiprocessing
+import os
+
+wsgi_app = "ecommerce.asgi:application"
+worker_class = "uvicorn_worker.UvicornWorker"
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8000")
+# Async workers aren't tied up while waiting on the database, so one per core is enough.
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+# Restarts workers now and then to bound memory growth, staggered so they don't all restart at once.
+max_requests = 2000
+max_requests_jitter = 200
+accesslog = "-"
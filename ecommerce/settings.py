@@ -46,6 +46,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the whole request.
+    'finalproject.instrumentation.RequestInstrumentationMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -59,7 +61,8 @@ ROOT_URLCONF = 'ecommerce.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # The standard Django backend, timing renders for the request instrumentation.
+        'BACKEND': 'finalproject.instrumentation.InstrumentedDjangoTemplates',
         'DIRS': [],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -69,6 +72,8 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'finalproject.context_processors.cart_summary',
+                'finalproject.context_processors.categories',
             ],
         },
     },
@@ -92,6 +97,41 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/4.2/topics/cache/
+# The local-memory default is per process; point CACHE_BACKEND/CACHE_LOCATION at a shared cache
+# (e.g. django.core.cache.backends.redis.RedisCache) when running several workers.
+
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", "finalproject"),
+    }
+}
+
+
+# Sessions
+# SESSION_BACKEND selects where sessions are kept:
+# - "cached_db": the database, with reads served from the cache.
+# - "db": the database only.
+# - "cache": the cache only.
+# - "signed_cookies": the browser, in a signed cookie.
+# The cache-backed options need a cache shared by every worker process (e.g. Memcached or Redis), so
+# the default only uses the cache when one is configured.
+SESSION_ENGINES = {
+    "db": "django.contrib.sessions.backends.db",
+    "cached_db": "django.contrib.sessions.backends.cached_db",
+    "cache": "django.contrib.sessions.backends.cache",
+    "signed_cookies": "django.contrib.sessions.backends.signed_cookies",
+}
+SESSION_BACKEND = os.environ.get(
+    "SESSION_BACKEND", "db" if CACHES["default"]["BACKEND"].endswith("LocMemCache") else "cached_db"
+)
+SESSION_ENGINE = SESSION_ENGINES[SESSION_BACKEND]
+# Flash messages travel in a signed cookie, so showing one never writes the session.
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
+
+
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
 
@@ -140,4 +180,77 @@ STATICFILES_DIRS = [
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media/')
-MEDIA_URL = "/media/"
\ No newline at end of file
+MEDIA_URL = "/media/"
+
+
+# Catalog pagination
+# When enabled, item listings page with keyset cursors instead of page numbers. Requests can also opt in
+# individually by passing a 'cursor' query parameter.
+CATALOG_CURSOR_PAGINATION = os.environ.get("CATALOG_CURSOR_PAGINATION", "0") == "1"
+
+
+# Listing counts
+# Item counts shown by paginators are cached for this many seconds (they are also invalidated on item changes).
+ITEM_COUNT_CACHE_TIMEOUT = int(os.environ.get("ITEM_COUNT_CACHE_TIMEOUT", 300))
+# When set, search results stop counting after this many matches and show "about N+ results" instead.
+SEARCH_COUNT_ESTIMATE_LIMIT = int(os.environ.get("SEARCH_COUNT_ESTIMATE_LIMIT", 0)) or None
+
+
+# Search suggestions
+# Number of title completions the navbar search box is offered per keystroke.
+SEARCH_SUGGEST_LIMIT = int(os.environ.get("SEARCH_SUGGEST_LIMIT", 8))
+# Each worker reloads its suggestion index from scratch in the background this often (in seconds); in between
+# it only applies changed and deleted items.
+SEARCH_SUGGEST_REBUILD_INTERVAL = int(os.environ.get("SEARCH_SUGGEST_REBUILD_INTERVAL", 60 * 60))
+
+
+# Item cards
+# Rendered listing cards are cached for this many seconds. Keys include the item's card version, so edits
+# show up immediately and this only bounds how long unused cards occupy the cache.
+ITEM_CARD_CACHE_TIMEOUT = int(os.environ.get("ITEM_CARD_CACHE_TIMEOUT", 60 * 60 * 24))
+
+
+# Anonymous page cache
+# Catalog pages rendered for logged-out visitors are cached for this many seconds. Keys include the item and
+# category generations, so changes show up immediately and this only bounds how long unused pages are kept.
+PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", 600))
+
+
+# Item thumbnails
+# Number of worker processes that render resized item images after an upload.
+THUMBNAIL_WORKERS = int(os.environ.get("THUMBNAIL_WORKERS", 2))
+
+
+# Async read views
+# Serve the item, search and category pages with async views. Only worthwhile when running under ASGI
+# (gunicorn -c ecommerce/gunicorn.conf.py); under WSGI each async view would get its own event loop.
+ASYNC_READ_VIEWS = os.environ.get("ASYNC_READ_VIEWS", "0") == "1"
+
+
+# Request instrumentation
+# Every request's query count, database and template time are logged as JSON on the 'finalproject.requests'
+# logger. A request running more queries than its budget is logged as a warning with the code that ran them.
+QUERY_BUDGET = int(os.environ.get("QUERY_BUDGET", 20))
+# Budgets for individual URL names, overriding QUERY_BUDGET.
+QUERY_BUDGETS = {}
+# Send the timings to the browser in a Server-Timing header (shown in the developer tools' network panel).
+SERVER_TIMING_HEADER = os.environ.get("SERVER_TIMING_HEADER", "1" if DEBUG else "0") == "1"
+# Only over-budget warnings are logged by default; set REQUEST_LOG_LEVEL=INFO to log every request.
+REQUEST_LOG_LEVEL = os.environ.get("REQUEST_LOG_LEVEL", "WARNING")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "finalproject.requests": {"handlers": ["console"], "level": REQUEST_LOG_LEVEL, "propagate": False},
+    },
+}
+
+
+# Cart summary
+# The navbar's cart item count and total are cached per user for this many seconds (they are also dropped
+# whenever the cart changes).
+CART_SUMMARY_CACHE_TIMEOUT = int(os.environ.get("CART_SUMMARY_CACHE_TIMEOUT", 60 * 60))
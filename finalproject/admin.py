@@ -3,11 +3,37 @@
 # Configures the Django admin interface for managing models in finalproject.
 
 from django.contrib import admin
-from .models import UserProfile, Category, Item, Order, OrderItem, Discount
+from .exports import export_response, order_lines
+from .models import UserProfile, Category, Item, Order, OrderItem, Discount, DiscountCounterShard
+
+
+@admin.register(Order)
+class OrderAdmin(admin.ModelAdmin):
+    """
+    Order admin with actions that stream the selected orders' lines out as a download.
+    """
+    actions = ["export_lines_csv", "export_lines_jsonl"]
+
+    @admin.action(description="Export order lines of selected orders (CSV)")
+    def export_lines_csv(self, request, queryset):
+        return export_response(order_lines(orders=queryset, status=None), "csv", "orders")
+
+    @admin.action(description="Export order lines of selected orders (JSONL)")
+    def export_lines_jsonl(self, request, queryset):
+        return export_response(order_lines(orders=queryset, status=None), "jsonl", "orders")
+
+
+@admin.register(Discount)
+class DiscountAdmin(admin.ModelAdmin):
+    """
+    Discount admin; uses are only recorded by redemptions (on used_count or the counter shards), so the
+    stored count is shown but can't be edited.
+    """
+    readonly_fields = ["used_count"]
+
 
 admin.site.register(UserProfile)
 admin.site.register(Category)
 admin.site.register(Item)
-admin.site.register(Order)
 admin.site.register(OrderItem)
-admin.site.register(Discount)
\ No newline at end of file
+admin.site.register(DiscountCounterShard)
@@ -8,3 +8,9 @@ from django.apps import AppConfig
 class FinalprojectConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'finalproject'
+
+    def ready(self):
+        """
+        Connects the signal receivers once the app registry is ready.
+        """
+        from . import signals  # noqa: F401
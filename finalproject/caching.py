@@ -0,0 +1,107 @@
+# File: caching.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Shared cache keys and invalidation helpers for data derived from the item catalog.
+import time
+
+from django.core.cache import cache
+
+# Bumped whenever any Item row changes; cached listing counts and pages are keyed on it.
+ITEM_GENERATION_KEY = "finalproject:item-generation"
+# Bumped whenever any Category row changes; cached pages that show category names are keyed on it.
+CATEGORY_GENERATION_KEY = "finalproject:category-generation"
+
+
+def initial_generation():
+    """
+    Returns a starting generation number that cannot collide with generations used before a cache
+    restart or eviction, so stale entries keyed on an old number are never picked up again.
+    """
+    return int(time.time() * 1000)
+
+
+def changed_at_key(generation_key):
+    """
+    Returns the key recording when the given generation was last bumped (as a Unix timestamp).
+    """
+    return f"{generation_key}:changed-at"
+
+
+def get_generations(*generation_keys, initial_changed_at=None):
+    """
+    Returns {key: (generation, changed_at)} for the given generation keys in one cache round-trip,
+    starting any generation the cache doesn't have. A started generation counts as changed at the time
+    returned by initial_changed_at[key]() if given (e.g. the newest updated_at of the rows it covers),
+    or else now.
+    """
+    initial_changed_at = initial_changed_at or {}
+    keys = [*generation_keys, *map(changed_at_key, generation_keys)]
+    values = cache.get_many(keys)
+    missing = {}
+    for key in generation_keys:
+        if key not in values:
+            missing[key] = initial_generation()
+        if key in missing or changed_at_key(key) not in values:
+            changed_at = initial_changed_at[key]() if key in initial_changed_at else None
+            missing[changed_at_key(key)] = changed_at or time.time()
+    if missing:
+        # add() keeps a value another process stored in the meantime.
+        for key, value in missing.items():
+            cache.add(key, value, timeout=None)
+        values.update(cache.get_many(missing.keys()))
+    return {key: (values[key], values[changed_at_key(key)]) for key in generation_keys}
+
+
+def bump_generation(generation_key):
+    """
+    Invalidates everything keyed on a generation and records when it happened.
+    """
+    try:
+        cache.incr(generation_key)
+    except ValueError:
+        # The key was never set or has been evicted.
+        cache.set(generation_key, initial_generation(), timeout=None)
+    cache.set(changed_at_key(generation_key), time.time(), timeout=None)
+
+
+def get_item_generation():
+    """
+    Returns the current item generation, starting one if the cache has none.
+    """
+    return get_generations(ITEM_GENERATION_KEY)[ITEM_GENERATION_KEY][0]
+
+
+def bump_item_generation():
+    """
+    Invalidates everything keyed on the item generation. Call after any change to Item rows, including
+    bulk writes (bulk_create, queryset.update) that don't send model signals.
+    """
+    bump_generation(ITEM_GENERATION_KEY)
+
+
+def bump_category_generation():
+    """
+    Invalidates everything keyed on the category generation. Call after any change to Category rows.
+    """
+    bump_generation(CATEGORY_GENERATION_KEY)
+
+
+def item_card_key(item):
+    """
+    Returns the cache key of an item's rendered listing card. The card version changes on every save,
+    so a key never refers to an outdated card.
+    """
+    return f"finalproject:item-card:{item.pk}:{item.card_version}"
+
+
+def cart_summary_key(buyer_id):
+    """
+    Returns the cache key of a user's cart summary (item count and total) shown in the navbar.
+    """
+    return f"finalproject:cart-summary:{buyer_id}"
+
+
+def invalidate_cart_summary(buyer_id):
+    """
+    Drops a user's cached cart summary. Call after any change to their cart.
+    """
+    cache.delete(cart_summary_key(buyer_id))
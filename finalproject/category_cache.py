@@ -0,0 +1,48 @@
+# File: category_cache.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: A per-process copy of the category table. Categories rarely change, so each worker keeps them
+# in memory and only reloads them when the category generation in the shared cache has moved on.
+import threading
+
+from .caching import CATEGORY_GENERATION_KEY, get_generations
+from .models import Category
+
+# This process's categories by id (in name order), and the category generation they were loaded at.
+_categories = {}
+_loaded_generation = None
+_lock = threading.Lock()
+
+
+def get_categories():
+    """
+    Returns {id: Category} for every category, ordered by name. Costs one cache lookup to check the
+    generation, plus one query when another process (or this one) has changed a category since the last
+    load. The instances are shared between requests and must not be modified.
+    """
+    global _categories, _loaded_generation
+    generation = get_generations(CATEGORY_GENERATION_KEY)[CATEGORY_GENERATION_KEY][0]
+    if generation != _loaded_generation:
+        with _lock:
+            if generation != _loaded_generation:
+                # The generation was read before the query, so a change committed while loading is picked up
+                # on the next call instead of being masked.
+                _categories = {category.pk: category for category in Category.objects.order_by("name")}
+                _loaded_generation = generation
+    return _categories
+
+
+def get_category(pk):
+    """
+    Returns the category with the given id, or None if there is none.
+    """
+    try:
+        return get_categories().get(int(pk))
+    except (TypeError, ValueError):
+        return None
+
+
+def in_stock_categories():
+    """
+    Returns the categories that have at least one item in stock, ordered by name.
+    """
+    return [category for category in get_categories().values() if category.in_stock_item_count > 0]
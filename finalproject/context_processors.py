@@ -0,0 +1,25 @@
+# File: context_processors.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Template context processors for data shown on every page.
+from django.utils.functional import SimpleLazyObject
+
+from .category_cache import in_stock_categories
+from .models import Order
+
+
+def cart_summary(request):
+    """
+    Adds the logged-in user's cart summary (item count and total) for the navbar. Looked up lazily, so
+    pages that don't show it don't pay for it.
+    """
+    user = getattr(request, "user", None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {"cart_summary": SimpleLazyObject(lambda: Order.cart_summary(user.pk))}
+
+
+def categories(request):
+    """
+    Adds the categories with items in stock for the navbar menu, from the per-process category cache.
+    """
+    return {"nav_categories": SimpleLazyObject(in_stock_categories)}
@@ -0,0 +1,81 @@
+# File: exports.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Streams order lines out as CSV or JSON Lines. Rows are read through a chunked iterator and
+# written out one at a time, so an export of any size runs in constant memory.
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import OrderItem
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+EXPORT_COLUMNS = (
+    "order_id", "order_date", "status", "buyer", "item_id", "item_title", "quantity", "unit_price", "line_total",
+)
+# Rows fetched from the database per round-trip.
+EXPORT_CHUNK_SIZE = 2_000
+
+
+def order_lines(orders=None, seller=None, status="shipped"):
+    """
+    Returns the order lines to export: those of the given orders (every order if None), restricted to one
+    seller's items and one order status when given. Ordered so an export lists each order's lines together.
+    """
+    # Lines carry their own price and title snapshot, so the items themselves aren't read.
+    lines = OrderItem.objects.select_related("order", "order__buyer").order_by("order_id", "id")
+    if orders is not None:
+        lines = lines.filter(order__in=orders)
+    if seller is not None:
+        lines = lines.filter(item__seller=seller)
+    if status:
+        lines = lines.filter(order__status=status)
+    return lines
+
+
+def line_values(line):
+    """
+    Returns the exported column values of one order line.
+    """
+    return (
+        line.order_id, line.order.order_date.isoformat(), line.order.status, line.order.buyer.username,
+        line.item_id, line.title, line.quantity, str(line.unit_price), str(line.total_price()),
+    )
+
+
+class Echo:
+    """
+    A file-like object that hands back what is written to it, letting csv.writer format one row at a time.
+    """
+    def write(self, value):
+        return value
+
+
+def export_rows(lines, export_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields the lines formatted as CSV (with a header row) or JSON Lines, one row per string.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format: {export_format}")
+    if export_format == "csv":
+        writer = csv.writer(Echo())
+        yield writer.writerow(EXPORT_COLUMNS)
+        for line in lines.iterator(chunk_size=chunk_size):
+            yield writer.writerow(line_values(line))
+    else:
+        for line in lines.iterator(chunk_size=chunk_size):
+            yield json.dumps(dict(zip(EXPORT_COLUMNS, line_values(line)))) + "\n"
+
+
+def export_response(lines, export_format, name):
+    """
+    Returns a StreamingHttpResponse downloading the lines as an attachment named after name and today's date.
+    """
+    response = StreamingHttpResponse(export_rows(lines, export_format), content_type=EXPORT_FORMATS[export_format])
+    filename = f"{name}-{timezone.localdate().isoformat()}.{export_format}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,256 @@
+# File: facets.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Faceted filtering for the catalog listings (category, price range, availability and listing
+# age). All facet counts for a listing come from one GROUP BY query over its unfiltered result set, which is
+# cached, so switching facets on and off never runs one COUNT per facet value.
+import hashlib
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import BooleanField, Case, CharField, Count, Q, Value, When
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .caching import get_item_generation
+from .category_cache import get_categories, get_category
+
+# Price ranges offered as facet values: (key, label, lowest price, price it stays below).
+PRICE_BUCKETS = (
+    ("under-25", "Under $25", None, Decimal("25")),
+    ("25-100", "$25 to $100", Decimal("25"), Decimal("100")),
+    ("100-500", "$100 to $500", Decimal("100"), Decimal("500")),
+    ("500-up", "$500 and up", Decimal("500"), None),
+)
+# Listing age facet values: (key, label, days), narrowest first.
+LISTED_WITHIN = (
+    ("1d", "Past day", 1),
+    ("7d", "Past week", 7),
+    ("30d", "Past month", 30),
+)
+# Availability facet values; listings show only in-stock items unless 'all' is chosen.
+AVAILABILITY = (
+    ("in_stock", "In stock"),
+    ("all", "Include sold out"),
+)
+DEFAULT_AVAILABILITY = "in_stock"
+
+# Query parameters that select facet values, in the order the facets are shown.
+FACET_PARAMS = ("category", "price", "listed", "availability")
+
+
+def listing_cutoffs():
+    """
+    Returns {key: earliest listing date} for the listing age facet. 'Now' is rounded down to the hour, so
+    facet counts cached within the hour agree with the rows the filters select.
+    """
+    now = timezone.now().replace(minute=0, second=0, microsecond=0)
+    return {key: now - timedelta(days=days) for key, _, days in LISTED_WITHIN}
+
+
+def price_filter(low, high):
+    """
+    Returns the Q object selecting items priced from low up to (but not including) high.
+    """
+    condition = Q()
+    if low is not None:
+        condition &= Q(price__gte=low)
+    if high is not None:
+        condition &= Q(price__lt=high)
+    return condition
+
+
+def facet_cube(queryset, cutoffs):
+    """
+    Returns a values() queryset counting the rows of queryset for every combination of category, price
+    bucket, availability and listing age bucket. Every facet count can be summed from these rows.
+    """
+    return (
+        queryset.order_by()
+        .annotate(
+            price_bucket=Case(
+                *[When(price_filter(low, high), then=Value(key)) for key, _, low, high in PRICE_BUCKETS],
+                output_field=CharField(),
+            ),
+            in_stock=Case(
+                When(quantity_available__gt=0, then=Value(True)), default=Value(False), output_field=BooleanField(),
+            ),
+            # Each row lands in the narrowest listing age bucket that contains it (None when older than all).
+            listed_bucket=Case(
+                *[When(date_listed__gte=cutoffs[key], then=Value(key)) for key, _, _ in LISTED_WITHIN],
+                output_field=CharField(),
+            ),
+        )
+        .values("category_id", "price_bucket", "in_stock", "listed_bucket")
+        .annotate(count=Count("id"))
+    )
+
+
+class FacetedCatalogMixin:
+    """
+    Adds facet filters and facet counts to a catalog listing. Views implement get_facet_queryset() to return
+    their result set before any facet is applied, and pass querysets through filter_facets().
+    """
+    # Facet groups an async view has already computed.
+    current_facets = None
+
+    def get_facet_queryset(self):
+        """
+        Returns the items the listing shows before facet filters are applied.
+        """
+        raise NotImplementedError("Faceted views must define get_facet_queryset().")
+
+    @cached_property
+    def facet_selection(self):
+        """
+        Returns {facet: selected value} for the facets chosen in the query string. Unknown values are ignored.
+        """
+        params = self.request.GET
+        category = get_category(params.get("category"))
+        price = params.get("price")
+        listed = params.get("listed")
+        availability = params.get("availability")
+        return {
+            "category": category.pk if category else None,
+            "price": price if price in {key for key, *_ in PRICE_BUCKETS} else None,
+            "listed": listed if listed in {key for key, *_ in LISTED_WITHIN} else None,
+            "availability": availability if availability in dict(AVAILABILITY) else DEFAULT_AVAILABILITY,
+        }
+
+    @cached_property
+    def facet_cutoffs(self):
+        """
+        Returns the listing age cutoffs shared by the filters and the counts of this request.
+        """
+        return listing_cutoffs()
+
+    def facet_filters(self):
+        """
+        Returns {facet: Q object} for the selected facets.
+        """
+        selection = self.facet_selection
+        filters = {}
+        if selection["category"] is not None:
+            filters["category"] = Q(category_id=selection["category"])
+        if selection["price"] is not None:
+            _, _, low, high = next(bucket for bucket in PRICE_BUCKETS if bucket[0] == selection["price"])
+            filters["price"] = price_filter(low, high)
+        if selection["listed"] is not None:
+            filters["listed"] = Q(date_listed__gte=self.facet_cutoffs[selection["listed"]])
+        if selection["availability"] == "in_stock":
+            # Kept as its own filter so the listings still match the partial in-stock indexes.
+            filters["availability"] = Q(quantity_available__gt=0)
+        return filters
+
+    def filter_facets(self, queryset):
+        """
+        Narrows an Item queryset down to the selected facets.
+        """
+        for condition in self.facet_filters().values():
+            queryset = queryset.filter(condition)
+        return queryset
+
+    def facet_cache_key(self, cube):
+        """
+        Builds a cache key from the item generation and the SQL of the facet count query.
+        """
+        sql, params = cube.query.sql_with_params()
+        digest = hashlib.md5(f"{sql}|{params!r}".encode()).hexdigest()
+        return f"finalproject:facets:{get_item_generation()}:{digest}"
+
+    def get_facet_rows(self):
+        """
+        Returns the (cached) facet count rows for the listing's unfiltered result set. The rows don't depend
+        on the selected facets, so every combination of facets is counted from the same cache entry.
+        """
+        cube = facet_cube(self.get_facet_queryset(), self.facet_cutoffs)
+        key = self.facet_cache_key(cube)
+        rows = cache.get(key)
+        if rows is None:
+            rows = list(cube)
+            cache.set(key, rows, settings.ITEM_COUNT_CACHE_TIMEOUT)
+        return rows
+
+    def row_matches(self, row, facet, value):
+        """
+        Checks whether a facet count row falls under the given value of a facet.
+        """
+        if facet == "category":
+            return row["category_id"] == value
+        if facet == "price":
+            return row["price_bucket"] == value
+        if facet == "listed":
+            # A row in a narrower age bucket is also within every wider one.
+            widths = [key for key, _, _ in LISTED_WITHIN]
+            return row["listed_bucket"] is not None and widths.index(row["listed_bucket"]) <= widths.index(value)
+        return value == "all" or row["in_stock"]
+
+    def facet_option(self, facet, value, label, count):
+        """
+        Returns a facet value for the template, with the query string that selects it (or clears it when it
+        is already selected).
+        """
+        selected = self.facet_selection[facet] == value
+        params = self.request.GET.copy()
+        for param in ("page", getattr(self, "cursor_param", "cursor")):
+            params.pop(param, None)
+        params.pop(facet, None)
+        if not selected or facet == "availability":
+            params[facet] = value
+        return {"label": label, "count": count, "selected": selected, "querystring": params.urlencode()}
+
+    def get_facets(self):
+        """
+        Returns the facet groups shown beside the listing. Each value's count is the number of results the
+        listing would have with that value chosen and the other facets left as they are.
+        """
+        rows = self.get_facet_rows()
+        selection = self.facet_selection
+        groups = []
+        for facet in FACET_PARAMS:
+            # Rows matching every selected facet except this one.
+            others = [
+                row for row in rows
+                if all(
+                    self.row_matches(row, other, value)
+                    for other, value in selection.items() if other != facet and value is not None
+                )
+            ]
+
+            def count(value):
+                return sum(row["count"] for row in others if self.row_matches(row, facet, value))
+
+            if facet == "category":
+                present = {row["category_id"] for row in others}
+                values = [(pk, category.name) for pk, category in get_categories().items() if pk in present]
+                label = "Category"
+            elif facet == "price":
+                values = [(key, bucket_label) for key, bucket_label, _, _ in PRICE_BUCKETS]
+                label = "Price"
+            elif facet == "listed":
+                values = [(key, age_label) for key, age_label, _ in LISTED_WITHIN]
+                label = "Listed"
+            else:
+                values = list(AVAILABILITY)
+                label = "Availability"
+            options = [self.facet_option(facet, value, value_label, count(value)) for value, value_label in values]
+            groups.append({"name": facet, "label": label, "options": [
+                option for option in options if option["count"] or option["selected"]
+            ]})
+        return groups
+
+    def load_facets(self):
+        """
+        Resolves the facet selection and computes the facet groups up front. Async views run this in a worker
+        thread before building their queryset, since both read the category cache and the counts may query.
+        """
+        self.current_facets = self.get_facets()
+
+    def get_context_data(self, **kwargs):
+        """
+        Adds the facet groups, using the ones an async view has already computed.
+        """
+        context = super().get_context_data(**kwargs)
+        context["facets"] = self.current_facets if self.current_facets is not None else self.get_facets()
+        return context
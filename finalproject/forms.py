@@ -3,7 +3,10 @@
 # Defines Django forms for user registration, item management, cart operations, and user profile updates.
 from django import forms
 from django.contrib.auth.models import User
+from django.db import transaction
+from .category_cache import get_categories
 from .models import Item, UserProfile, OrderItem
+from .thumbnails import schedule_thumbnails
 
 class UserRegistrationForm(forms.ModelForm):
     """
@@ -54,6 +57,29 @@ class ItemForm(forms.ModelForm):
         fields = ['title', 'description', 'price', 'image', 'category', 'quantity_available']
         # All necessary fields for creating or updating an item are included.
 
+    def __init__(self, *args, **kwargs):
+        """
+        Builds the category choices from the process-local category cache instead of querying them.
+        """
+        super().__init__(*args, **kwargs)
+        category_field = self.fields["category"]
+        category_field.choices = [("", category_field.empty_label)] + [
+            (category.pk, str(category)) for category in get_categories().values()
+        ]
+
+    def save(self, commit=True):
+        """
+        Saves the item and, when a new image was uploaded, queues its resized variants once the save commits.
+        """
+        image_changed = "image" in self.changed_data
+        if image_changed:
+            # The old variants no longer match; listings fall back to the original until the new ones exist.
+            self.instance.thumbnails_ready = False
+        item = super().save(commit)
+        if commit and image_changed and item.image:
+            transaction.on_commit(lambda: schedule_thumbnails(item))
+        return item
+
 class UserProfileForm(forms.ModelForm):
     """
     A form for updating the user's profile information.
@@ -0,0 +1,302 @@
+# File: instrumentation.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Per-request instrumentation: counts SQL queries, database and template time and repeated
+# queries, reports them in a Server-Timing header and a structured log line, and logs where the queries of a
+# request that went over its query budget came from.
+import json
+import logging
+import time
+import traceback
+from collections import Counter
+from contextvars import ContextVar
+from functools import partial
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger("finalproject.requests")
+
+# The metrics of the request being handled. A context variable, so queries run by async views through
+# sync_to_async() on another thread are still counted against their request.
+current_metrics = ContextVar("finalproject_request_metrics", default=None)
+
+# How many over-budget query stacks are logged per request.
+MAX_LOGGED_STACKS = 5
+# Repeated query patterns included in the log line.
+MAX_LOGGED_DUPLICATES = 3
+# Statements that are expected to repeat and aren't counted as duplicate queries.
+TRANSACTION_STATEMENTS = ("BEGIN", "SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK", "COMMIT")
+
+
+class RequestMetrics:
+    """
+    What one request spent on SQL queries and template rendering.
+    """
+    def __init__(self, query_budget):
+        self.started = time.perf_counter()
+        self.query_budget = query_budget
+        self.query_count = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        # Nesting depth of template renders in progress; only the outermost is timed.
+        self.template_depth = 0
+        self.query_patterns = Counter()
+        self.over_budget_stacks = []
+
+    def add_query(self, sql, duration):
+        """
+        Records a query. Queries past the budget also record the project code that ran them.
+        """
+        self.query_count += 1
+        self.db_time += duration
+        # The SQL has placeholders in place of parameters, so an N+1 loop repeats the same pattern.
+        if not sql.startswith(TRANSACTION_STATEMENTS):
+            self.query_patterns[sql] += 1
+        if self.query_budget is not None and self.query_count > self.query_budget:
+            if len(self.over_budget_stacks) < MAX_LOGGED_STACKS:
+                self.over_budget_stacks.append((sql, project_stack()))
+
+    def duplicate_patterns(self):
+        """
+        Returns [(sql, times run)] for the queries run more than once, most repeated first.
+        """
+        return [(sql, count) for sql, count in self.query_patterns.most_common() if count > 1]
+
+    def as_log_fields(self, request, response):
+        """
+        Returns the fields of the structured log line for the request.
+        """
+        duplicates = self.duplicate_patterns()
+        return {
+            "url_name": url_name(request),
+            "method": request.method,
+            "status": response.status_code,
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "db_ms": round(self.db_time * 1000, 1),
+            "template_ms": round(self.template_time * 1000, 1),
+            "queries": self.query_count,
+            "duplicate_queries": sum(count - 1 for _, count in duplicates),
+            "duplicate_patterns": [
+                {"sql": sql[:200], "count": count} for sql, count in duplicates[:MAX_LOGGED_DUPLICATES]
+            ],
+        }
+
+    def server_timing(self):
+        """
+        Returns the Server-Timing header value (see https://www.w3.org/TR/server-timing/).
+        """
+        return ", ".join([
+            f'db;desc="{self.query_count} queries";dur={self.db_time * 1000:.1f}',
+            f"tpl;dur={self.template_time * 1000:.1f}",
+            f"total;dur={(time.perf_counter() - self.started) * 1000:.1f}",
+        ])
+
+
+def url_name(request):
+    """
+    Returns the URL name the request resolved to, or the path when it didn't resolve to a named URL.
+    """
+    match = getattr(request, "resolver_match", None)
+    return match.url_name if match and match.url_name else request.path
+
+
+def project_stack():
+    """
+    Returns the current call stack, formatted and limited to this project's own code.
+    """
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame for frame in traceback.extract_stack()[:-3]
+        if frame.filename.startswith(base_dir) and "site-packages" not in frame.filename
+    ]
+    return "".join(traceback.format_list(frames))
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper that adds each query to the current request's metrics.
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(connection):
+    """
+    Adds the query recorder to a database connection, once.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    """
+    Instruments every database connection as it is opened, on any thread.
+    """
+    install_query_recorder(connection)
+
+
+class TimedTemplate:
+    """
+    Wraps a template of the Django backend to add its render time to the current request's metrics.
+    """
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return self.template.render(context, request)
+        started = time.perf_counter()
+        metrics.template_depth += 1
+        try:
+            return self.template.render(context, request)
+        finally:
+            metrics.template_depth -= 1
+            # Templates rendered from inside another (e.g. cached item cards) are part of the outer time.
+            if metrics.template_depth == 0:
+                metrics.template_time += time.perf_counter() - started
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    """
+    The Django template backend, timing every template it renders (see TimedTemplate). Database queries
+    run while rendering count towards both template and database time.
+    """
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Measures every request's SQL queries and template rendering. The totals are sent in a Server-Timing
+    header (when SERVER_TIMING_HEADER is set) and logged as a JSON line on the 'finalproject.requests'
+    logger, tagged with the URL name. A request that runs more queries than its budget (QUERY_BUDGET, or
+    QUERY_BUDGETS[url name]) is logged as a warning along with the code that ran the extra queries.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Connections opened before this middleware was loaded didn't go through connection_opened().
+        for connection in connections.all(initialized_only=True):
+            install_query_recorder(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = RequestMetrics(settings.QUERY_BUDGET)
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics(settings.QUERY_BUDGET)
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.finish(request, response, metrics)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        """
+        Switches to the budget of the URL the request resolved to, before the view runs its queries.
+        """
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.query_budget = settings.QUERY_BUDGETS.get(url_name(request), settings.QUERY_BUDGET)
+
+    def finish(self, request, response, metrics):
+        """
+        Adds the Server-Timing header and logs the request's metrics. A streamed body (e.g. an export) runs
+        its queries while it is sent, after the view has returned; those are counted as the body is consumed
+        and the request is logged once it is finished. Its Server-Timing header, sent first, covers the view only.
+        """
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = metrics.server_timing()
+        if response.streaming:
+            finish = partial(self.log, request, response, metrics)
+            if response.is_async:
+                response.streaming_content = ameasure_stream(response.streaming_content, metrics, finish)
+            else:
+                response.streaming_content = measure_stream(response.streaming_content, metrics, finish)
+        else:
+            self.log(request, response, metrics)
+        return response
+
+    def log(self, request, response, metrics):
+        """
+        Logs the request's metrics, with a warning when it went over its query budget.
+        """
+        fields = metrics.as_log_fields(request, response)
+        logger.info(json.dumps(fields), extra={"request_metrics": fields})
+
+        if metrics.query_budget is not None and metrics.query_count > metrics.query_budget:
+            stacks = "\n".join(f"{sql[:200]}\n{stack}" for sql, stack in metrics.over_budget_stacks)
+            logger.warning(
+                "%s ran %d queries (budget %d). Queries past the budget were run from:\n%s",
+                fields["url_name"], metrics.query_count, metrics.query_budget, stacks,
+                extra={"request_metrics": fields},
+            )
+
+
+def measure_stream(content, metrics, finish):
+    """
+    Yields a streamed body's chunks with the request's metrics current while each is produced, then calls
+    finish() once the body is exhausted or the server stops reading it.
+    """
+    iterator = iter(content)
+    try:
+        while True:
+            token = current_metrics.set(metrics)
+            try:
+                chunk = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                current_metrics.reset(token)
+            yield chunk
+    finally:
+        finish()
+
+
+async def ameasure_stream(content, metrics, finish):
+    """
+    Async version of measure_stream() for async streamed bodies.
+    """
+    iterator = content.__aiter__()
+    try:
+        while True:
+            token = current_metrics.set(metrics)
+            try:
+                chunk = await iterator.__anext__()
+            except StopAsyncIteration:
+                return
+            finally:
+                current_metrics.reset(token)
+            yield chunk
+    finally:
+        finish()
@@ -0,0 +1,184 @@
+# File: bench_async_views.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Compares throughput of the sync and async catalog views for one worker process when every
+# database query has added latency, as with a remote database.
+import asyncio
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from asgiref.sync import ThreadSensitiveContext
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client, override_settings
+from django.urls import URLPattern, include, path
+
+from finalproject import urls, views
+from finalproject.models import Category, Item
+
+# The catalog views that have async versions, by their sync class.
+ASYNC_VERSIONS = {
+    views.ItemListView: views.AsyncItemListView,
+    views.ItemDetailView: views.AsyncItemDetailView,
+    views.SearchView: views.AsyncSearchView,
+    views.CategoryListView: views.AsyncCategoryListView,
+    views.CategoryDetailView: views.AsyncCategoryDetailView,
+}
+BENCH_USERNAME = "bench-async-seller"
+
+
+class CatalogURLConf:
+    """
+    A URLconf serving the marketplace pages with either the sync or the async catalog views.
+    """
+    def __init__(self, async_views):
+        patterns = []
+        for pattern in urls.urlpatterns:
+            view_class = getattr(pattern.callback, "view_class", None)
+            if isinstance(pattern, URLPattern) and view_class in ASYNC_VERSIONS:
+                view_class = ASYNC_VERSIONS[view_class] if async_views else view_class
+                pattern = path(str(pattern.pattern), view_class.as_view(), name=pattern.name)
+            patterns.append(pattern)
+        self.urlpatterns = [path("", include(patterns))]
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures requests per second for the sync views (one request at a time, like a sync gunicorn worker) "
+        "and the async views (concurrent requests on one event loop) with simulated database latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200, help="Requests per run.")
+        parser.add_argument("--concurrency", type=int, default=50, help="Concurrent requests for the async run.")
+        parser.add_argument("--latency-ms", type=float, default=20.0, help="Delay added to every database query.")
+        parser.add_argument("--items", type=int, default=500, help="Number of items to seed.")
+        parser.add_argument("--seed", type=int, default=412, help="Random seed for the synthetic catalog.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        # The views run on other threads with their own connections, so the seeded rows must be committed;
+        # they are deleted again at the end.
+        category_ids, item_ids = self.seed(options["items"], rng)
+        paths = self.request_paths(options["requests"], category_ids, item_ids, rng)
+        latency = options["latency_ms"] / 1000
+        try:
+            self.add_latency(latency)
+            # Renders every page instead of serving logged-out visitors from the page cache.
+            with override_settings(PAGE_CACHE_TIMEOUT=0):
+                with override_settings(ROOT_URLCONF=CatalogURLConf(async_views=False)):
+                    sync_times, sync_elapsed = self.run_sync(paths)
+                with override_settings(ROOT_URLCONF=CatalogURLConf(async_views=True)):
+                    async_times, async_elapsed = asyncio.run(self.run_async(paths, options["concurrency"]))
+        finally:
+            connection_created.disconnect(dispatch_uid="bench_async_views")
+            User.objects.filter(username=BENCH_USERNAME).delete()
+            Category.objects.filter(pk__in=category_ids).delete()
+
+        self.stdout.write(f"{len(paths)} requests, {options['latency_ms']:.0f} ms added per query")
+        self.stdout.write(f"{'views':<8}{'concurrency':>12}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}")
+        self.report("sync", 1, sync_times, sync_elapsed)
+        self.report("async", options["concurrency"], async_times, async_elapsed)
+        self.stdout.write(f"Async views served {sync_elapsed / async_elapsed:.1f}x the requests per second.")
+
+    def seed(self, count, rng):
+        """
+        Creates a small committed catalog and returns the ids of its categories and items.
+        """
+        seller = User.objects.create(username=BENCH_USERNAME)
+        categories = [Category.objects.create(name=f"Bench category {n}", description="") for n in range(5)]
+        Item.objects.bulk_create([
+            Item(
+                title=f"Bench guitar {n}", description="A well kept instrument.", seller=seller,
+                price=Decimal(rng.randint(100, 100_000)) / 100, category=rng.choice(categories),
+                quantity_available=1, image=f"items/bench-{n}.jpg",
+            )
+            for n in range(count)
+        ])
+        item_ids = list(Item.objects.filter(seller=seller).values_list("pk", flat=True))
+        # The bulk insert skipped the per-save counter updates.
+        for category in categories:
+            category.in_stock_item_count = Item.objects.filter(category=category).count()
+            category.save()
+        return [category.pk for category in categories], item_ids
+
+    def request_paths(self, count, category_ids, item_ids, rng):
+        """
+        Returns a mix of catalog page paths to request.
+        """
+        choices = [
+            lambda: f"/items/?page={rng.randint(1, 5)}",
+            lambda: f"/items/{rng.choice(item_ids)}/",
+            lambda: "/search/?q=guitar",
+            lambda: "/categories/",
+            lambda: f"/categories/{rng.choice(category_ids)}/",
+        ]
+        return [rng.choice(choices)() for _ in range(count)]
+
+    def add_latency(self, latency):
+        """
+        Delays every query on every database connection, including those opened later on other threads.
+        """
+        def delay(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def install(sender, connection, **kwargs):
+            connection.execute_wrappers.append(delay)
+
+        connection_created.connect(install, dispatch_uid="bench_async_views", weak=False)
+        for connection in connections.all():
+            connection.execute_wrappers.append(delay)
+
+    def run_sync(self, paths):
+        """
+        Requests the paths one after another through the WSGI handler. Returns (latencies, elapsed).
+        """
+        client = Client()
+        times = []
+        started = time.perf_counter()
+        for request_path in paths:
+            request_started = time.perf_counter()
+            self.check_response(client.get(request_path), request_path)
+            times.append(time.perf_counter() - request_started)
+        return times, time.perf_counter() - started
+
+    async def run_async(self, paths, concurrency):
+        """
+        Requests the paths through the ASGI handler, up to concurrency at a time. Returns (latencies, elapsed).
+        """
+        client = AsyncClient()
+        slots = asyncio.Semaphore(concurrency)
+        times = []
+
+        async def fetch(request_path):
+            # ASGIHandler gives each request its own thread for sync work; the test client doesn't, so
+            # this does the same here.
+            async with slots, ThreadSensitiveContext():
+                request_started = time.perf_counter()
+                self.check_response(await client.get(request_path), request_path)
+                times.append(time.perf_counter() - request_started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(fetch(request_path) for request_path in paths))
+        return times, time.perf_counter() - started
+
+    def check_response(self, response, request_path):
+        """
+        Reports responses that aren't a rendered page.
+        """
+        if response.status_code != 200:
+            self.stderr.write(f"{request_path}: HTTP {response.status_code}")
+
+    def report(self, label, concurrency, times, elapsed):
+        """
+        Prints throughput and latency percentiles for one run.
+        """
+        times_ms = sorted(t * 1000 for t in times)
+        p95 = times_ms[int(len(times_ms) * 0.95) - 1]
+        self.stdout.write(
+            f"{label:<8}{concurrency:>12}{len(times) / elapsed:>10.1f}{statistics.median(times_ms):>10.1f}{p95:>10.1f}"
+        )
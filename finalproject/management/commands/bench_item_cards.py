@@ -0,0 +1,90 @@
+# File: bench_item_cards.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Benchmarks listing page render time with the item card cache cold and warm on a seeded catalog.
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.cache import cache, caches
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+
+from finalproject.caching import item_card_key
+from finalproject.models import Category, Item
+from finalproject.views import ItemListView
+
+# Long enough that truncatewords has real work to do, as with real listings.
+DESCRIPTION = (
+    "Well loved and carefully stored, this piece comes from a smoke free home and ships within two days. "
+    "Minor signs of wear are shown in the photos; please ask if you would like more pictures or measurements. "
+) * 3
+
+
+class Command(BaseCommand):
+    help = "Times item listing pages rendered with a cold and a warm item card cache (seeded data is rolled back)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=2_000, help="Number of items to seed.")
+        parser.add_argument("--pages", type=int, default=20, help="Listing pages rendered per measurement.")
+        parser.add_argument("--repeat", type=int, default=5, help="Measurements per cache state.")
+        parser.add_argument("--seed", type=int, default=412, help="Random seed for the synthetic catalog.")
+
+    def handle(self, *args, **options):
+        # Everything happens inside one transaction that is rolled back, so the seeded rows never persist.
+        with transaction.atomic():
+            self.seed(options["items"], options["seed"])
+            view = ItemListView.as_view()
+            requests = [self.listing_request(page) for page in range(1, options["pages"] + 1)]
+            keys = [item_card_key(item) for item in Item.objects.filter(quantity_available__gt=0)]
+
+            cold, warm = [], []
+            for _ in range(options["repeat"]):
+                # Drops only this catalog's cards, leaving the rest of the cache alone.
+                cache.delete_many(keys)
+                cold.append(self.time_pages(view, requests))
+                warm.append(self.time_pages(view, requests))
+            transaction.set_rollback(True)
+            cache.delete_many(keys)
+
+        cold_ms = statistics.median(cold) / len(requests)
+        warm_ms = statistics.median(warm) / len(requests)
+        self.stdout.write(f"Cache backend: {caches['default'].__class__.__name__}")
+        self.stdout.write(f"{'cache':<8}{'ms/page':>10}")
+        self.stdout.write(f"{'cold':<8}{cold_ms:>10.2f}")
+        self.stdout.write(f"{'warm':<8}{warm_ms:>10.2f}")
+        self.stdout.write(f"Warm pages render {cold_ms / warm_ms:.1f}x faster.")
+
+    def seed(self, count, seed):
+        """
+        Bulk-creates a synthetic catalog of the requested size.
+        """
+        rng = random.Random(seed)
+        seller = User.objects.create(username=f"bench-seller-{seed}")
+        category = Category.objects.create(name="Bench category", description="")
+        Item.objects.bulk_create([
+            Item(
+                title=f"Bench item {n}", description=DESCRIPTION, price=Decimal(rng.randint(100, 100_000)) / 100,
+                seller=seller, category=category, quantity_available=1, image=f"items/bench-{n}.jpg",
+            )
+            for n in range(count)
+        ])
+
+    def listing_request(self, page):
+        """
+        Builds an anonymous GET request for a page of the item listing.
+        """
+        request = RequestFactory().get("/items/", {"page": page})
+        request.user = AnonymousUser()
+        return request
+
+    def time_pages(self, view, requests):
+        """
+        Returns the time in milliseconds to render every requested listing page.
+        """
+        started = time.perf_counter()
+        for request in requests:
+            view(request).render()
+        return (time.perf_counter() - started) * 1000
@@ -0,0 +1,98 @@
+# File: bench_search.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Benchmarks the full-text search index against the old icontains scan on a seeded catalog.
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from finalproject.models import Category, Item
+from finalproject.search import icontains_search, search_backend, search_items
+
+# Recognisable words used to build synthetic titles and descriptions, padded out with generated
+# filler words so that a real query term matches a realistic fraction of the catalog.
+WORDS = [
+    "vintage", "guitar", "leather", "jacket", "vinyl", "record", "camera", "lens", "wooden", "table",
+    "ceramic", "vase", "silver", "necklace", "poster", "signed", "acoustic", "amplifier", "denim", "boots",
+    "antique", "clock", "wool", "scarf", "canvas", "print", "brass", "lamp", "oak", "chair",
+    "cotton", "shirt", "glass", "bottle", "rare", "edition", "handmade", "quilt", "retro", "console",
+]
+SYLLABLES = ["ka", "lo", "mi", "ner", "po", "sta", "ru", "vel", "dor", "qui", "zan", "tef", "bri", "ol", "un"]
+FILLER_WORDS = 5_000
+DEFAULT_QUERIES = ["guitar", "vint", "leather jacket", "signed vinyl record", "nonexistentterm"]
+
+
+class Command(BaseCommand):
+    help = "Compares search index and icontains query times on a seeded catalog (rolled back afterwards)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=100_000, help="Number of items to seed.")
+        parser.add_argument("--repeat", type=int, default=5, help="Timed runs per query and backend.")
+        parser.add_argument("--seed", type=int, default=412, help="Random seed for the synthetic catalog.")
+        parser.add_argument("--batch-size", type=int, default=5_000)
+        parser.add_argument("queries", nargs="*", help="Queries to time (defaults to a built-in set).")
+
+    def handle(self, *args, **options):
+        queries = options["queries"] or DEFAULT_QUERIES
+        # Everything happens inside one transaction that is rolled back, so the seeded rows never persist.
+        with transaction.atomic():
+            self.seed(options["items"], options["seed"], options["batch_size"])
+            self.stdout.write(f"Search backend: {search_backend()}")
+            self.stdout.write(f"{'query':<24}{'icontains ms':>14}{'index ms':>12}{'speedup':>10}{'hits':>10}")
+            for query in queries:
+                base = Item.objects.filter(quantity_available__gt=0)
+                scan_ms, scan_hits = self.time_query(icontains_search(base, query), options["repeat"])
+                index_ms, index_hits = self.time_query(search_items(base, query), options["repeat"])
+                speedup = scan_ms / index_ms if index_ms else float("inf")
+                self.stdout.write(
+                    f"{query:<24}{scan_ms:>14.2f}{index_ms:>12.2f}{speedup:>9.1f}x{index_hits:>10}"
+                )
+                if scan_hits != index_hits:
+                    # Stemming and prefix matching can legitimately find a different set than substring search.
+                    self.stdout.write(f"  note: icontains matched {scan_hits} rows")
+            transaction.set_rollback(True)
+
+    def seed(self, count, seed, batch_size):
+        """
+        Bulk-creates a synthetic catalog of the requested size.
+        """
+        rng = random.Random(seed)
+        vocabulary = WORDS + [
+            "".join(rng.choices(SYLLABLES, k=rng.randint(2, 4))) for _ in range(FILLER_WORDS)
+        ]
+        seller = User.objects.create(username=f"bench-seller-{seed}")
+        categories = Category.objects.bulk_create(
+            [Category(name=f"Bench category {i}", description="") for i in range(20)]
+        )
+        started = time.perf_counter()
+        for offset in range(0, count, batch_size):
+            Item.objects.bulk_create([
+                Item(
+                    title=" ".join(rng.choices(vocabulary, k=4)).title(),
+                    description=" ".join(rng.choices(vocabulary, k=30)),
+                    price=Decimal(rng.randint(100, 100_000)) / 100,
+                    seller=seller,
+                    category=rng.choice(categories),
+                    quantity_available=rng.choice([0, 1, 1, 2, 5]),
+                )
+                for _ in range(min(batch_size, count - offset))
+            ])
+        self.stdout.write(f"Seeded {count} items in {time.perf_counter() - started:.1f}s")
+
+    def time_query(self, queryset, repeat):
+        """
+        Returns the median time in milliseconds to render the first results page (count plus 12 rows)
+        and the number of matching rows.
+        """
+        timings = []
+        hits = 0
+        for _ in range(repeat):
+            started = time.perf_counter()
+            hits = queryset.count()
+            list(queryset[:12])
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings), hits
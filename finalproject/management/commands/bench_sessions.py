@@ -0,0 +1,88 @@
+# File: bench_sessions.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Counts the session table reads and writes made by the cart flow for each session backend and
+# message storage, to show what the configured combination saves.
+import re
+import time
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from finalproject.models import Category, Item
+
+MESSAGE_STORAGES = {
+    "session": "django.contrib.messages.storage.session.SessionStorage",
+    "fallback": "django.contrib.messages.storage.fallback.FallbackStorage",
+    "cookie": "django.contrib.messages.storage.cookie.CookieStorage",
+}
+CART_LINE = re.compile(rb'name="quantity_(\d+)"')
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the cart flow (item page, add to cart, cart, update cart, cart) as a logged-in user with every "
+        "session backend and message storage, and reports session table queries per request."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=20, help="Times the cart flow is repeated per run.")
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'sessions':<16}{'messages':<10}{'reads/req':>10}{'writes/req':>11}{'ms/req':>8}"
+        )
+        with transaction.atomic():
+            item = self.seed()
+            for engine_name, engine in settings.SESSION_ENGINES.items():
+                for storage_name, storage in MESSAGE_STORAGES.items():
+                    with override_settings(SESSION_ENGINE=engine, MESSAGE_STORAGE=storage):
+                        reads, writes, requests, elapsed = self.run_flow(item, options["iterations"])
+                    configured = engine == settings.SESSION_ENGINE and storage == settings.MESSAGE_STORAGE
+                    self.stdout.write(
+                        f"{engine_name:<16}{storage_name:<10}{reads / requests:>10.2f}{writes / requests:>11.2f}"
+                        f"{elapsed / requests * 1000:>8.1f}{'  (configured)' if configured else ''}"
+                    )
+            transaction.set_rollback(True)
+
+    def seed(self):
+        """
+        Creates a buyer and an item with plenty of stock; rolled back at the end.
+        """
+        seller = User.objects.create(username="bench-sessions-seller")
+        User.objects.create(username="bench-sessions-buyer")
+        category = Category.objects.create(name="Bench sessions", description="")
+        return Item.objects.create(
+            title="Bench guitar", description="", price=Decimal("10.00"), seller=seller, category=category,
+            quantity_available=1_000_000, image="items/bench.jpg",
+        )
+
+    def run_flow(self, item, iterations):
+        """
+        Logs in and repeats the cart flow. Returns (session reads, session writes, requests, elapsed seconds).
+        """
+        client = Client()
+        client.force_login(User.objects.get(username="bench-sessions-buyer"))
+        counts = {"reads": 0, "writes": 0}
+
+        def count_session_queries(execute, sql, params, many, context):
+            if "django_session" in sql:
+                counts["reads" if sql.startswith("SELECT") else "writes"] += 1
+            return execute(sql, params, many, context)
+
+        requests = 0
+        started = time.perf_counter()
+        with connection.execute_wrapper(count_session_queries):
+            for _ in range(iterations):
+                client.get(reverse("item_detail", args=[item.pk]))
+                client.post(reverse("add_to_cart", args=[item.pk]), {"quantity": 1})
+                cart = client.get(reverse("view_cart"))
+                line_id = CART_LINE.search(cart.content).group(1).decode()
+                client.post(reverse("update_cart"), {f"quantity_{line_id}": 1})
+                client.get(reverse("view_cart"))
+                requests += 5
+        return counts["reads"], counts["writes"], requests, time.perf_counter() - started
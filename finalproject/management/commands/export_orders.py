@@ -0,0 +1,51 @@
+# File: export_orders.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Writes order lines out as CSV or JSON Lines, streaming them so exports of any size run in
+# constant memory.
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from finalproject.exports import EXPORT_CHUNK_SIZE, EXPORT_FORMATS, export_rows, order_lines
+
+
+class Command(BaseCommand):
+    help = "Exports order lines (by default every shipped order's) as CSV or JSON Lines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="csv", help="Output format.")
+        parser.add_argument("--output", default="-", help="File to write to, or '-' for stdout.")
+        parser.add_argument("--seller", help="Only export lines for this seller's items.")
+        parser.add_argument(
+            "--status", default="shipped", help="Only export orders with this status ('all' for every order)."
+        )
+        parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE, help="Rows fetched per query.")
+
+    def handle(self, *args, **options):
+        seller = None
+        if options["seller"]:
+            try:
+                seller = User.objects.get(username=options["seller"])
+            except User.DoesNotExist:
+                raise CommandError(f'No user named "{options["seller"]}".')
+        status = None if options["status"] == "all" else options["status"]
+        rows = export_rows(order_lines(seller=seller, status=status), options["format"], options["chunk_size"])
+
+        if options["output"] == "-":
+            self.write_rows(rows, self.stdout)
+        else:
+            with open(options["output"], "w", encoding="utf-8", newline="") as output:
+                count = self.write_rows(rows, output)
+            if options["format"] == "csv":
+                count -= 1  # The header row.
+            self.stderr.write(f"Wrote {count} order lines to {options['output']}.")
+
+    def write_rows(self, rows, output):
+        """
+        Writes the formatted rows to output and returns how many were written.
+        """
+        count = 0
+        for row in rows:
+            # OutputWrapper adds a newline unless the string already ends with one, which every row does.
+            output.write(row)
+            count += 1
+        return count
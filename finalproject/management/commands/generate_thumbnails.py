@@ -0,0 +1,77 @@
+# File: generate_thumbnails.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Backfills the resized WebP/JPEG variants of existing item images using a pool of worker processes.
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from finalproject.models import Item
+from finalproject.thumbnails import mark_thumbnails_ready, render_variants, save_variants
+
+
+class Command(BaseCommand):
+    help = "Generates resized image variants for items that don't have them yet (or for all items with --all)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Regenerate variants for every item with an image.")
+        parser.add_argument("--workers", type=int, default=None, help="Worker processes (defaults to one per CPU).")
+        parser.add_argument(
+            "--batch-size", type=int, default=100, help="Items rendered and marked as ready at a time."
+        )
+
+    def handle(self, *args, **options):
+        items = Item.objects.exclude(image="").exclude(image__isnull=True)
+        if not options["all"]:
+            items = items.filter(thumbnails_ready=False)
+        pending = list(items.values_list("pk", "image"))
+        self.stdout.write(f"Generating variants for {len(pending)} items.")
+
+        started = time.perf_counter()
+        done = failed = 0
+        with ProcessPoolExecutor(max_workers=options["workers"]) as executor:
+            # Works through the items a batch at a time so only one batch of originals is held in memory.
+            # Originals are read here and handed to the workers, so only this process touches the storage.
+            for offset in range(0, len(pending), options["batch_size"]):
+                batch = pending[offset:offset + options["batch_size"]]
+                futures = {
+                    executor.submit(render_variants, image_name, self.read_image(image_name)): (pk, image_name)
+                    for pk, image_name in batch
+                    if self.image_exists(image_name)
+                }
+                failed += len(batch) - len(futures)
+                ready = []
+                for future in as_completed(futures):
+                    try:
+                        save_variants(future.result())
+                    except Exception as e:
+                        failed += 1
+                        self.stderr.write(f"Item {futures[future][0]}: {e}")
+                        continue
+                    ready.append(futures[future])
+                if ready:
+                    mark_thumbnails_ready(ready)
+                done += len(ready)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Generated variants for {done} items in {elapsed:.1f}s ({done / elapsed if elapsed else 0:.1f} items/s); "
+            f"{failed} failed."
+        ))
+
+    def image_exists(self, image_name):
+        """
+        Checks that an item's original image is present, reporting it when it isn't.
+        """
+        if default_storage.exists(image_name):
+            return True
+        self.stderr.write(f"Missing original image: {image_name}")
+        return False
+
+    def read_image(self, image_name):
+        """
+        Returns the bytes of an original item image.
+        """
+        with default_storage.open(image_name, "rb") as image_file:
+            return image_file.read()
@@ -0,0 +1,222 @@
+# File: import_items.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Bulk-imports a seller's catalog from a CSV or JSONL file, streaming it a chunk at a time so
+# memory use doesn't grow with the size of the file.
+import csv
+import http.client
+import json
+import os
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from finalproject.caching import bump_item_generation
+from finalproject.models import Category, Item
+
+# Columns (CSV) or keys (JSONL) read from each row; title, price, category and image are required.
+FIELDS = ("title", "description", "price", "category", "quantity_available", "image")
+IMAGE_FETCH_TIMEOUT = 30
+# Prices must be below this to fit Item.price (max_digits=10, decimal_places=2).
+PRICE_LIMIT = Decimal(10) ** (Item._meta.get_field("price").max_digits - Item._meta.get_field("price").decimal_places)
+
+
+class RowError(ValueError):
+    """
+    A row that can't be imported; the message says why.
+    """
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports items for one seller from a CSV or JSONL file (or '-' for stdin). Each row has title, "
+        "description, price, category, quantity_available and image (a URL, or a path relative to --image-root)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file, or '-' to read from stdin.")
+        parser.add_argument("--seller", required=True, help="Username of the seller the items are listed by.")
+        parser.add_argument(
+            "--format", choices=["csv", "jsonl"], help="Input format (defaults to the file extension)."
+        )
+        parser.add_argument("--image-root", help="Directory local image paths are relative to (defaults to the input's).")
+        parser.add_argument("--chunk-size", type=int, default=1_000, help="Rows inserted per transaction.")
+        parser.add_argument("--workers", type=int, default=8, help="Threads fetching or copying images.")
+
+    def handle(self, *args, **options):
+        try:
+            seller = User.objects.get(username=options["seller"])
+        except User.DoesNotExist:
+            raise CommandError(f'No user named "{options["seller"]}".')
+        input_format = options["format"] or ("jsonl" if options["path"].endswith((".jsonl", ".ndjson")) else "csv")
+        if options["path"] == "-":
+            image_root = options["image_root"] or os.getcwd()
+        else:
+            image_root = options["image_root"] or os.path.dirname(os.path.abspath(options["path"]))
+
+        # Every category name is held in memory (a small table); missing ones are created as they appear.
+        self.categories = dict(Category.objects.values_list("name", "pk"))
+        self.image_root = os.path.realpath(image_root)
+        imported = skipped = 0
+        started = time.perf_counter()
+
+        with self.open_input(options["path"]) as input_file, ThreadPoolExecutor(options["workers"]) as pool:
+            rows = self.read_rows(input_file, input_format)
+            while chunk := list(islice(rows, options["chunk_size"])):
+                created, errors = self.import_chunk(chunk, seller, pool)
+                imported += created
+                skipped += len(errors)
+                for line, error in errors:
+                    self.stderr.write(f"Row {line}: {error}")
+                elapsed = time.perf_counter() - started
+                self.stdout.write(f"{imported} items imported ({imported / elapsed:.0f} rows/s), {skipped} skipped")
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {imported} items in {elapsed:.1f}s ({imported / elapsed if elapsed else 0:.0f} rows/s); "
+            f"{skipped} rows skipped."
+        ))
+        if imported:
+            self.stdout.write("Run generate_thumbnails to create resized variants of the imported images.")
+
+    def open_input(self, path):
+        """
+        Opens the input file, or wraps stdin so it can be used the same way.
+        """
+        if path == "-":
+            return open(sys.stdin.fileno(), encoding="utf-8", newline="", closefd=False)
+        try:
+            return open(path, encoding="utf-8", newline="")
+        except OSError as e:
+            raise CommandError(f"Can't read {path}: {e}")
+
+    def read_rows(self, input_file, input_format):
+        """
+        Yields (line number, row dict) for every row of the input, reading it lazily.
+        """
+        if input_format == "csv":
+            reader = csv.DictReader(input_file)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(input_file, start=1):
+                if line.strip():
+                    try:
+                        yield line_number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield line_number, RowError(f"invalid JSON ({e.msg})")
+
+    def import_chunk(self, chunk, seller, pool):
+        """
+        Validates a chunk of rows, stores their images in parallel and inserts the valid rows in one transaction.
+        Returns (number of items created, [(line number, error)]).
+        """
+        errors = []
+        parsed = []
+        for line, row in chunk:
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                parsed.append((line, self.parse_row(row)))
+            except RowError as e:
+                errors.append((line, str(e)))
+
+        # Images are fetched or copied by the worker threads while the rest of the chunk waits.
+        images = pool.map(lambda entry: self.store_image(entry[1]["image"]), parsed)
+        items = []
+        for (line, fields), image in zip(parsed, images):
+            if isinstance(image, RowError):
+                errors.append((line, str(image)))
+                continue
+            items.append(Item(
+                title=fields["title"], description=fields["description"], price=fields["price"], seller=seller,
+                category_id=self.category_id(fields["category"]), quantity_available=fields["quantity_available"],
+                image=image,
+            ))
+
+        try:
+            with transaction.atomic():
+                Item.objects.bulk_create(items)
+                # bulk_create() skips Item.save(), so the in-stock counters are updated here instead.
+                in_stock = {}
+                for item in items:
+                    if item.quantity_available > 0:
+                        in_stock[item.category_id] = in_stock.get(item.category_id, 0) + 1
+                Category.adjust_in_stock_counts(in_stock)
+                transaction.on_commit(bump_item_generation)
+        except Exception:
+            # None of the chunk's items exist, so the images stored for them would be left orphaned.
+            for item in items:
+                default_storage.delete(item.image.name)
+            raise
+        return len(items), errors
+
+    def parse_row(self, row):
+        """
+        Returns the cleaned field values of one row, raising RowError if any are missing or invalid.
+        """
+        if not isinstance(row, dict):
+            raise RowError("expected an object")
+        values = {field: row.get(field) for field in FIELDS}
+        for field in ("title", "price", "category", "image"):
+            if values[field] in (None, ""):
+                raise RowError(f"missing {field}")
+        try:
+            price = Decimal(str(values["price"]))
+            if not price.is_finite():
+                raise InvalidOperation
+            price = price.quantize(Decimal("0.01"))
+        except InvalidOperation:
+            raise RowError(f"invalid price {values['price']!r}")
+        if abs(price) >= PRICE_LIMIT:
+            raise RowError(f"price {values['price']!r} is too large")
+        try:
+            quantity = int(values["quantity_available"] if values["quantity_available"] not in (None, "") else 1)
+        except (TypeError, ValueError):
+            raise RowError(f"invalid quantity_available {values['quantity_available']!r}")
+        if price < 0 or quantity < 0:
+            raise RowError("price and quantity_available can't be negative")
+        return {
+            "title": str(values["title"]).strip(),
+            "description": str(values["description"] or "").strip(),
+            "price": price,
+            "category": str(values["category"]).strip(),
+            "quantity_available": quantity,
+            "image": str(values["image"]).strip(),
+        }
+
+    def category_id(self, name):
+        """
+        Returns the id of the category with the given name, creating the category if it doesn't exist.
+        """
+        if name not in self.categories:
+            self.categories[name] = Category.objects.create(name=name, description="").pk
+        return self.categories[name]
+
+    def store_image(self, source):
+        """
+        Downloads (http/https URLs) or copies (local paths) an image into item storage and returns its
+        storage name, or a RowError if it can't be read. Runs on a worker thread.
+        """
+        name = "items/" + os.path.basename(source.split("?", 1)[0])
+        try:
+            if source.startswith(("http://", "https://")):
+                with urllib.request.urlopen(source, timeout=IMAGE_FETCH_TIMEOUT) as response:
+                    return default_storage.save(name, File(response))
+            # Local paths must stay under the image root, so the input can't publish any other readable file.
+            path = os.path.realpath(os.path.join(self.image_root, source))
+            if os.path.commonpath([self.image_root, path]) != self.image_root:
+                return RowError(f"image {source} is outside the image root")
+            with open(path, "rb") as image_file:
+                return default_storage.save(name, File(image_file))
+        except (OSError, ValueError, http.client.HTTPException) as e:
+            # ValueError covers paths with a NUL byte; HTTPException covers malformed URLs (InvalidURL).
+            return RowError(f"can't read image {source} ({e})")
@@ -0,0 +1,251 @@
+# File: loadtest.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Load generator that drives shopper journeys (browse, add to cart, update the cart, check out)
+# against a running server and reports throughput, latency percentiles and error rates per page.
+import json
+import math
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+LOADTEST_USERNAME = "loadtest-shopper-{}"
+LOADTEST_PASSWORD = "loadtest-password"
+CATEGORY_LINK = re.compile(r'href="/categories/(\d+)/"')
+ITEM_LINK = re.compile(r'href="/items/(\d+)/"')
+CART_LINE = re.compile(r'name="quantity_(\d+)"')
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values, p):
+    """
+    Returns the nearest-rank p-th percentile of an already sorted list.
+    """
+    return sorted_values[max(math.ceil(len(sorted_values) * p / 100) - 1, 0)]
+
+
+class Journey:
+    """
+    One virtual shopper: logs in once, then repeatedly browses to an item, buys it and checks out.
+    Each request is recorded under the URL name of the page it hits.
+    """
+    def __init__(self, base_url, username, rng, record, think_time):
+        self.base_url = base_url.rstrip("/")
+        self.username = username
+        self.rng = rng
+        self.record = record
+        self.think_time = think_time
+        self.session = requests.Session()
+
+    def request(self, url_name, method, path, expected, **kwargs):
+        """
+        Sends one request without following redirects and records its latency and outcome. Returns the
+        response, or None if it failed (an exception or a status outside expected).
+        """
+        if method == "POST":
+            kwargs.setdefault("headers", {})["X-CSRFToken"] = self.session.cookies.get("csrftoken", "")
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, allow_redirects=False, timeout=30, **kwargs)
+            error = None if response.status_code in expected else f"HTTP {response.status_code}"
+        except requests.RequestException as e:
+            response, error = None, type(e).__name__
+        self.record(url_name, time.perf_counter() - started, error)
+        if self.think_time:
+            time.sleep(self.rng.uniform(0, self.think_time))
+        return None if error else response
+
+    def login(self):
+        """
+        Fetches the login page for a CSRF cookie and logs in. Returns whether it worked.
+        """
+        login_path = reverse("login")
+        self.request("login", "GET", login_path, {200})
+        response = self.request(
+            "login", "POST", login_path, {302},
+            data={"username": self.username, "password": LOADTEST_PASSWORD},
+        )
+        return response is not None
+
+    def run(self):
+        """
+        Walks list -> category -> detail -> add_to_cart -> update_cart -> checkout, stopping early when a
+        step fails or leaves nothing to click on.
+        """
+        if not self.request("item_list", "GET", reverse("item_list"), {200}):
+            return
+        categories = self.request("category_list", "GET", reverse("category_list"), {200})
+        category_ids = CATEGORY_LINK.findall(categories.text) if categories else []
+        if not category_ids:
+            return
+        category = self.request(
+            "category_detail", "GET", reverse("category_detail", args=[self.rng.choice(category_ids)]), {200}
+        )
+        item_ids = ITEM_LINK.findall(category.text) if category else []
+        if not item_ids:
+            return
+        item_id = self.rng.choice(item_ids)
+        if not self.request("item_detail", "GET", reverse("item_detail", args=[item_id]), {200}):
+            return
+
+        # A rejected add (out of stock) redirects back to the item instead of the cart.
+        added = self.request("add_to_cart", "POST", reverse("add_to_cart", args=[item_id]), {302},
+                             data={"quantity": 1})
+        if not added or not added.headers.get("Location", "").endswith(reverse("view_cart")):
+            return
+        cart = self.request("view_cart", "GET", reverse("view_cart"), {200})
+        line_ids = CART_LINE.findall(cart.text) if cart else []
+        if not line_ids:
+            return
+        if not self.request("update_cart", "POST", reverse("update_cart"), {302},
+                            data={f"quantity_{line_id}": 1 for line_id in line_ids}):
+            return
+        self.request("checkout", "GET", reverse("checkout"), {200})
+        checkout = self.request("checkout", "POST", reverse("checkout"), {302})
+        if checkout is not None and not checkout.headers.get("Location", "").endswith(reverse("profile")):
+            # Sent back to the cart: another shopper bought the last of an item first.
+            self.record("checkout", 0, "stock conflict", timed=False)
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs concurrent shopper journeys against a running server (runserver or gunicorn on this database) "
+        "and reports per-page throughput, p50/p95/p99 latency and error rates. Journeys create orders and "
+        "use up stock, so run it against a disposable database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000", help="Server to load.")
+        parser.add_argument("--users", type=int, default=10, help="Concurrent virtual shoppers.")
+        parser.add_argument("--journeys", type=int, default=5, help="Journeys each shopper completes.")
+        parser.add_argument("--think-time", type=float, default=0.0, help="Max seconds to pause between requests.")
+        parser.add_argument("--seed", type=int, default=412, help="Random seed for the shoppers' choices.")
+        parser.add_argument("--output", help="Write the results as JSON to this file.")
+        parser.add_argument("--compare", help="JSON results of an earlier run to report changes against.")
+
+    def handle(self, *args, **options):
+        usernames = self.create_shoppers(options["users"])
+        samples = {}
+        lock = threading.Lock()
+
+        def record(url_name, seconds, error, timed=True):
+            with lock:
+                sample = samples.setdefault(url_name, {"times": [], "errors": {}, "count": 0})
+                if timed:
+                    sample["count"] += 1
+                    sample["times"].append(seconds)
+                if error:
+                    sample["errors"][error] = sample["errors"].get(error, 0) + 1
+
+        def shop(index):
+            journey = Journey(
+                options["base_url"], usernames[index], random.Random(options["seed"] + index), record,
+                options["think_time"],
+            )
+            if journey.login():
+                for _ in range(options["journeys"]):
+                    journey.run()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(options["users"]) as pool:
+            list(pool.map(shop, range(options["users"])))
+        elapsed = time.perf_counter() - started
+
+        results = self.summarize(samples, elapsed, options)
+        self.report(results)
+        if options["compare"]:
+            self.compare(results, options["compare"])
+        if options["output"]:
+            with open(options["output"], "w") as output:
+                json.dump(results, output, indent=2, sort_keys=True)
+                output.write("\n")
+
+    def create_shoppers(self, count):
+        """
+        Creates (or reuses) the load test accounts and returns their usernames.
+        """
+        usernames = [LOADTEST_USERNAME.format(n) for n in range(count)]
+        existing = set(User.objects.filter(username__in=usernames).values_list("username", flat=True))
+        for username in usernames:
+            if username not in existing:
+                User.objects.create_user(username, password=LOADTEST_PASSWORD)
+        return usernames
+
+    def summarize(self, samples, elapsed, options):
+        """
+        Builds the machine-readable results: per URL name throughput, latency percentiles and error rate.
+        """
+        pages = {}
+        for url_name, sample in sorted(samples.items()):
+            times_ms = sorted(seconds * 1000 for seconds in sample["times"])
+            errors = sum(sample["errors"].values())
+            page = {
+                "requests": sample["count"],
+                "errors": errors,
+                "error_kinds": sample["errors"],
+                "error_rate": round(errors / sample["count"], 4) if sample["count"] else 0,
+                "throughput_rps": round(sample["count"] / elapsed, 2),
+            }
+            for p in PERCENTILES:
+                page[f"p{p}_ms"] = round(percentile(times_ms, p), 2) if times_ms else None
+            pages[url_name] = page
+        total_requests = sum(page["requests"] for page in pages.values())
+        total_errors = sum(page["errors"] for page in pages.values())
+        return {
+            "config": {key: options[key] for key in ("base_url", "users", "journeys", "think_time", "seed")},
+            "elapsed_s": round(elapsed, 2),
+            "total": {
+                "requests": total_requests,
+                "errors": total_errors,
+                "error_rate": round(total_errors / total_requests, 4) if total_requests else 0,
+                "throughput_rps": round(total_requests / elapsed, 2),
+            },
+            "pages": pages,
+        }
+
+    def report(self, results):
+        """
+        Prints the results as a table.
+        """
+        self.stdout.write(
+            f"{'url name':<18}{'requests':>9}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+        )
+        for url_name, page in results["pages"].items():
+            percentiles = "".join(
+                f"{page[f'p{p}_ms']:>9.1f}" if page[f"p{p}_ms"] is not None else f"{'-':>9}" for p in PERCENTILES
+            )
+            self.stdout.write(
+                f"{url_name:<18}{page['requests']:>9}{page['throughput_rps']:>9.1f}{percentiles}"
+                f"{page['error_rate']:>8.1%}"
+            )
+        total = results["total"]
+        self.stdout.write(
+            f"{total['requests']} requests in {results['elapsed_s']}s ({total['throughput_rps']} req/s), "
+            f"{total['error_rate']:.1%} errors"
+        )
+
+    def compare(self, results, baseline_path):
+        """
+        Prints how each page's p95 latency and error rate changed against an earlier run.
+        """
+        try:
+            with open(baseline_path) as baseline_file:
+                baseline = json.load(baseline_file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Can't read {baseline_path}: {e}")
+        self.stdout.write(f"Compared with {baseline_path}:")
+        for url_name, page in results["pages"].items():
+            before = baseline.get("pages", {}).get(url_name)
+            if not before or before["p95_ms"] is None or page["p95_ms"] is None:
+                continue
+            change = (page["p95_ms"] - before["p95_ms"]) / before["p95_ms"] if before["p95_ms"] else 0
+            self.stdout.write(
+                f"{url_name:<18}p95 {before['p95_ms']:.1f} -> {page['p95_ms']:.1f} ms ({change:+.0%}), "
+                f"errors {before['error_rate']:.1%} -> {page['error_rate']:.1%}"
+            )
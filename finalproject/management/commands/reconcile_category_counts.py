@@ -0,0 +1,42 @@
+# File: reconcile_category_counts.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Recounts the in-stock items of every category and repairs any drift in the maintained counters.
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+
+from finalproject.caching import bump_category_generation
+from finalproject.models import Category
+
+
+class Command(BaseCommand):
+    help = "Recomputes Category.in_stock_item_count from the items and fixes categories whose counter drifted."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true", help="Report drifted categories without changing them."
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            # Locks the categories first so counter updates made while recounting aren't overwritten.
+            # (Postgres doesn't allow FOR UPDATE on the grouped query below.)
+            list(Category.objects.select_for_update().values_list("pk", flat=True))
+            categories = list(
+                Category.objects.annotate(actual=Count("item", filter=Q(item__quantity_available__gt=0)))
+            )
+            drifted = [category for category in categories if category.in_stock_item_count != category.actual]
+            for category in drifted:
+                self.stdout.write(
+                    f"{category.name}: counter says {category.in_stock_item_count}, actually {category.actual}"
+                )
+                category.in_stock_item_count = category.actual
+
+            if drifted and not options["dry_run"]:
+                Category.objects.bulk_update(drifted, ["in_stock_item_count"])
+                transaction.on_commit(bump_category_generation)
+
+        verb = "would be fixed" if options["dry_run"] else "fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {len(categories)} categories; {len(drifted)} {verb}."
+        ))
@@ -0,0 +1,351 @@
+# File: seed_marketplace.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Generates a large synthetic marketplace (users, categories, items, discounts and order history)
+# for benchmarking. Rows are bulk inserted in chunks by a pool of worker processes, and the same seed always
+# produces the same data.
+import math
+import multiprocessing
+import random
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.db.models import F, Max
+from django.utils import timezone
+
+from finalproject.caching import bump_category_generation, bump_item_generation
+from finalproject.models import Category, Discount, Item, Order, OrderItem, UserProfile
+
+# Every block of this many rows draws from its own random generator, so the data doesn't depend on how the
+# work is split between chunks and workers. Chunk sizes are rounded up to a multiple of it.
+RNG_BLOCK = 1_000
+SEED_PASSWORD = "seed-password"
+# Listings and orders are spread over this many days before the run.
+HISTORY_DAYS = 730
+
+CATEGORY_NAMES = [
+    "Guitars", "Keyboards", "Drums", "Audio", "Cameras", "Lenses", "Laptops", "Phones", "Tablets", "Watches",
+    "Bicycles", "Camping", "Fishing", "Books", "Comics", "Vinyl", "Board Games", "Video Games", "Furniture",
+    "Lighting", "Kitchen", "Garden", "Tools", "Sneakers", "Jackets", "Bags", "Jewelry", "Art", "Toys", "Collectibles",
+]
+ADJECTIVES = [
+    "Vintage", "Classic", "Compact", "Deluxe", "Handmade", "Rugged", "Wireless", "Portable", "Limited", "Restored",
+    "Modern", "Heavy-duty", "Lightweight", "Premium", "Refurbished", "Custom", "Rare", "Studio", "Travel", "Pro",
+]
+NOUNS = [
+    "Guitar", "Amplifier", "Synth", "Snare", "Speaker", "Camera", "Lens", "Laptop", "Phone", "Watch", "Bike",
+    "Tent", "Reel", "Novel", "Record", "Chess Set", "Console", "Chair", "Lamp", "Skillet", "Drill", "Jacket",
+    "Backpack", "Ring", "Print", "Figure",
+]
+CONDITIONS = ["Like new", "Lightly used", "Well loved", "Brand new in box", "Minor scratches", "Fully serviced"]
+FIRST_NAMES = ["Alex", "Sam", "Jordan", "Taylor", "Morgan", "Casey", "Riley", "Jamie", "Avery", "Quinn", "Drew"]
+LAST_NAMES = ["Nguyen", "Smith", "Garcia", "Chen", "Patel", "Okafor", "Kowalski", "Rossi", "Silva", "Cohen"]
+STREETS = ["Commonwealth Ave", "Beacon St", "Main St", "Elm St", "Park Dr", "Harbor Rd", "Maple Ave"]
+CITIES = ["Boston, MA", "Cambridge, MA", "Providence, RI", "Portland, ME", "Hartford, CT", "Burlington, VT"]
+
+
+def block_rngs(seed, kind, start, stop):
+    """
+    Yields (index, rng) for the rows start..stop of a table, reseeding at every RNG_BLOCK boundary.
+    start must be a multiple of RNG_BLOCK.
+    """
+    rng = None
+    for index in range(start, stop):
+        if index % RNG_BLOCK == 0 or rng is None:
+            rng = random.Random(f"{seed}:{kind}:{index // RNG_BLOCK}")
+        yield index, rng
+
+
+def skewed_index(rng, count, skew):
+    """
+    Picks an index below count, favouring low indexes more strongly the larger skew is.
+    """
+    return min(int(count * rng.random() ** skew), count - 1)
+
+
+def item_price(seed, index):
+    """
+    Returns the price of the index-th seeded item. Derived from the index alone so order lines can be
+    priced without looking items up.
+    """
+    rng = random.Random(seed * 1_000_003 + index)
+    return Decimal(min(max(rng.lognormvariate(3.4, 1.1), 1), 99_999)).quantize(Decimal("0.01"))
+
+
+def item_title(seed, index):
+    """
+    Returns (adjective, noun, title) of the index-th seeded item. Derived from the index alone, like the price,
+    so order lines can record the title without looking items up.
+    """
+    rng = random.Random(f"{seed}:title:{index}")
+    adjective, noun = rng.choice(ADJECTIVES), rng.choice(NOUNS)
+    return adjective, noun, f"{adjective} {noun} {rng.choice('ABCDEFGHJKLMNPRSTVXZ')}{rng.randint(10, 999)}"
+
+
+def popular_item(rng, plan):
+    """
+    Picks an item index with a long-tailed popularity. The most popular items are scattered across the
+    catalog rather than all being the oldest listings.
+    """
+    rank = skewed_index(rng, plan["items"], 3)
+    return (rank * plan["item_scatter"]) % plan["items"]
+
+
+@contextmanager
+def historical_dates(*fields):
+    """
+    Lets the given auto_now_add fields be set explicitly, so seeded rows can be dated in the past.
+    """
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def seed_users(plan, start, stop):
+    """
+    Inserts users start..stop with their profiles. All share one password hash, computed up front.
+    """
+    users, profiles = [], []
+    for index, rng in block_rngs(plan["seed"], "users", start, stop):
+        pk = plan["user_base"] + index
+        first_name, last_name = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+        users.append(User(
+            pk=pk, username=f"{plan['prefix']}-user-{index}", password=plan["password"], first_name=first_name,
+            last_name=last_name, email=f"{plan['prefix']}-user-{index}@example.com",
+            date_joined=plan["now"] - timedelta(days=rng.uniform(HISTORY_DAYS, HISTORY_DAYS * 2)),
+        ))
+        profiles.append(UserProfile(
+            user_id=pk, address=f"{rng.randint(1, 999)} {rng.choice(STREETS)}, {rng.choice(CITIES)}"
+        ))
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        UserProfile.objects.bulk_create(profiles)
+    return Counter()
+
+
+def seed_items(plan, start, stop):
+    """
+    Inserts items start..stop and returns how many of them are in stock, per category id.
+    """
+    items = []
+    in_stock = Counter()
+    for index, rng in block_rngs(plan["seed"], "items", start, stop):
+        category_id = plan["category_ids"][skewed_index(rng, len(plan["category_ids"]), 2)]
+        # About one listing in six has sold out; stock otherwise has a long tail.
+        quantity = 0 if rng.random() < 0.15 else min(int(rng.paretovariate(1.2)), 100)
+        adjective, noun, title = item_title(plan["seed"], index)
+        items.append(Item(
+            pk=plan["item_base"] + index,
+            title=title,
+            description=f"{rng.choice(CONDITIONS)}. {adjective.lower()} {noun.lower()}, ships within "
+                        f"{rng.randint(1, 5)} days.",
+            price=item_price(plan["seed"], index),
+            seller_id=plan["user_base"] + skewed_index(rng, plan["sellers"], 3),
+            category_id=category_id,
+            date_listed=plan["now"] - timedelta(days=rng.uniform(0, HISTORY_DAYS)),
+            quantity_available=quantity,
+            image=f"items/seed-{index % 50}.jpg",
+        ))
+        if quantity:
+            in_stock[category_id] += 1
+    with transaction.atomic(), historical_dates(Item._meta.get_field("date_listed")):
+        Item.objects.bulk_create(items)
+    return in_stock
+
+
+def seed_orders(plan, start, stop):
+    """
+    Inserts shipped orders start..stop with their lines and returns how often each discount was used.
+    """
+    orders, lines = [], []
+    discount_uses = Counter()
+    for index, rng in block_rngs(plan["seed"], "orders", start, stop):
+        order_id = plan["order_base"] + index
+        line_count = 1 + min(int(rng.expovariate(0.7)), 7)
+        chosen = {popular_item(rng, plan) for _ in range(line_count)}
+        subtotal = Decimal("0.00")
+        for item_index in sorted(chosen):
+            quantity = 1 + min(int(rng.expovariate(1.5)), 4)
+            unit_price = item_price(plan["seed"], item_index)
+            subtotal += unit_price * quantity
+            lines.append(OrderItem(
+                order_id=order_id, item_id=plan["item_base"] + item_index, quantity=quantity, unit_price=unit_price,
+                title=item_title(plan["seed"], item_index)[2],
+            ))
+
+        # One order in ten used a discount code; priced the same way as Order.apply_pricing().
+        discount_id, discount_amount = None, Decimal("0.00")
+        if plan["discounts"] and rng.random() < 0.1:
+            discount_id, discount_type, amount = rng.choice(plan["discounts"])
+            if discount_type == "percentage":
+                discount_amount = ((amount / 100) * subtotal).quantize(Decimal("0.01"))
+            else:
+                discount_amount = amount
+            discount_uses[discount_id] += 1
+        orders.append(Order(
+            pk=order_id, buyer_id=plan["user_base"] + skewed_index(rng, plan["users"], 2),
+            order_date=plan["now"] - timedelta(days=rng.uniform(0, HISTORY_DAYS)), status="shipped",
+            subtotal_amount=subtotal, discount_id=discount_id, discount_amount=discount_amount,
+            total_amount=max(subtotal - discount_amount, Decimal("0.00")),
+        ))
+    with transaction.atomic(), historical_dates(Order._meta.get_field("order_date")):
+        Order.objects.bulk_create(orders)
+        OrderItem.objects.bulk_create(lines)
+    return discount_uses
+
+
+class Command(BaseCommand):
+    help = (
+        "Generates a synthetic marketplace for benchmarking: users with profiles, categories, items with skewed "
+        "popularity, discounts and shipped orders. The same --seed (and counts) always gives the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=10_000, help="Number of users (one in ten sells).")
+        parser.add_argument("--categories", type=int, default=30, help="Number of categories.")
+        parser.add_argument("--items", type=int, default=100_000, help="Number of items.")
+        parser.add_argument("--discounts", type=int, default=50, help="Number of discount codes.")
+        parser.add_argument("--orders", type=int, default=50_000, help="Number of shipped orders.")
+        parser.add_argument("--seed", type=int, default=412, help="Random seed.")
+        parser.add_argument("--prefix", default="seed", help="Prefix of generated usernames and discount codes.")
+        parser.add_argument("--chunk-size", type=int, default=5_000, help="Rows inserted per transaction.")
+        parser.add_argument(
+            "--workers", type=int, default=None,
+            help="Worker processes inserting chunks (defaults to one per CPU; always 1 on SQLite).",
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 1 or options["categories"] < 1 or (options["orders"] and options["items"] < 1):
+            raise CommandError("At least one user and one category are needed, and items if there are orders.")
+        prefix = options["prefix"]
+        if User.objects.filter(username__startswith=f"{prefix}-user-").exists():
+            raise CommandError(f'Users prefixed "{prefix}-" already exist; pass a different --prefix.')
+
+        workers = options["workers"] or multiprocessing.cpu_count()
+        if connection.vendor == "sqlite" or "fork" not in multiprocessing.get_all_start_methods():
+            # SQLite allows one writer at a time, and workers must be forked to inherit the Django setup.
+            workers = 1
+        chunk_size = math.ceil(options["chunk_size"] / RNG_BLOCK) * RNG_BLOCK
+        started = time.perf_counter()
+
+        plan = self.build_plan(options, prefix)
+        self.stdout.write(f"Seeding with {workers} worker(s), {chunk_size} rows per chunk.")
+        self.run_phase("users", seed_users, plan, options["users"], chunk_size, workers)
+        in_stock = self.run_phase("items", seed_items, plan, options["items"], chunk_size, workers)
+        discount_uses = self.run_phase("orders", seed_orders, plan, options["orders"], chunk_size, workers)
+
+        # The bulk inserts skipped the model methods and signals that keep these up to date.
+        Category.adjust_in_stock_counts(in_stock)
+        for discount_id, uses in discount_uses.items():
+            Discount.objects.filter(pk=discount_id).update(used_count=F("used_count") + uses)
+        self.reset_sequences()
+        bump_item_generation()
+        bump_category_generation()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Seeded the marketplace in {elapsed:.1f}s."))
+
+    def build_plan(self, options, prefix):
+        """
+        Creates the categories and discounts (small enough to insert directly) and returns everything the
+        workers need to generate their chunks.
+        """
+        rng = random.Random(f"{options['seed']}:plan")
+        now = timezone.now()
+        bases = {
+            model: (model.objects.aggregate(last=Max("pk"))["last"] or 0) + 1 for model in (User, Category, Item, Order)
+        }
+
+        categories = []
+        for n in range(options["categories"]):
+            name = CATEGORY_NAMES[n % len(CATEGORY_NAMES)]
+            if n >= len(CATEGORY_NAMES):
+                name = f"{name} {n // len(CATEGORY_NAMES) + 1}"
+            categories.append(Category(pk=bases[Category] + n, name=name, description=f"Seeded {name.lower()}."))
+        Category.objects.bulk_create(categories)
+
+        discounts = []
+        for n in range(options["discounts"]):
+            percentage = rng.random() < 0.7
+            usage_limit = rng.choice([10, 100, 1_000]) if rng.random() < 0.3 else None
+            discounts.append(Discount(
+                code=f"{prefix.upper()}-{options['seed']}-{n}",
+                discount_type="percentage" if percentage else "fixed",
+                amount=Decimal(rng.randint(5, 40) if percentage else rng.randint(5, 50)),
+                active=rng.random() < 0.9,
+                expiration_date=now + timedelta(days=rng.randint(-180, 365)) if rng.random() < 0.5 else None,
+                usage_limit=usage_limit,
+                used_count=rng.randint(0, usage_limit) if usage_limit else 0,
+            ))
+        Discount.objects.bulk_create(discounts)
+        # Historical orders only use codes without a usage limit, so no limit is ever overrun.
+        seeded_discounts = Discount.objects.filter(code__startswith=f"{prefix.upper()}-{options['seed']}-")
+        usable = [
+            (discount.pk, discount.discount_type, discount.amount)
+            for discount in seeded_discounts.filter(usage_limit__isnull=True).order_by("pk")
+        ]
+
+        items = options["items"]
+        # A multiplier coprime with the item count (near its golden section) spreads popularity ranks over
+        # the whole catalog.
+        scatter = max(int(items * 0.618), 1)
+        while math.gcd(scatter, items or 1) != 1:
+            scatter += 1
+        return {
+            "seed": options["seed"],
+            "prefix": prefix,
+            "now": now,
+            "password": make_password(SEED_PASSWORD),
+            "users": options["users"],
+            "sellers": max(options["users"] // 10, 1),
+            "items": items,
+            "item_scatter": scatter,
+            "user_base": bases[User],
+            "item_base": bases[Item],
+            "order_base": bases[Order],
+            "category_ids": [category.pk for category in categories],
+            "discounts": usable,
+        }
+
+    def run_phase(self, name, seed_chunk, plan, count, chunk_size, workers):
+        """
+        Inserts count rows with seed_chunk, a chunk at a time, and returns the chunks' summed results.
+        """
+        started = time.perf_counter()
+        chunks = [(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size)]
+        total = Counter()
+        if workers == 1:
+            for start, stop in chunks:
+                total.update(seed_chunk(plan, start, stop))
+        else:
+            # Forked workers open their own connections; close ours so none of them inherits it.
+            connections.close_all()
+            context = multiprocessing.get_context("fork")
+            with ProcessPoolExecutor(workers, mp_context=context) as pool:
+                futures = [pool.submit(seed_chunk, plan, start, stop) for start, stop in chunks]
+                for future in futures:
+                    total.update(future.result())
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{name}: {count} rows in {elapsed:.1f}s ({count / elapsed if elapsed else 0:.0f} rows/s)")
+        return total
+
+    def reset_sequences(self):
+        """
+        Moves the primary key sequences past the explicitly numbered rows (a no-op on SQLite).
+        """
+        statements = connection.ops.sequence_reset_sql(no_style(), [User, Category, Item, Order])
+        with connection.cursor() as cursor:
+            for sql in statements:
+                cursor.execute(sql)
@@ -0,0 +1,44 @@
+# Builds the full-text search index for items: an FTS5 table kept in sync by triggers on SQLite,
+# and a GIN expression index on Postgres (which Postgres maintains itself).
+
+from django.db import migrations
+
+from finalproject.search import FTS_TABLE, SQLITE_TRIGGERS, install_search_triggers
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+            "title, description, content='finalproject_item', content_rowid='id', "
+            "tokenize='porter unicode61 remove_diacritics 2')"
+        )
+        install_search_triggers(schema_editor)
+    elif vendor == "postgresql":
+        # Must match search.PG_DOCUMENT so the planner can use the index.
+        schema_editor.execute(
+            "CREATE INDEX finalproject_item_search_gin ON finalproject_item USING GIN ("
+            "to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, '')))"
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "sqlite":
+        for name in SQLITE_TRIGGERS:
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {FTS_TABLE}")
+    elif vendor == "postgresql":
+        schema_editor.execute("DROP INDEX IF EXISTS finalproject_item_search_gin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finalproject', '0008_remove_discount_item'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.2.16 on 2026-10-18 02:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finalproject', '0009_item_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='discount',
+            name='shard_count',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='DiscountCounterShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('shard', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('capacity', models.PositiveIntegerField(blank=True, null=True)),
+                ('discount', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='counter_shards', to='finalproject.discount')),
+            ],
+            options={
+                'unique_together': {('discount', 'shard')},
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 4.2.16 on 2026-10-18 02:22
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_subtotals(apps, schema_editor):
+    # Fills in the running subtotal of existing orders with one correlated UPDATE.
+    Order = apps.get_model("finalproject", "Order")
+    OrderItem = apps.get_model("finalproject", "OrderItem")
+    line_totals = (
+        OrderItem.objects.filter(order=OuterRef("pk"))
+        .values("order")
+        .annotate(subtotal=Sum(F("item__price") * F("quantity")))
+        .values("subtotal")
+    )
+    Order.objects.update(subtotal_amount=Coalesce(
+        Subquery(line_totals, output_field=models.DecimalField(max_digits=10, decimal_places=2)),
+        Value(Decimal('0.00')),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finalproject', '0010_discount_counter_shards'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='subtotal_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=10),
+        ),
+        migrations.RunPython(backfill_subtotals, migrations.RunPython.noop),
+    ]
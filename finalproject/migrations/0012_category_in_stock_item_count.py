@@ -0,0 +1,34 @@
+# Generated by Django 4.2.16 on 2026-10-18 02:24
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def count_in_stock_items(apps, schema_editor):
+    # Fills in the counter for existing categories with one correlated UPDATE.
+    Category = apps.get_model("finalproject", "Category")
+    Item = apps.get_model("finalproject", "Item")
+    in_stock = (
+        Item.objects.filter(category=OuterRef("pk"), quantity_available__gt=0)
+        .values("category")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    Category.objects.update(in_stock_item_count=Coalesce(Subquery(in_stock), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finalproject', '0011_order_subtotal_amount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='in_stock_item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(count_in_stock_items, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 4.2.16 on 2026-10-18 02:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finalproject', '0012_category_in_stock_item_count'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='category',
+            index=models.Index(condition=models.Q(('in_stock_item_count__gt', 0)), fields=['name'], name='category_instock_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('quantity_available__gt', 0)), fields=['date_listed', 'id'], name='item_instock_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('quantity_available__gt', 0)), fields=['price', 'id'], name='item_instock_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('quantity_available__gt', 0)), fields=['category', 'date_listed', 'id'], name='item_cat_instock_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(condition=models.Q(('quantity_available__gt', 0)), fields=['category', 'price', 'id'], name='item_cat_instock_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['seller', 'date_listed'], name='item_seller_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['buyer', 'status'], name='order_buyer_status_idx'),
+        ),
+    ]
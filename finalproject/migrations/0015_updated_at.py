@@ -0,0 +1,35 @@
+# Generated by Django 4.2.16 on 2026-10-18 02:29
+
+from django.db import migrations, models
+
+from finalproject.search import install_search_triggers
+
+
+def reinstall_search_triggers(apps, schema_editor):
+    # Adding the column makes SQLite remake the item table, which drops the search index triggers.
+    install_search_triggers(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finalproject', '0014_item_card_version'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='item',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['updated_at'], name='item_updated_idx'),
+        ),
+        migrations.RunPython(reinstall_search_triggers, migrations.RunPython.noop),
+    ]
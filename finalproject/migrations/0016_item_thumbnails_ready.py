@@ -0,0 +1,26 @@
+# Generated by Django 4.2.16 on 2026-10-18 02:30
+
+from django.db import migrations, models
+
+from finalproject.search import install_search_triggers
+
+
+def reinstall_search_triggers(apps, schema_editor):
+    # Adding the column makes SQLite remake the item table, which drops the search index triggers.
+    install_search_triggers(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finalproject', '0015_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='item',
+            name='thumbnails_ready',
+            field=models.BooleanField(default=False, editable=False),
+        ),
+        migrations.RunPython(reinstall_search_triggers, migrations.RunPython.noop),
+    ]
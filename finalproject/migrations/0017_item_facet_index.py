@@ -0,0 +1,17 @@
+# Generated by Django 4.2.16 on 2026-10-18 02:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finalproject', '0016_item_thumbnails_ready'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='item',
+            index=models.Index(fields=['category', 'price', 'date_listed', 'quantity_available'], name='item_facet_idx'),
+        ),
+    ]
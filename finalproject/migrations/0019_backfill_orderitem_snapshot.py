@@ -0,0 +1,40 @@
+# Generated by Django 4.2.16 on 2026-10-18 03:05
+
+from django.db import migrations, transaction
+from django.db.models import OuterRef, Subquery
+
+# Order lines filled in per UPDATE; each batch commits on its own, so a large table is never locked for long.
+BATCH_SIZE = 5_000
+
+
+def backfill_snapshots(apps, schema_editor):
+    # Existing lines take their item's current price and title, which is what they were shown at until now.
+    OrderItem = apps.get_model("finalproject", "OrderItem")
+    Item = apps.get_model("finalproject", "Item")
+    item = Item.objects.filter(pk=OuterRef("item_id"))
+    last_id = 0
+    while True:
+        batch = list(
+            OrderItem.objects.filter(pk__gt=last_id, unit_price__isnull=True)
+            .order_by("pk").values_list("pk", flat=True)[:BATCH_SIZE]
+        )
+        if not batch:
+            break
+        with transaction.atomic():
+            OrderItem.objects.filter(pk__in=batch).update(
+                unit_price=Subquery(item.values("price")[:1]), title=Subquery(item.values("title")[:1])
+            )
+        last_id = batch[-1]
+
+
+class Migration(migrations.Migration):
+    # Lets every batch commit separately instead of holding one transaction for the whole table.
+    atomic = False
+
+    dependencies = [
+        ('finalproject', '0018_orderitem_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_snapshots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.16 on 2026-10-18 03:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('finalproject', '0019_backfill_orderitem_snapshot'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='orderitem',
+            name='unit_price',
+            field=models.DecimalField(decimal_places=2, max_digits=10),
+        ),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='title',
+            field=models.TextField(),
+        ),
+    ]
@@ -1,11 +1,17 @@
 # File: models.py
 # Author: Crosby Nash (crosbyn@bu.edu), 12/26/2024
 # Defines the database models for the marketplace platform, including user profiles, items, orders, discounts, and categories.
+import random
 from django.utils import timezone
 from decimal import Decimal
 from django.db import models
+from django.db.models import Case, Count, F, OuterRef, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import User
 from django.db import transaction
+from django.conf import settings
+from django.core.cache import cache
+from .caching import bump_category_generation, bump_item_generation, cart_summary_key, invalidate_cart_summary
 
 class UserProfile(models.Model):
     """
@@ -30,6 +36,18 @@ class Category(models.Model):
     """
     name = models.TextField()
     description = models.TextField()
+    # Number of items in this category with stock left. Maintained by Item.save(), item deletion and checkout;
+    # the reconcile_category_counts command repairs any drift.
+    in_stock_item_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # The categories page lists only categories with stock, by name.
+            models.Index(
+                fields=["name"], condition=models.Q(in_stock_item_count__gt=0), name="category_instock_name_idx"
+            ),
+        ]
 
     def __str__(self):
         """
@@ -37,6 +55,29 @@ class Category(models.Model):
         """
         return self.name
 
+    @staticmethod
+    def adjust_in_stock_counts(changes):
+        """
+        Adds the given amounts, a mapping of category id to change, to the categories' in-stock counters
+        with a single UPDATE. Call inside the transaction that changes the items. A counter that has drifted
+        low stops at zero rather than failing the write; reconcile_category_counts corrects it.
+        """
+        changes = {category_id: change for category_id, change in changes.items() if change}
+        if not changes:
+            return
+        Category.objects.filter(pk__in=changes).update(
+            in_stock_item_count=Greatest(
+                F("in_stock_item_count") + Case(
+                    *[When(pk=category_id, then=change) for category_id, change in changes.items()],
+                    output_field=models.IntegerField(),
+                ),
+                0,
+            ),
+            updated_at=timezone.now(),
+        )
+        # The counters are part of the category data cached by each process (see category_cache).
+        transaction.on_commit(bump_category_generation)
+
 
 class Item(models.Model):
     """
@@ -49,7 +90,43 @@ class Item(models.Model):
     seller = models.ForeignKey(User, on_delete=models.CASCADE)
     category = models.ForeignKey(Category, on_delete=models.CASCADE)
     date_listed = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     quantity_available = models.PositiveIntegerField(default=1)
+    # Bumped on every save; cached listing cards are keyed on it, so an edit never shows a stale card.
+    card_version = models.PositiveIntegerField(default=0, editable=False)
+    # Set once the resized variants of the current image exist (see thumbnails.py); cleared when the image changes.
+    thumbnails_ready = models.BooleanField(default=False, editable=False)
+
+    class Meta:
+        # The catalog listings only show in-stock items, sorted by date or price with id as the tiebreaker
+        # (see pagination.SORT_ORDERINGS); partial indexes cover exactly those rows in that order.
+        indexes = [
+            models.Index(
+                fields=["date_listed", "id"], condition=models.Q(quantity_available__gt=0),
+                name="item_instock_date_idx",
+            ),
+            models.Index(
+                fields=["price", "id"], condition=models.Q(quantity_available__gt=0),
+                name="item_instock_price_idx",
+            ),
+            models.Index(
+                fields=["category", "date_listed", "id"], condition=models.Q(quantity_available__gt=0),
+                name="item_cat_instock_date_idx",
+            ),
+            models.Index(
+                fields=["category", "price", "id"], condition=models.Q(quantity_available__gt=0),
+                name="item_cat_instock_price_idx",
+            ),
+            # A seller's own listings on the profile page, newest first.
+            models.Index(fields=["seller", "date_listed"], name="item_seller_date_idx"),
+            # Finds the most recent change to the catalog for Last-Modified headers.
+            models.Index(fields=["updated_at"], name="item_updated_idx"),
+            # Covers every column the facet count query groups on (see facets.facet_cube), so counting the
+            # whole catalog reads this index instead of the table.
+            models.Index(
+                fields=["category", "price", "date_listed", "quantity_available"], name="item_facet_idx",
+            ),
+        ]
 
     def __str__(self):
         """
@@ -57,6 +134,30 @@ class Item(models.Model):
         """
         return self.title
 
+    def save(self, *args, **kwargs):
+        """
+        Saves the item, bumps its card version and moves it in or out of its category's in-stock count when
+        its stock or category changed.
+        """
+        with transaction.atomic():
+            previous = None
+            if self.pk:
+                # Locks the stored row so a concurrent checkout can't change its stock between the read and the write.
+                previous = (
+                    Item.objects.select_for_update()
+                    .filter(pk=self.pk).values_list("category_id", "quantity_available", "card_version").first()
+                )
+            if previous:
+                self.card_version = previous[2] + 1
+            super().save(*args, **kwargs)
+
+            changes = {}
+            if previous and previous[1] > 0:
+                changes[previous[0]] = -1
+            if self.quantity_available > 0:
+                changes[self.category_id] = changes.get(self.category_id, 0) + 1
+            Category.adjust_in_stock_counts(changes)
+
 
 class Discount(models.Model):
     """
@@ -74,6 +175,44 @@ class Discount(models.Model):
     expiration_date = models.DateTimeField(null=True, blank=True)
     usage_limit = models.PositiveIntegerField(null=True, blank=True)
     used_count = models.PositiveIntegerField(default=0)
+    shard_count = models.PositiveSmallIntegerField(default=0)
+    # When above zero, redemptions are counted across this many DiscountCounterShard rows instead of used_count,
+    # so a heavily used code doesn't make every checkout wait on the same row.
+
+    def save(self, *args, **kwargs):
+        """
+        Saves the discount and brings its counter shards in line with shard_count and usage_limit.
+        used_count is only written when the discount is created; after that only redeem()'s atomic increments
+        change it, so saving a copy loaded earlier (e.g. an admin edit) can't undo the uses recorded since.
+        Raises ValueError if asked to save used_count explicitly.
+        """
+        if not self._state.adding and not kwargs.get("force_insert"):
+            update_fields = kwargs.get("update_fields")
+            if update_fields is None:
+                kwargs["update_fields"] = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.name != "used_count"
+                ]
+            elif "used_count" in update_fields:
+                raise ValueError("used_count can't be saved; uses are only recorded by redeem().")
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            self.sync_counter_shards()
+
+    def has_usage_limit(self):
+        """
+        Checks whether the code can only be used a limited number of times (a limit of 0 means unlimited).
+        """
+        return bool(self.usage_limit)
+
+    def times_used(self):
+        """
+        Returns how many times the code has been redeemed, including uses counted on shards.
+        """
+        if not self.shard_count:
+            return self.used_count
+        shard_total = self.counter_shards.aggregate(total=Sum("count"))["total"] or 0
+        return self.used_count + shard_total
 
     def is_valid(self):
         """
@@ -83,10 +222,82 @@ class Discount(models.Model):
             return False
         if self.expiration_date and timezone.now() > self.expiration_date:
             return False
-        if self.usage_limit and self.used_count >= self.usage_limit:
+        if self.has_usage_limit() and self.times_used() >= self.usage_limit:
             return False
         return True
 
+    def redeem(self):
+        """
+        Records one use of the code at checkout with a single atomic conditional increment, so the usage limit
+        holds however many checkouts race for the last use. Raises ValueError if the code can't be used.
+        """
+        if not self.active or (self.expiration_date and timezone.now() > self.expiration_date):
+            raise ValueError("This discount code is invalid or has expired.")
+
+        if self.shard_count:
+            redeemed = self.redeem_on_shard()
+        else:
+            # UPDATE ... SET used_count = used_count + 1 WHERE <still usable>
+            redeemed = Discount.objects.filter(
+                models.Q(usage_limit__isnull=True) | models.Q(usage_limit=0)
+                | models.Q(used_count__lt=F("usage_limit")),
+                pk=self.pk, active=True,
+            ).update(used_count=F("used_count") + 1)
+        if not redeemed:
+            raise ValueError(f'Discount "{self.code}" has reached its usage limit.')
+
+    def redeem_on_shard(self):
+        """
+        Increments a randomly chosen counter shard that still has capacity, trying the others in turn
+        when it is full. Returns whether a use was recorded.
+        """
+        shards = list(range(self.shard_count))
+        random.shuffle(shards)
+        for shard in shards:
+            if DiscountCounterShard.objects.filter(
+                models.Q(capacity__isnull=True) | models.Q(count__lt=F("capacity")),
+                discount=self, discount__active=True, shard=shard,
+            ).update(count=F("count") + 1):
+                return True
+        return False
+
+    def sync_counter_shards(self):
+        """
+        Creates the counter shards for a sharded code and splits the remaining usage limit between them.
+        Turning sharding off folds the shard counts back into used_count.
+        """
+        # Locks the discount and takes the uses recorded so far from the database rather than this copy.
+        self.used_count = Discount.objects.select_for_update().values_list("used_count", flat=True).get(pk=self.pk)
+        shards = {shard.shard: shard for shard in self.counter_shards.select_for_update()}
+        if not self.shard_count:
+            if shards:
+                folded = sum(shard.count for shard in shards.values())
+                Discount.objects.filter(pk=self.pk).update(used_count=F("used_count") + folded)
+                self.used_count += folded
+                self.counter_shards.all().delete()
+            return
+
+        # Uses already recorded, on used_count or any shard, come off the limit before it is split.
+        used = self.used_count + sum(shard.count for shard in shards.values())
+        remaining = max(self.usage_limit - used, 0) if self.has_usage_limit() else None
+        for n in range(self.shard_count):
+            shard = shards.get(n) or DiscountCounterShard(discount=self, shard=n)
+            if remaining is None:
+                shard.capacity = None
+            else:
+                # Each shard may hold its existing count plus its share of what's left.
+                share = remaining // self.shard_count + (1 if n < remaining % self.shard_count else 0)
+                shard.capacity = shard.count + share
+            shards[n] = shard
+        for n, shard in shards.items():
+            if n >= self.shard_count:
+                # Shards beyond the configured count keep their history but take no new uses.
+                shard.capacity = shard.count
+        DiscountCounterShard.objects.bulk_create([shard for shard in shards.values() if shard.pk is None])
+        DiscountCounterShard.objects.bulk_update(
+            [shard for shard in shards.values() if shard.pk is not None], ["capacity"]
+        )
+
     def __str__(self):
         """
         Returns the discount code when the instance is converted to a string.
@@ -94,6 +305,39 @@ class Discount(models.Model):
         return self.code
 
 
+class DiscountCounterShard(models.Model):
+    """
+    One slice of a sharded discount's usage counter. A redemption increments a single shard, and each shard
+    has its own capacity so that the shards together never exceed the discount's usage limit.
+    """
+    discount = models.ForeignKey(Discount, on_delete=models.CASCADE, related_name="counter_shards")
+    shard = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+    capacity = models.PositiveIntegerField(null=True, blank=True)
+    # The most uses this shard may record; empty when the discount has no usage limit.
+
+    class Meta:
+        unique_together = [("discount", "shard")]
+
+    def __str__(self):
+        """
+        Returns a string representation of the shard.
+        """
+        return f"{self.discount.code} shard {self.shard}: {self.count}"
+
+
+class OutOfStockError(ValueError):
+    """
+    Raised inside Order.checkout() when at least one line cannot be covered by the available stock.
+    """
+
+
+class PricesChangedError(ValueError):
+    """
+    Raised inside Order.checkout() when an item was repriced after it was added to the cart.
+    """
+
+
 class Order(models.Model):
     """
     Represents a user's order, including items and the total amount.
@@ -104,61 +348,260 @@ class Order(models.Model):
     ]
     buyer = models.ForeignKey(User, on_delete=models.CASCADE)
     order_date = models.DateTimeField(auto_now_add=True)
+    # Sum of price * quantity over the order's lines, before any discount. Kept up to date by the cart methods.
+    subtotal_amount = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
     total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
     discount = models.ForeignKey(Discount, on_delete=models.SET_NULL, null=True, blank=True)
     discount_amount = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal('0.00'))
     status = models.TextField(choices=STATUS_CHOICES, default='cart')
 
+    class Meta:
+        indexes = [
+            # Carts and order histories are always looked up by buyer and status.
+            models.Index(fields=["buyer", "status"], name="order_buyer_status_idx"),
+        ]
+
     def __str__(self):
         """
         Returns a string representation of the order.
         """
         return f"Order #{self.id} by {self.buyer.username}"
 
-    def calculate_total(self):
+    @classmethod
+    def get_cart(cls, buyer):
+        """
+        Returns the buyer's cart with its discount, or None if they haven't added anything yet. Never writes;
+        carts are only created when the first item is added.
         """
-        Calculates the total amount for the order, including discounts.
+        return cls.objects.select_related("discount").filter(buyer=buyer, status="cart").first()
+
+    @classmethod
+    def cart_summary(cls, buyer_id):
+        """
+        Returns {"count": items in the cart, "total": cart total} for the navbar, from the cache when possible
+        and otherwise with one aggregate query. The cached summary is dropped whenever the cart changes.
+        """
+        key = cart_summary_key(buyer_id)
+        summary = cache.get(key)
+        if summary is None:
+            cart = (
+                cls.objects.filter(buyer_id=buyer_id, status="cart")
+                .annotate(count=Coalesce(Sum("orderitem__quantity"), 0))
+                .values("count", "total_amount")
+                .first()
+            )
+            if cart:
+                summary = {"count": cart["count"], "total": cart["total_amount"]}
+            else:
+                summary = {"count": 0, "total": Decimal("0.00")}
+            cache.set(key, summary, settings.CART_SUMMARY_CACHE_TIMEOUT)
+        return summary
+
+    def apply_pricing(self):
+        """
+        Derives the discount and total amounts from the subtotal and the applied discount.
+        This is the only place order totals are priced; it does not touch the database except to check the discount.
         """
-        total = sum(item.item.price * item.quantity for item in self.orderitem_set.all())
+        total = self.subtotal_amount
         if self.discount and self.discount.is_valid():
             if self.discount.discount_type == 'percentage':
-                self.discount_amount = (self.discount.amount / 100) * total
+                self.discount_amount = ((self.discount.amount / 100) * total).quantize(Decimal('0.01'))
             elif self.discount.discount_type == 'fixed':
                 self.discount_amount = self.discount.amount
             total -= self.discount_amount
             if total < 0:
-                total = 0
+                total = Decimal('0.00')
         else:
             self.discount_amount = Decimal('0.00')
         self.total_amount = total
-        self.save()
+
+    def save_pricing(self):
+        """
+        Writes the priced amounts and the applied discount back to the order.
+        """
+        self.save(update_fields=["subtotal_amount", "discount", "discount_amount", "total_amount"])
+
+    def adjust_subtotal(self, delta):
+        """
+        Applies a change in the pre-discount subtotal (e.g. price * quantity of an added line) and reprices
+        the order, without re-reading its lines.
+        """
+        with transaction.atomic():
+            # Adds the delta in the database so concurrent changes to the same cart aren't lost.
+            Order.objects.filter(pk=self.pk).update(subtotal_amount=F("subtotal_amount") + delta)
+            self.refresh_from_db(fields=["subtotal_amount"])
+            self.apply_pricing()
+            self.save(update_fields=["discount_amount", "total_amount"])
+
+    def calculate_total(self):
+        """
+        Recomputes the subtotal from all order lines with a single aggregate query and reprices the order.
+        Only needed when the running subtotal can't be trusted; cart changes adjust it incrementally.
+        """
+        self.subtotal_amount = self.orderitem_set.aggregate(subtotal=Coalesce(
+            Sum(F("unit_price") * F("quantity")),
+            Value(Decimal('0.00')),
+            output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        ))["subtotal"]
+        self.apply_pricing()
+        self.save_pricing()
 
     def remove_discount(self):
         """
-        Removes the applied discount and recalculates the total amount.
+        Removes the applied discount and reprices the order.
         """
         self.discount = None
-        self.discount_amount = Decimal('0.00')
-        self.calculate_total()
+        self.apply_pricing()
+        self.save_pricing()
+
+    def add_item(self, item, quantity):
+        """
+        Adds a quantity of an item to the order, merging it into an existing line for the same item.
+        A new line records the item's current price and title; a merged one keeps the price it was added at.
+        """
+        with transaction.atomic():
+            order_item, created = OrderItem.objects.get_or_create(
+                order=self, item=item, defaults={"quantity": quantity, "unit_price": item.price, "title": item.title}
+            )
+            if not created:
+                OrderItem.objects.filter(pk=order_item.pk).update(quantity=F("quantity") + quantity)
+            self.adjust_subtotal(order_item.unit_price * quantity)
 
     def remove_item(self, order_item_id):
         """
-        Removes an item from the order and recalculates the total amount.
+        Removes an item from the order and takes its line total off the order total.
         """
         with transaction.atomic():
             order_item = OrderItem.objects.get(id=order_item_id, order=self)
             order_item.delete()
-            self.calculate_total()
+            self.adjust_subtotal(-order_item.total_price())
 
     def update_quantity(self, order_item_id, quantity):
         """
-        Updates the quantity of an item in the order.
+        Updates the quantity of an item in the order and adjusts the total by the difference.
+        """
+        with transaction.atomic():
+            if quantity < 1:
+                raise ValueError("Quantities must be at least 1. Use Remove to take an item out of your cart.")
+            order_item = OrderItem.objects.select_related("item").get(id=order_item_id, order=self)
+            if quantity > order_item.item.quantity_available:
+                raise ValueError("Requested quantity exceeds available stock.")
+            delta = order_item.unit_price * (quantity - order_item.quantity)
+            order_item.quantity = quantity
+            order_item.save(update_fields=["quantity"])
+            self.adjust_subtotal(delta)
+
+    def update_quantities(self, quantities):
+        """
+        Sets the quantities of several order lines at once, given a mapping of order item id to quantity.
+        All quantities are checked against stock before any is written; if one exceeds it, nothing changes.
+        Ids that don't belong to this order are ignored. Quantities below 1 are rejected; lines are removed
+        with remove_item() instead.
         """
-        order_item = OrderItem.objects.get(id=order_item_id, order=self)
-        if quantity > order_item.item.quantity_available:
-            raise ValueError("Requested quantity exceeds available stock.")
-        order_item.quantity = quantity
-        order_item.save()
+        if any(quantity < 1 for quantity in quantities.values()):
+            raise ValueError("Quantities must be at least 1. Use Remove to take an item out of your cart.")
+        with transaction.atomic():
+            order_items = list(
+                OrderItem.objects.select_related("item").filter(order=self, id__in=quantities.keys())
+            )
+            too_many = [
+                order_item.item.title for order_item in order_items
+                if quantities[order_item.id] > order_item.item.quantity_available
+            ]
+            if too_many:
+                raise ValueError(f"Requested quantity exceeds available stock for {', '.join(too_many)}.")
+
+            delta = Decimal('0.00')
+            changed = []
+            for order_item in order_items:
+                quantity = quantities[order_item.id]
+                if quantity != order_item.quantity:
+                    delta += order_item.unit_price * (quantity - order_item.quantity)
+                    order_item.quantity = quantity
+                    changed.append(order_item)
+            if changed:
+                OrderItem.objects.bulk_update(changed, ["quantity"])
+                self.adjust_subtotal(delta)
+            return len(changed)
+
+    def snapshot_lines(self):
+        """
+        Copies the current price and title of each item onto the order's lines whose snapshot is out of date,
+        in one UPDATE. Returns the number of lines changed.
+        """
+        item = Item.objects.filter(pk=OuterRef("item_id"))
+        return (
+            OrderItem.objects.filter(order=self)
+            .exclude(unit_price=F("item__price"), title=F("item__title"))
+            .update(unit_price=Subquery(item.values("price")[:1]), title=Subquery(item.values("title")[:1]))
+        )
+
+    def checkout(self):
+        """
+        Places the order: marks it as shipped and takes every line's quantity out of stock, all or nothing.
+        Stock is decremented with one conditional UPDATE for the whole order, so two concurrent checkouts
+        can never both take the last unit, and the query count does not grow with the number of lines.
+        Raises ValueError, leaving the cart and stock untouched, if any item is short of stock or the
+        discount code can no longer be redeemed. If an item's price changed since it was added, the cart is
+        updated to the new prices instead and ValueError asks the buyer to review it.
+        """
+        try:
+            with transaction.atomic():
+                # Flips the status first; this also stops the same cart from being checked out twice at once.
+                if not Order.objects.filter(pk=self.pk, status="cart").update(status="shipped"):
+                    raise ValueError("This order has already been placed.")
+
+                # The buyer pays what the cart showed; a repriced item stops the checkout for the buyer to review.
+                if OrderItem.objects.filter(order=self).exclude(unit_price=F("item__price")).exists():
+                    raise PricesChangedError()
+
+                if self.discount_id:
+                    # Records the use of the discount code; once the code is used up the whole checkout fails.
+                    self.discount.redeem()
+
+                # Total quantity requested per item across the order's lines. Items requested zero times are
+                # left out, so an item that was already sold out isn't counted as sold out by this order.
+                requested = dict(
+                    OrderItem.objects.filter(order=self)
+                    .values("item_id").annotate(total=Sum("quantity")).filter(total__gt=0)
+                    .values_list("item_id", "total")
+                )
+                if requested:
+                    requested_quantity = Case(
+                        *[When(pk=item_id, then=quantity) for item_id, quantity in requested.items()],
+                        output_field=models.PositiveIntegerField(),
+                    )
+                    # UPDATE ... SET quantity_available = quantity_available - n WHERE quantity_available >= n
+                    claimed = Item.objects.filter(
+                        pk__in=requested, quantity_available__gte=requested_quantity
+                    ).update(
+                        quantity_available=F("quantity_available") - requested_quantity, updated_at=timezone.now()
+                    )
+                    if claimed != len(requested):
+                        # Rolls back the status change and any lines that were claimed.
+                        raise OutOfStockError()
+                    # Items this order sold out leave their categories' in-stock counts.
+                    sold_out = (
+                        Item.objects.filter(pk__in=requested, quantity_available=0)
+                        .values("category_id").annotate(total=Count("id")).values_list("category_id", "total")
+                    )
+                    Category.adjust_in_stock_counts({category_id: -total for category_id, total in sold_out})
+                    transaction.on_commit(bump_item_generation)
+                # The status update bypasses save(), so the signal that drops the cart summary doesn't fire.
+                buyer_id = self.buyer_id
+                transaction.on_commit(lambda: invalidate_cart_summary(buyer_id))
+        except PricesChangedError:
+            # Brings the cart up to date after the rollback, so it shows what checking out will now charge.
+            self.snapshot_lines()
+            self.calculate_total()
+            raise ValueError("Some prices in your cart have changed. Please review your cart and check out again.")
+        except OutOfStockError:
+            # Reads the stock again after the rollback to name the items that fell short.
+            short_titles = Item.objects.filter(
+                pk__in=requested, quantity_available__lt=requested_quantity
+            ).values_list("title", flat=True)
+            raise ValueError(f"Not enough stock for {', '.join(short_titles) or 'some items'}.")
+        self.status = "shipped"
 
     def apply_discount_code(self, discount_code):
         """
@@ -169,26 +612,31 @@ class Order(models.Model):
             if not discount.is_valid():
                 raise ValueError("This discount code is invalid or has expired.")
             self.discount = discount
-            self.calculate_total()
+            self.apply_pricing()
+            self.save_pricing()
         except Discount.DoesNotExist:
             raise ValueError("Invalid discount code.")
 
 class OrderItem(models.Model):
     """
-    Represents an item in an order, including its quantity.
+    Represents an item in an order, including its quantity and the item's price and title when it was added
+    (refreshed when checkout finds the price changed), so placed orders keep their totals when the item is
+    edited later.
     """
     order = models.ForeignKey(Order, on_delete=models.CASCADE)
     item = models.ForeignKey(Item, on_delete=models.CASCADE)
     quantity = models.PositiveIntegerField()
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    title = models.TextField()
 
     def __str__(self):
         """
         Returns a string representation of the order item.
         """
-        return f"{self.quantity} of {self.item.title} in Order #{self.order.id}"
+        return f"{self.quantity} of {self.title} in Order #{self.order_id}"
 
     def total_price(self):
         """
-        Calculates the total price for this order item.
+        Calculates the total price for this order item from its price snapshot.
         """
-        return self.item.price * self.quantity
\ No newline at end of file
+        return self.unit_price * self.quantity
\ No newline at end of file
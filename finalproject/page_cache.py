@@ -0,0 +1,131 @@
+# File: page_cache.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Whole-page caching and conditional GET (ETag/Last-Modified) for catalog pages seen by
+# logged-out visitors, invalidated through the item and category generations.
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+
+from .caching import CATEGORY_GENERATION_KEY, ITEM_GENERATION_KEY, get_generations
+from .models import Category, Item
+
+# The data a page can depend on, each with its generation key and the model whose updated_at seeds
+# the Last-Modified time when the cache has no record of the last change.
+PAGE_DEPENDENCIES = {
+    "items": (ITEM_GENERATION_KEY, Item),
+    "categories": (CATEGORY_GENERATION_KEY, Category),
+}
+
+
+def latest_update(model):
+    """
+    Returns the Unix timestamp of the most recent change to any row of model, or None if it is empty.
+    """
+    updated_at = model.objects.aggregate(latest=Max("updated_at"))["latest"]
+    return updated_at.timestamp() if updated_at else None
+
+
+class AnonymousPageCacheMixin:
+    """
+    Serves logged-out GET requests from a whole-page cache and answers repeat visits with 304 Not Modified.
+    Cached pages and validators are keyed on the generations of page_cache_dependencies, so any change to
+    that data invalidates them without tracking individual pages.
+    """
+    # Names from PAGE_DEPENDENCIES whose changes alter this page.
+    page_cache_dependencies = ("items", "categories")
+
+    def uses_page_cache(self, request):
+        """
+        Checks whether the response to this request is the same for every logged-out visitor.
+        """
+        return (
+            request.method in ("GET", "HEAD")
+            and not request.user.is_authenticated
+            # Pending messages are rendered into the page, so it can't be shared.
+            and not len(get_messages(request))
+        )
+
+    def page_cache_validators(self, request):
+        """
+        Returns (digest, last_modified): a digest of the URL and the current dependency generations,
+        and the Unix timestamp of the most recent change to any dependency.
+        """
+        models = {PAGE_DEPENDENCIES[name][0]: PAGE_DEPENDENCIES[name][1] for name in self.page_cache_dependencies}
+        generations = get_generations(
+            *models, initial_changed_at={key: lambda model=model: latest_update(model) for key, model in models.items()}
+        )
+        version = ":".join(str(generations[key][0]) for key in models)
+        digest = hashlib.md5(f"{request.get_full_path()}|{version}".encode()).hexdigest()
+        last_modified = max(changed_at for _, changed_at in generations.values())
+        return digest, int(last_modified)
+
+    def cached_page_response(self, request):
+        """
+        Returns (response, digest, last_modified), where response is a 304 or the cached page, or None
+        when the page has to be rendered.
+        """
+        digest, last_modified = self.page_cache_validators(request)
+        response = get_conditional_response(request, etag=f'"{digest}"', last_modified=last_modified)
+        if response is None:
+            cached = cache.get(f"finalproject:page:{digest}")
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+        return response, digest, last_modified
+
+    def store_page(self, response, digest):
+        """
+        Renders a freshly built page and caches it if it is a complete, successful response.
+        """
+        if hasattr(response, "render"):
+            response.render()
+        if response.status_code == 200 and not response.streaming:
+            cache.set(
+                f"finalproject:page:{digest}", (response.content, response["Content-Type"]), settings.PAGE_CACHE_TIMEOUT
+            )
+        return response
+
+    def add_validators(self, response, digest, last_modified):
+        """
+        Adds the ETag, Last-Modified and caching headers to a response for a logged-out visitor.
+        """
+        response["ETag"] = f'"{digest}"'
+        response["Last-Modified"] = http_date(last_modified)
+        # Browsers must revalidate (cheaply, thanks to the validators); logged-in visitors see a different page.
+        patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ("Cookie",))
+        return response
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Answers with 304, the cached page, or a freshly rendered (and then cached) page.
+        """
+        if self.view_is_async:
+            return self.adispatch(request, *args, **kwargs)
+        if not self.uses_page_cache(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        response, digest, last_modified = self.cached_page_response(request)
+        if response is None:
+            response = self.store_page(super().dispatch(request, *args, **kwargs), digest)
+        return self.add_validators(response, digest, last_modified)
+
+    async def adispatch(self, request, *args, **kwargs):
+        """
+        Async version of dispatch() for async views. Session, cache and template work runs in a thread.
+        """
+        if not await sync_to_async(self.uses_page_cache)(request):
+            return await super().dispatch(request, *args, **kwargs)
+
+        response, digest, last_modified = await sync_to_async(self.cached_page_response)(request)
+        if response is None:
+            response = await super().dispatch(request, *args, **kwargs)
+            response = await sync_to_async(self.store_page)(response, digest)
+        return self.add_validators(response, digest, last_modified)
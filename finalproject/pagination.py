@@ -0,0 +1,321 @@
+# File: pagination.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Pagination for the catalog listings. Supports the usual numbered pages and an opt-in keyset
+# (cursor) mode that seeks on (sort field, id), so a deep page costs the same as the first one.
+import hashlib
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+from .caching import get_item_generation
+
+# Maps the 'sort' query parameter to the item field ordering it selects.
+SORT_ORDERINGS = {
+    "price_asc": "price",
+    "price_desc": "-price",
+    "date_new": "-date_listed",
+    "date_old": "date_listed",
+}
+DEFAULT_SORT = "date_new"
+
+# Salt that keeps cursor tokens from being interchangeable with other signed values.
+CURSOR_SALT = "finalproject.pagination.cursor"
+
+
+class CachedCountPaginator(Paginator):
+    """
+    A Paginator that serves its total count from the cache instead of running COUNT(*) on every request.
+    Cached counts are keyed on the item generation, so any item change invalidates them; the timeout
+    bounds how stale they can get if a write goes unnoticed.
+
+    With estimate_limit set, counting stops after that many rows and the count is flagged as an estimate,
+    which keeps very broad searches from aggregating over the whole table.
+    """
+    def __init__(self, object_list, per_page, *args, estimate_limit=None, **kwargs):
+        super().__init__(object_list, per_page, *args, **kwargs)
+        self.estimate_limit = estimate_limit
+        self.count_is_estimate = False
+
+    def count_cache_key(self):
+        """
+        Builds a cache key from the item generation and the SQL of the counted queryset.
+        """
+        sql, params = self.object_list.query.sql_with_params()
+        digest = hashlib.md5(f"{sql}|{params!r}|{self.estimate_limit}".encode()).hexdigest()
+        return f"finalproject:item-count:{get_item_generation()}:{digest}"
+
+    def count_queryset(self):
+        """
+        Returns the queryset whose size is the count, bounded to estimate_limit + 1 rows when set.
+        """
+        if self.estimate_limit:
+            # Counts at most estimate_limit + 1 rows, enough to tell whether the limit was exceeded.
+            return self.object_list.order_by()[:self.estimate_limit + 1]
+        return self.object_list
+
+    def cap_count(self, count):
+        """
+        Applies the estimate limit to an exact (possibly bounded) count.
+        """
+        if self.estimate_limit and count > self.estimate_limit:
+            self.count_is_estimate = True
+            return self.estimate_limit
+        return count
+
+    @cached_property
+    def count(self):
+        """
+        Returns the (possibly estimated) number of objects, from the cache when available.
+        """
+        if not hasattr(self.object_list, "query"):
+            # Plain lists are cheap to count and have no SQL to key on.
+            return super().count
+
+        key = self.count_cache_key()
+        count = cache.get(key)
+        if count is None:
+            count = self.count_queryset().count()
+            cache.set(key, count, settings.ITEM_COUNT_CACHE_TIMEOUT)
+        return self.cap_count(count)
+
+    async def acount(self):
+        """
+        Async version of count, running the COUNT query through the async ORM.
+        """
+        key = await sync_to_async(self.count_cache_key)()
+        count = await cache.aget(key)
+        if count is None:
+            count = await self.count_queryset().acount()
+            await cache.aset(key, count, settings.ITEM_COUNT_CACHE_TIMEOUT)
+        return self.cap_count(count)
+
+    async def aget_page(self, number):
+        """
+        Async version of get_page(): counts and fetches the page's rows with the async ORM, so rendering
+        the page doesn't query the database.
+        """
+        if "count" not in self.__dict__:
+            # Fills in the count cached_property so get_page() doesn't compute it synchronously.
+            self.__dict__["count"] = await self.acount()
+        page = self.get_page(number)
+        page.object_list = [obj async for obj in page.object_list]
+        return page
+
+
+class KeysetPage:
+    """
+    A page of results produced by KeysetPaginator, with opaque tokens for the neighbouring pages.
+    """
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        """
+        Token for the page after this one, positioned after the last row shown.
+        """
+        if not self._has_next:
+            return None
+        return self.paginator.encode_cursor(self.object_list[-1], "next")
+
+    @property
+    def previous_cursor(self):
+        """
+        Token for the page before this one, positioned before the first row shown.
+        """
+        if not self._has_previous:
+            return None
+        return self.paginator.encode_cursor(self.object_list[0], "prev")
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset by seeking past the last seen (sort field, id) pair instead of using OFFSET.
+    No COUNT(*) is run, and every page is a single indexed range scan of per_page + 1 rows.
+    """
+    def __init__(self, queryset, per_page, ordering=SORT_ORDERINGS[DEFAULT_SORT]):
+        self.per_page = per_page
+        self.ordering = ordering
+        self.descending = ordering.startswith("-")
+        self.field_name = ordering.lstrip("-")
+        self.field = queryset.model._meta.get_field(self.field_name)
+        # The id tiebreaker makes the ordering total, so rows sharing a price or date are never skipped.
+        self.queryset = queryset.order_by(*self.order_by(reverse=False))
+
+    def order_by(self, reverse):
+        """
+        Returns the ORDER BY terms for walking forwards, or backwards when reverse is set.
+        """
+        prefix = "-" if self.descending != reverse else ""
+        return (f"{prefix}{self.field_name}", f"{prefix}id")
+
+    def encode_cursor(self, obj, direction):
+        """
+        Builds a signed, opaque token pointing just past obj in the given direction ('next' or 'prev').
+        """
+        return signing.dumps(
+            [self.ordering, self.field.value_to_string(obj), obj.pk, direction], salt=CURSOR_SALT, compress=True
+        )
+
+    def decode_cursor(self, cursor):
+        """
+        Returns (value, pk, direction) for a token, or None if it is missing, tampered with or was
+        issued for a different sort order (in which case the first page is shown).
+        """
+        if not cursor:
+            return None
+        try:
+            ordering, value, pk, direction = signing.loads(cursor, salt=CURSOR_SALT)
+        except (signing.BadSignature, ValueError, TypeError):
+            return None
+        if ordering != self.ordering or direction not in ("next", "prev"):
+            return None
+        return self.field.to_python(value), pk, direction
+
+    def page_queryset(self, cursor):
+        """
+        Returns (queryset, backwards) for the page addressed by the cursor token: the per_page + 1 rows to
+        fetch, and whether they are fetched walking backwards (None for the first page).
+        """
+        position = self.decode_cursor(cursor)
+        if position is None:
+            return self.queryset[:self.per_page + 1], None
+
+        value, pk, direction = position
+        backwards = direction == "prev"
+        # Rows strictly after the cursor in the direction of travel.
+        lookup = "gt" if self.descending == backwards else "lt"
+        after_cursor = (
+            Q(**{f"{self.field_name}__{lookup}": value})
+            | Q(**{self.field_name: value, f"id__{lookup}": pk})
+        )
+        queryset = self.queryset.filter(after_cursor).order_by(*self.order_by(reverse=backwards))
+        return queryset[:self.per_page + 1], backwards
+
+    def build_page(self, rows, backwards):
+        """
+        Builds the KeysetPage from the rows fetched by page_queryset().
+        """
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards is None:
+            return KeysetPage(rows, self, has_more, False)
+        if backwards:
+            # Rows were fetched walking backwards; flip them back into display order.
+            rows.reverse()
+            return KeysetPage(rows, self, True, has_more)
+        return KeysetPage(rows, self, has_more, True)
+
+    def page(self, cursor=None):
+        """
+        Returns the KeysetPage addressed by the cursor token (the first page when there is none).
+        """
+        queryset, backwards = self.page_queryset(cursor)
+        return self.build_page(list(queryset), backwards)
+
+    async def apage(self, cursor=None):
+        """
+        Async version of page(), fetching the rows with the async ORM.
+        """
+        queryset, backwards = self.page_queryset(cursor)
+        return self.build_page([obj async for obj in queryset], backwards)
+
+
+class CatalogPaginationMixin:
+    """
+    Paginates catalog listings, either by page number or, when cursor mode is enabled, by keyset cursor.
+    Cursor mode is on for every request when CATALOG_CURSOR_PAGINATION is set, or for a single request
+    that carries a 'cursor' parameter (an empty one asks for the first page).
+    """
+    paginate_by = 12
+    cursor_param = "cursor"
+    # Set to cap how far numbered pagination counts (see CachedCountPaginator).
+    count_estimate_limit = None
+    # The page already fetched by an async view through apaginate_items().
+    current_page = None
+
+    def get_sort_ordering(self):
+        """
+        Returns the field ordering selected by the 'sort' query parameter.
+        """
+        sort_option = self.request.GET.get("sort", "")
+        return SORT_ORDERINGS.get(sort_option, SORT_ORDERINGS[DEFAULT_SORT])
+
+    def uses_cursor_pagination(self):
+        """
+        Checks whether this request should be paginated with keyset cursors.
+        """
+        return settings.CATALOG_CURSOR_PAGINATION or self.cursor_param in self.request.GET
+
+    def paginate_items(self, queryset):
+        """
+        Returns the requested page of the queryset, as a Page or a KeysetPage.
+        """
+        if self.uses_cursor_pagination():
+            paginator = KeysetPaginator(queryset, self.paginate_by, self.get_sort_ordering())
+            return paginator.page(self.request.GET.get(self.cursor_param))
+        paginator = CachedCountPaginator(queryset, self.paginate_by, estimate_limit=self.count_estimate_limit)
+        return paginator.get_page(self.request.GET.get("page"))
+
+    async def apaginate_items(self, queryset):
+        """
+        Async version of paginate_items(); the returned page holds its rows already fetched.
+        """
+        if self.uses_cursor_pagination():
+            paginator = KeysetPaginator(queryset, self.paginate_by, self.get_sort_ordering())
+            return await paginator.apage(self.request.GET.get(self.cursor_param))
+        paginator = CachedCountPaginator(queryset, self.paginate_by, estimate_limit=self.count_estimate_limit)
+        return await paginator.aget_page(self.request.GET.get("page"))
+
+    def paginate_queryset(self, queryset, page_size):
+        """
+        ListView hook; returns (paginator, page, object_list, is_paginated) for either pagination mode.
+        Uses current_page when an async view has already fetched it.
+        """
+        page = self.current_page if self.current_page is not None else self.paginate_items(queryset)
+        return page.paginator, page, page.object_list, page.has_other_pages()
+
+    def get_pagination_context(self):
+        """
+        Returns the template variables shared by the pagination controls.
+        """
+        # Keeps the other query parameters (search query, sort order) on the page links.
+        params = self.request.GET.copy()
+        params.pop("page", None)
+        params.pop(self.cursor_param, None)
+        querystring = params.urlencode()
+        return {
+            "cursor_pagination": self.uses_cursor_pagination(),
+            "page_querystring": f"{querystring}&" if querystring else "",
+        }
+
+    def get_context_data(self, **kwargs):
+        """
+        Adds the pagination mode and the query string used to build page links.
+        """
+        context = super().get_context_data(**kwargs)
+        context.update(self.get_pagination_context())
+        return context
@@ -0,0 +1,131 @@
+# File: search.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Full-text search over item titles and descriptions. Uses an SQLite FTS5 index by default and a
+# Postgres tsvector/GIN expression index when running on Postgres, falling back to icontains elsewhere.
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+# Name of the SQLite FTS5 table that mirrors finalproject_item (created by migration 0009).
+FTS_TABLE = "finalproject_item_fts"
+
+# Triggers that keep the FTS5 table in sync with every insert, update and delete on finalproject_item,
+# including bulk_create() and queryset updates that never send model signals.
+SQLITE_TRIGGERS = {
+    "finalproject_item_fts_insert": f"""
+        CREATE TRIGGER finalproject_item_fts_insert AFTER INSERT ON finalproject_item BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    """,
+    "finalproject_item_fts_delete": f"""
+        CREATE TRIGGER finalproject_item_fts_delete AFTER DELETE ON finalproject_item BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+    """,
+    "finalproject_item_fts_update": f"""
+        CREATE TRIGGER finalproject_item_fts_update AFTER UPDATE OF title, description ON finalproject_item BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO {FTS_TABLE}(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    """,
+}
+
+# Text search configuration and document expression used by the Postgres GIN index.
+# The filter in search_items() must use this exact expression for the index to be chosen.
+PG_CONFIG = "english"
+PG_DOCUMENT = (
+    "to_tsvector('english', coalesce(finalproject_item.title, '') || ' ' || "
+    "coalesce(finalproject_item.description, ''))"
+)
+# Weighted document used only to rank the rows already matched by the index (titles count more than descriptions).
+PG_RANK_DOCUMENT = (
+    "setweight(to_tsvector('english', coalesce(finalproject_item.title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(finalproject_item.description, '')), 'B')"
+)
+
+# Column weights for bm25(): a term hit in the title counts ten times as much as one in the description.
+FTS_TITLE_WEIGHT = 10.0
+FTS_DESCRIPTION_WEIGHT = 1.0
+
+
+def install_search_triggers(schema_editor):
+    """
+    (Re)creates the FTS5 sync triggers and rebuilds the index from finalproject_item.
+    SQLite drops triggers when a migration remakes the item table, so migrations that alter Item call this again.
+    """
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for name, statement in SQLITE_TRIGGERS.items():
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        schema_editor.execute(statement)
+    schema_editor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def tokenize(query):
+    """
+    Splits a raw search query into word tokens, dropping punctuation and index query syntax.
+    """
+    return re.findall(r"\w+", query.lower())
+
+
+def search_backend():
+    """
+    Returns the name of the search backend available on the current database connection.
+    """
+    if connection.vendor == "sqlite":
+        return "fts5"
+    if connection.vendor == "postgresql":
+        return "tsvector"
+    return "icontains"
+
+
+def icontains_search(queryset, query):
+    """
+    Filters items whose title or description contain the query. This is the unindexed scan used before
+    the search index existed, kept as a fallback for other databases and as the benchmark baseline.
+    """
+    return queryset.filter(
+        Q(title__icontains=query) | Q(description__icontains=query)
+    ).distinct().order_by("-date_listed")
+
+
+def search_items(queryset, query):
+    """
+    Filters an Item queryset down to the rows matching the query, ordered by relevance.
+    Every token is treated as a prefix, so "guit" matches "guitar" and "guitars".
+    """
+    tokens = tokenize(query)
+    if not tokens:
+        # An empty query matches everything, as the old icontains search did.
+        return queryset.order_by("-date_listed")
+
+    backend = search_backend()
+    if backend == "fts5":
+        # '"guit"*' is an FTS5 prefix query; quoting each token keeps FTS5 operators out of user input.
+        match = " ".join(f'"{token}"*' for token in tokens)
+        return queryset.extra(
+            tables=[FTS_TABLE],
+            where=[f"{FTS_TABLE}.rowid = finalproject_item.id", f"{FTS_TABLE} MATCH %s"],
+            params=[match],
+            select={
+                # bm25() is lower for better matches, so results are ordered ascending.
+                "search_rank": f"bm25({FTS_TABLE}, {FTS_TITLE_WEIGHT}, {FTS_DESCRIPTION_WEIGHT})",
+            },
+            order_by=["search_rank", "-date_listed"],
+        )
+    if backend == "tsvector":
+        # 'guit:* & amp:*' requires every token, each matched as a prefix.
+        tsquery = " & ".join(f"{token}:*" for token in tokens)
+        return queryset.extra(
+            where=[f"{PG_DOCUMENT} @@ to_tsquery('{PG_CONFIG}', %s)"],
+            params=[tsquery],
+            select={"search_rank": f"ts_rank({PG_RANK_DOCUMENT}, to_tsquery('{PG_CONFIG}', %s))"},
+            select_params=[tsquery],
+            order_by=["-search_rank", "-date_listed"],
+        )
+    return icontains_search(queryset, query)
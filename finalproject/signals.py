@@ -0,0 +1,52 @@
+# File: signals.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Signal receivers that keep caches derived from the catalog and carts in step with model changes.
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .caching import bump_category_generation, bump_item_generation, invalidate_cart_summary
+from .models import Category, Item, Order
+from .suggestions import forget_item
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def item_changed(sender, instance, **kwargs):
+    """
+    Invalidates cached listing counts and pages whenever an item is saved or deleted.
+    """
+    bump_item_generation()
+
+
+@receiver(post_delete, sender=Item)
+def item_deleted(sender, instance, **kwargs):
+    """
+    Takes a deleted in-stock item out of its category's in-stock count and the search suggestions.
+    Runs inside the deletion's transaction, including for items deleted by a cascade.
+    """
+    if instance.quantity_available > 0:
+        Category.adjust_in_stock_counts({instance.category_id: -1})
+    # Logs the deletion once it commits, so the other processes' suggestions drop the item at their next sync.
+    item_id = instance.pk
+    transaction.on_commit(lambda: forget_item(item_id))
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def category_changed(sender, instance, **kwargs):
+    """
+    Invalidates cached pages that show categories whenever a category is saved or deleted.
+    """
+    bump_category_generation()
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+def order_changed(sender, instance, **kwargs):
+    """
+    Drops the buyer's cached cart summary once a change to their cart commits. Every cart change (adding,
+    removing or updating lines, discounts) saves the order.
+    """
+    if instance.status == "cart":
+        transaction.on_commit(lambda: invalidate_cart_summary(instance.buyer_id))
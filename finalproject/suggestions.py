@@ -0,0 +1,264 @@
+# File: suggestions.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Typeahead completions for the navbar search box, served from a per-process prefix index of
+# in-stock item titles. The index is loaded once per worker and reloaded in the background from time to time;
+# in between, the items changed or deleted since it was loaded are read incrementally and laid over it, so
+# completing a keystroke normally touches neither the database nor more than one cache key.
+import logging
+import threading
+import time
+from array import array
+from bisect import bisect_left
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+
+from .caching import get_item_generation, initial_generation
+from .models import Item
+from .search import tokenize
+
+logger = logging.getLogger(__name__)
+
+# Index keys are cut to this many characters; longer titles are still found by their first words.
+KEY_LENGTH = 48
+# Index entries examined per lookup, enough to fill the suggestions after dropping duplicate titles.
+SCAN_LIMIT = 200
+# Once this many items have changed since the index was loaded, a fresh index is loaded in the background.
+MAX_PENDING_CHANGES = 1_000
+# Shared log of deleted item ids, which other processes can't otherwise see: this key holds the sequence
+# number of the latest deletion, and f"{DELETED_KEY}:{n}" the id of deletion n.
+DELETED_KEY = "finalproject:suggest-deleted"
+
+
+def normalize(text):
+    """
+    Lowercases text and collapses it to space-separated word tokens, as used for index keys and lookups.
+    """
+    return " ".join(tokenize(text))
+
+
+def title_keys(title):
+    """
+    Returns the index keys of a title: the title from each of its words on, so "vintage guitar" is found
+    by "vin" and by "gui".
+    """
+    words = tokenize(title)
+    return {" ".join(words[start:])[:KEY_LENGTH] for start in range(len(words))}
+
+
+class PrefixIndex:
+    """
+    Index keys and the ids of the items they belong to, in parallel sorted arrays searched by bisection, with
+    the title of every indexed item. Never changed once built; changes are laid over it by Suggestions.
+    """
+    def __init__(self, titles=()):
+        self.titles = dict(titles)
+        order = sorted((key, item_id) for item_id, title in self.titles.items() for key in title_keys(title))
+        self.keys = [key for key, _ in order]
+        self.ids = array("q", [item_id for _, item_id in order])
+
+    def __len__(self):
+        return len(self.titles)
+
+    def find(self, prefix):
+        """
+        Returns the ids of the items with a key starting with prefix, from the first SCAN_LIMIT entries.
+        """
+        start = bisect_left(self.keys, prefix)
+        end = start
+        while end < min(start + SCAN_LIMIT, len(self.keys)) and self.keys[end].startswith(prefix):
+            end += 1
+        return self.ids[start:end]
+
+
+class Suggestions:
+    """
+    A process's suggestion index: the titles loaded from the database, overlaid with the items changed or
+    deleted since, and how far the item changes and the deletion log have been read.
+    Not thread-safe on its own; the module-level functions guard it with a lock.
+    """
+    def __init__(self, loaded, generation, watermark, deletions_seen):
+        self.loaded = loaded
+        # Item id -> title of items changed since loading, or None for items that left the index.
+        self.changed = {}
+        self.recent = PrefixIndex()
+        self.generation = generation
+        # (updated_at, id) of the last item change read; later changes are read by sync().
+        self.watermark = watermark
+        self.deletions_seen = deletions_seen
+        self.deletions_lost = False
+        self.loaded_at = time.monotonic()
+
+    def apply(self, changes):
+        """
+        Lays {item id: title, or None to drop it} over the index.
+        """
+        self.changed.update(changes)
+        self.recent = PrefixIndex((item_id, title) for item_id, title in self.changed.items() if title is not None)
+
+    def sync(self, generation):
+        """
+        Applies the items saved since the watermark (in-stock ones are indexed, sold-out ones dropped) and the
+        deletions logged since the last sync. Only the changed rows are read, through the updated_at index; a
+        write whose transaction commits after a later one was read is picked up at the next reload.
+        """
+        changes = {}
+        changed = Item.objects.order_by("updated_at", "id").values_list(
+            "id", "title", "quantity_available", "updated_at"
+        )
+        if self.watermark is not None:
+            updated_at, item_id = self.watermark
+            changed = changed.filter(Q(updated_at__gt=updated_at) | Q(updated_at=updated_at, id__gt=item_id))
+        for item_id, title, quantity_available, updated_at in changed:
+            changes[item_id] = title if quantity_available > 0 else None
+            self.watermark = (updated_at, item_id)
+        deletions = read_deletions(self.deletions_seen)
+        if deletions is None:
+            # Part of the log is gone, so only a fresh load can tell which items were deleted.
+            self.deletions_lost = True
+        else:
+            deleted_ids, self.deletions_seen = deletions
+            changes.update(dict.fromkeys(deleted_ids))
+        self.apply(changes)
+        self.generation = generation
+
+    def is_stale(self):
+        """
+        Checks whether a fresh index should be loaded in place of this one.
+        """
+        return (
+            self.deletions_lost
+            or len(self.changed) > MAX_PENDING_CHANGES
+            or time.monotonic() - self.loaded_at > settings.SEARCH_SUGGEST_REBUILD_INTERVAL
+        )
+
+    def complete(self, query, limit):
+        """
+        Returns up to limit distinct titles containing a word sequence that starts with the query. Titles
+        that start with the query come first, then the rest, each alphabetically.
+        """
+        prefix = normalize(query)[:KEY_LENGTH]
+        if not prefix:
+            return []
+        matches = {}
+        for item_id in self.recent.find(prefix):
+            title = self.recent.titles[item_id]
+            matches.setdefault(title.lower(), title)
+        for item_id in self.loaded.find(prefix):
+            if item_id not in self.changed:
+                title = self.loaded.titles[item_id]
+                matches.setdefault(title.lower(), title)
+        ranked = sorted(matches.values(), key=lambda title: (not normalize(title).startswith(prefix), title.lower()))
+        return ranked[:limit]
+
+
+def deletion_sequence():
+    """
+    Returns the sequence number of the latest logged deletion, starting the log if the cache has none.
+    """
+    # add() keeps a sequence another process started in the meantime.
+    cache.add(DELETED_KEY, initial_generation(), timeout=None)
+    return cache.get(DELETED_KEY)
+
+
+def record_deletion(item_id):
+    """
+    Logs a deleted item for the other processes' indexes. Entries expire after a rebuild interval, by which
+    time every process has loaded a fresh index anyway.
+    """
+    try:
+        sequence = cache.incr(DELETED_KEY)
+    except ValueError:
+        # The log was never started or has been evicted.
+        deletion_sequence()
+        sequence = cache.incr(DELETED_KEY)
+    cache.set(f"{DELETED_KEY}:{sequence}", item_id, timeout=settings.SEARCH_SUGGEST_REBUILD_INTERVAL)
+
+
+def read_deletions(seen):
+    """
+    Returns (deleted item ids, sequence number) for the deletions logged after sequence number seen, or None
+    if any of them is no longer in the cache (expired, evicted, or the log was restarted).
+    """
+    sequence = deletion_sequence()
+    # A reload is cheaper than reading back a very long log.
+    if sequence is None or sequence < seen or sequence - seen > MAX_PENDING_CHANGES:
+        return None
+    keys = [f"{DELETED_KEY}:{number}" for number in range(seen + 1, sequence + 1)]
+    deleted = cache.get_many(keys)
+    if len(deleted) < len(keys):
+        return None
+    return list(deleted.values()), sequence
+
+
+def load():
+    """
+    Loads every in-stock item title into a fresh Suggestions. Changes made while it loads are after its
+    watermark and log position, so the first sync applies them.
+    """
+    generation = get_item_generation()
+    deletions_seen = deletion_sequence()
+    watermark = Item.objects.order_by("-updated_at", "-id").values_list("updated_at", "id").first()
+    titles = Item.objects.filter(quantity_available__gt=0).values_list("id", "title").iterator(chunk_size=5000)
+    return Suggestions(PrefixIndex(titles), generation, watermark, deletions_seen)
+
+
+# This process's index. _lock guards it and is only held for syncs and lookups; _load_lock is held by the one
+# thread loading a new index, which is swapped in when it is ready.
+_suggestions = None
+_lock = threading.Lock()
+_load_lock = threading.Lock()
+
+
+def rebuild():
+    """
+    Loads a fresh index and swaps it in. Lookups keep using the old index while it loads.
+    """
+    global _suggestions
+    suggestions = load()
+    with _lock:
+        _suggestions = suggestions
+
+
+def rebuild_in_background():
+    """
+    Runs rebuild() on its own thread, which needs its own database connection. Holds _load_lock until done.
+    """
+    try:
+        rebuild()
+    except Exception:
+        logger.exception("Reloading the search suggestion index failed.")
+    finally:
+        connection.close()
+        _load_lock.release()
+
+
+def suggest(query, limit=None):
+    """
+    Returns title completions for the query. Only reads the item generation from the cache unless items have
+    changed since the last sync, in which case just those items and the deletion log are read. Only a
+    process's first lookup waits for its index to load.
+    """
+    generation = get_item_generation()
+    if _suggestions is None:
+        with _load_lock:
+            if _suggestions is None:
+                rebuild()
+    with _lock:
+        if _suggestions.generation != generation:
+            _suggestions.sync(generation)
+        if _suggestions.is_stale() and _load_lock.acquire(blocking=False):
+            threading.Thread(target=rebuild_in_background, daemon=True).start()
+        return _suggestions.complete(query, limit or settings.SEARCH_SUGGEST_LIMIT)
+
+
+def forget_item(item_id):
+    """
+    Drops a deleted item from this process's index and logs the deletion for the other processes.
+    """
+    record_deletion(item_id)
+    with _lock:
+        if _suggestions is not None:
+            _suggestions.apply({item_id: None})
@@ -0,0 +1,37 @@
+# File: card_tags.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Defines a template tag that renders a page of item cards from the cache.
+
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from ..caching import item_card_key
+
+# Register this module as a library of custom template tags/filters.
+register = template.Library()
+
+CARD_TEMPLATE = "includes/item_card.html"
+
+
+@register.simple_tag
+def item_cards(items):
+    """
+    Renders the listing card of every item, fetching all cached cards in one get_many round-trip and
+    rendering (and caching) only the ones that are missing.
+    """
+    items = list(items)
+    keys = {item.pk: item_card_key(item) for item in items}
+    cards = cache.get_many(keys.values())
+
+    missing = {}
+    for item in items:
+        if keys[item.pk] not in cards:
+            missing[keys[item.pk]] = render_to_string(CARD_TEMPLATE, {"item": item})
+    if missing:
+        cache.set_many(missing, settings.ITEM_CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+
+    return mark_safe("".join(cards[keys[item.pk]] for item in items))
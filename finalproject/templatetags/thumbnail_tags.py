@@ -0,0 +1,30 @@
+# File: thumbnail_tags.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Defines template tags that point responsive images at the resized variants of item images.
+
+from django import template
+from django.core.files.storage import default_storage
+
+from ..thumbnails import THUMBNAIL_WIDTHS, variant_name
+
+# Register this module as a library of custom template tags/filters.
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail_srcset(item, extension):
+    """
+    Returns a srcset listing every width of the item's image variants in the given format ('webp' or 'jpg').
+    """
+    return ", ".join(
+        f"{default_storage.url(variant_name(item.image.name, width, extension))} {width}w"
+        for width in THUMBNAIL_WIDTHS
+    )
+
+
+@register.simple_tag
+def thumbnail_url(item, width, extension="jpg"):
+    """
+    Returns the URL of one variant of the item's image.
+    """
+    return default_storage.url(variant_name(item.image.name, width, extension))
@@ -1,3 +1,1473 @@
-from django.test import TestCase
+# File: tests.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Tests for the marketplace platform.
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+from decimal import Decimal
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import OperationalError, connection
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.template import Context, Template
+from django.test import LiveServerTestCase, RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from PIL import Image as PILImage
+
+from . import suggestions, views
+from .caching import bump_category_generation, bump_item_generation
+from .category_cache import get_categories, in_stock_categories
+from .forms import ItemForm
+from .instrumentation import RequestInstrumentationMiddleware
+from .models import Category, Discount, Item, Order, OrderItem, UserProfile
+from .pagination import KeysetPaginator
+from .search import FTS_TABLE, search_items
+from .thumbnails import THUMBNAIL_WIDTHS, mark_thumbnails_ready, render_variants, schedule_thumbnails
+
+
+def create_item(seller, category, quantity_available=1, price="10.00", title="Item"):
+    """
+    Creates an item for sale with the given stock.
+    """
+    return Item.objects.create(
+        title=title, description="", price=Decimal(price), seller=seller, category=category,
+        quantity_available=quantity_available, image="items/item.jpg",
+    )
+
+
+def create_cart(buyer, lines):
+    """
+    Creates a cart for the buyer holding the given (item, quantity) lines.
+    """
+    order = Order.objects.create(buyer=buyer, status="cart")
+    for item, quantity in lines:
+        OrderItem.objects.create(order=order, item=item, quantity=quantity, unit_price=item.price, title=item.title)
+    return order
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    Tests the keyset (cursor) pagination of the catalog listings.
+    """
+    def setUp(self):
+        cache.clear()
+        seller = User.objects.create(username="seller")
+        self.category = Category.objects.create(name="Music", description="")
+        self.items = [create_item(seller, self.category, title=f"Guitar {n}") for n in range(5)]
+
+    def test_round_trip_across_equal_sort_values(self):
+        # Every item has the same price, so only the id tiebreaker orders them.
+        paginator = KeysetPaginator(Item.objects.all(), 2, "price")
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+
+        pages = [[item.pk for item in page] for page in (first, second, third)]
+        self.assertEqual(sum(pages, []), sorted(item.pk for item in self.items))
+        self.assertFalse(third.has_next())
+        self.assertEqual([item.pk for item in paginator.page(third.previous_cursor)], pages[1])
+        back = paginator.page(second.previous_cursor)
+        self.assertEqual([item.pk for item in back], pages[0])
+        self.assertFalse(back.has_previous())
+
+    def test_tampered_or_foreign_cursors_show_the_first_page(self):
+        paginator = KeysetPaginator(Item.objects.all(), 2, "price")
+        cursor = paginator.page().next_cursor
+        first_page = [item.pk for item in paginator.page()]
+
+        self.assertEqual([item.pk for item in paginator.page(cursor[:-2] + "xx")], first_page)
+        descending = KeysetPaginator(Item.objects.all(), 2, "-price")
+        self.assertEqual(
+            [item.pk for item in descending.page(cursor)], [item.pk for item in descending.page()]
+        )
+
+    def test_listing_cursor_links(self):
+        create_item(User.objects.get(username="seller"), self.category, title="Guitar 5")
+        url = reverse("item_list")
+        with self.settings(CATALOG_CURSOR_PAGINATION=False):
+            # An empty cursor parameter asks for the first page in cursor mode.
+            response = self.client.get(url, {"cursor": ""})
+            self.assertTrue(response.context["cursor_pagination"])
+            self.assertEqual(len(response.context["items"]), 6)
+            self.assertFalse(response.context["is_paginated"])
+
+            with mock.patch.object(views.ItemListView, "paginate_by", 4):
+                # A new sort order, so the anonymous page cache doesn't serve the page rendered above.
+                response = self.client.get(url, {"cursor": "", "sort": "date_old"})
+                self.assertContains(response, 'aria-label="Next"')
+                self.assertNotContains(response, 'aria-label="Previous"')
+                response = self.client.get(
+                    url, {"cursor": response.context["page_obj"].next_cursor, "sort": "date_old"}
+                )
+                self.assertEqual(len(response.context["items"]), 2)
+                self.assertContains(response, 'aria-label="Previous"')
+                self.assertNotContains(response, 'aria-label="Next"')
+
+
+class CachedCountPaginatorTests(TestCase):
+    """
+    Tests that listing counts are cached per item generation and capped for broad searches.
+    """
+    def setUp(self):
+        cache.clear()
+        self.seller = User.objects.create(username="seller")
+        self.category = Category.objects.create(name="Music", description="")
+        for n in range(5):
+            create_item(self.seller, self.category, title=f"Guitar {n}")
+
+    def count_queries(self, url):
+        # Logged in, so the anonymous page cache doesn't answer the request.
+        self.client.force_login(self.seller)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        # The facet counts are a separate (GROUP BY) query with their own cache.
+        counts = [query["sql"] for query in queries if "COUNT(" in query["sql"] and "GROUP BY" not in query["sql"]]
+        return response.context["paginator"].count, len(counts)
+
+    def test_count_is_cached_until_items_change(self):
+        url = reverse("item_list")
+        with mock.patch.object(views.ItemListView, "paginate_by", 2):
+            self.assertEqual(self.count_queries(f"{url}?page=1"), (5, 1))
+            self.assertEqual(self.count_queries(f"{url}?page=2"), (5, 0))
+
+            create_item(self.seller, self.category, title="Guitar 5")
+            self.assertEqual(self.count_queries(f"{url}?page=2"), (6, 1))
+
+            # Queryset updates don't bump the generation by themselves, so the cached count stays until they do.
+            Item.objects.filter(title="Guitar 5").update(quantity_available=0)
+            self.assertEqual(self.count_queries(f"{url}?page=2"), (6, 0))
+            bump_item_generation()
+            self.assertEqual(self.count_queries(f"{url}?page=2"), (5, 1))
+
+    def test_broad_search_counts_are_estimated(self):
+        with mock.patch.object(views.SearchView, "count_estimate_limit", 3):
+            response = self.client.get(reverse("search"), {"q": "guitar"})
+        self.assertTrue(response.context["paginator"].count_is_estimate)
+        self.assertContains(response, "About 3+ results")
+
+        with mock.patch.object(views.SearchView, "count_estimate_limit", 5):
+            response = self.client.get(reverse("search"), {"q": "guitar", "sort": "price_asc"})
+        self.assertFalse(response.context["paginator"].count_is_estimate)
+        self.assertContains(response, "5 results")
+
+
+class CheckoutTests(TestCase):
+    """
+    Tests the stock handling of Order.checkout().
+    """
+    def setUp(self):
+        self.seller = User.objects.create(username="seller")
+        self.buyer = User.objects.create(username="buyer")
+        self.category = Category.objects.create(name="Music", description="")
+
+    def test_checkout_decrements_stock_and_ships(self):
+        guitar = create_item(self.seller, self.category, quantity_available=3)
+        order = create_cart(self.buyer, [(guitar, 2)])
+
+        order.checkout()
+
+        guitar.refresh_from_db()
+        order.refresh_from_db()
+        self.assertEqual(guitar.quantity_available, 1)
+        self.assertEqual(order.status, "shipped")
+
+    def test_checkout_is_all_or_nothing(self):
+        guitar = create_item(self.seller, self.category, quantity_available=5, title="Guitar")
+        amp = create_item(self.seller, self.category, quantity_available=1, title="Amp")
+        order = create_cart(self.buyer, [(guitar, 2), (amp, 2)])
+
+        with self.assertRaisesMessage(ValueError, "Not enough stock for Amp."):
+            order.checkout()
+
+        guitar.refresh_from_db()
+        amp.refresh_from_db()
+        order.refresh_from_db()
+        self.assertEqual(guitar.quantity_available, 5)
+        self.assertEqual(amp.quantity_available, 1)
+        self.assertEqual(order.status, "cart")
+
+    def test_checkout_query_count_does_not_grow_with_lines(self):
+        # Status update, price check, line totals, stock update and the sold-out category counts, plus the
+        # savepoint pair the test transaction adds.
+        small = create_cart(self.buyer, [(create_item(self.seller, self.category), 1)])
+        with self.assertNumQueries(8):
+            small.checkout()
+
+        other_buyer = User.objects.create(username="other")
+        large = create_cart(other_buyer, [(create_item(self.seller, self.category), 1) for _ in range(20)])
+        with self.assertNumQueries(8):
+            large.checkout()
+
+    def test_zero_quantity_line_of_a_sold_out_item_keeps_category_counts(self):
+        sold_out = create_item(self.seller, self.category, quantity_available=0)
+        create_item(self.seller, self.category, quantity_available=1)
+        order = create_cart(self.buyer, [(sold_out, 0)])
+
+        order.checkout()
+
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.in_stock_item_count, 1)
+
+    def test_cart_cannot_be_checked_out_twice(self):
+        order = create_cart(self.buyer, [(create_item(self.seller, self.category, quantity_available=2), 1)])
+        order.checkout()
+        with self.assertRaisesMessage(ValueError, "already been placed"):
+            Order.objects.get(pk=order.pk).checkout()
+
+
+class CategoryCounterTests(TestCase):
+    """
+    Tests that Category.in_stock_item_count follows item changes.
+    """
+    def setUp(self):
+        self.seller = User.objects.create(username="seller")
+        self.music = Category.objects.create(name="Music", description="")
+        self.books = Category.objects.create(name="Books", description="")
+
+    def assertCounts(self, music, books):
+        self.music.refresh_from_db()
+        self.books.refresh_from_db()
+        self.assertEqual((self.music.in_stock_item_count, self.books.in_stock_item_count), (music, books))
+
+    def test_counter_follows_item_changes(self):
+        guitar = create_item(self.seller, self.music, quantity_available=2)
+        create_item(self.seller, self.music, quantity_available=0)
+        self.assertCounts(1, 0)
+
+        guitar.category = self.books
+        guitar.save()
+        self.assertCounts(0, 1)
+
+        guitar.quantity_available = 0
+        guitar.save()
+        self.assertCounts(0, 0)
+
+        guitar.quantity_available = 3
+        guitar.save()
+        guitar.delete()
+        self.assertCounts(0, 0)
+
+    def test_checkout_that_sells_out_decrements_counter(self):
+        last = create_item(self.seller, self.music, quantity_available=1)
+        spare = create_item(self.seller, self.music, quantity_available=5)
+        create_cart(User.objects.create(username="buyer"), [(last, 1), (spare, 1)]).checkout()
+        self.assertCounts(1, 0)
+
+    def test_drifted_counter_stops_at_zero(self):
+        guitar = create_item(self.seller, self.music, quantity_available=2)
+        Category.objects.filter(pk=self.music.pk).update(in_stock_item_count=0)
+
+        guitar.quantity_available = 0
+        guitar.save()
+        self.assertCounts(0, 0)
+
+    def test_reconcile_fixes_drift(self):
+        create_item(self.seller, self.music, quantity_available=2)
+        Category.objects.filter(pk=self.music.pk).update(in_stock_item_count=7)
+        call_command("reconcile_category_counts", stdout=StringIO())
+        self.assertCounts(1, 0)
+
+
+class DiscountRedemptionTests(TestCase):
+    """
+    Tests that Discount.redeem() enforces usage limits, with and without counter shards.
+    """
+    def create_discount(self, **kwargs):
+        return Discount.objects.create(code="SAVE10", discount_type="percentage", amount=Decimal("10"), **kwargs)
+
+    def test_redeem_stops_at_usage_limit(self):
+        discount = self.create_discount(usage_limit=2)
+        discount.redeem()
+        discount.redeem()
+        with self.assertRaisesMessage(ValueError, "reached its usage limit"):
+            discount.redeem()
+        discount.refresh_from_db()
+        self.assertEqual(discount.used_count, 2)
+        self.assertFalse(discount.is_valid())
+
+    def test_sharded_redeem_stops_at_usage_limit(self):
+        discount = self.create_discount(usage_limit=5, shard_count=3)
+        for _ in range(5):
+            discount.redeem()
+        with self.assertRaisesMessage(ValueError, "reached its usage limit"):
+            discount.redeem()
+        self.assertEqual(discount.times_used(), 5)
+
+    def test_resharding_keeps_the_limit(self):
+        discount = self.create_discount(usage_limit=6, shard_count=2)
+        for _ in range(3):
+            discount.redeem()
+        discount.shard_count = 4
+        discount.save()
+        for _ in range(3):
+            discount.redeem()
+        with self.assertRaises(ValueError):
+            discount.redeem()
+
+        discount.shard_count = 0
+        discount.save()
+        discount.refresh_from_db()
+        self.assertEqual(discount.used_count, 6)
+        self.assertFalse(discount.counter_shards.exists())
+
+    def test_saving_a_stale_copy_keeps_recorded_uses(self):
+        for shard_count in (0, 2):
+            with self.subTest(shard_count=shard_count):
+                Discount.objects.filter(code="SAVE10").delete()
+                self.create_discount(usage_limit=2, shard_count=shard_count)
+                stale = Discount.objects.get(code="SAVE10")
+                Discount.objects.get(code="SAVE10").redeem()
+                Discount.objects.get(code="SAVE10").redeem()
+
+                # An admin edit made from a form loaded before the redemptions.
+                stale.expiration_date = timezone.now() + timedelta(days=7)
+                stale.save()
+
+                discount = Discount.objects.get(code="SAVE10")
+                self.assertEqual(discount.times_used(), 2)
+                self.assertIsNotNone(discount.expiration_date)
+                with self.assertRaisesMessage(ValueError, "reached its usage limit"):
+                    stale.redeem()
+
+    def test_used_count_cannot_be_saved_directly(self):
+        discount = self.create_discount(usage_limit=2)
+        discount.used_count = 0
+        with self.assertRaisesMessage(ValueError, "used_count can't be saved"):
+            discount.save(update_fields=["used_count"])
+
+        self.client.force_login(User.objects.create(username="admin", is_staff=True, is_superuser=True))
+        response = self.client.get(reverse("admin:finalproject_discount_change", args=[discount.pk]))
+        self.assertNotIn("used_count", response.context["adminform"].form.fields)
+
+    def test_sharded_redeem_checks_the_stored_active_flag(self):
+        discount = self.create_discount(shard_count=2)
+        Discount.objects.filter(pk=discount.pk).update(active=False)
+
+        with self.assertRaises(ValueError):
+            discount.redeem()
+        self.assertEqual(discount.times_used(), 0)
+
+    def test_checkout_fails_when_discount_is_used_up(self):
+        seller = User.objects.create(username="seller")
+        item = create_item(seller, Category.objects.create(name="Music", description=""), quantity_available=2)
+        order = create_cart(User.objects.create(username="buyer"), [(item, 1)])
+        order.discount = self.create_discount(usage_limit=1, used_count=1)
+        order.save()
+
+        with self.assertRaisesMessage(ValueError, "reached its usage limit"):
+            order.checkout()
+        item.refresh_from_db()
+        self.assertEqual(item.quantity_available, 2)
+
+
+class CheckoutConcurrencyTests(TransactionTestCase):
+    """
+    Runs many checkouts for the same item at once and checks that stock is never oversold.
+    """
+    buyers = 20
+    stock = 5
+
+    def run_concurrently(self, action, targets):
+        """
+        Calls action(target) for every target, each in its own thread, all released at the same moment.
+        Returns the outcomes: "placed" on success, "out of stock" when action raised ValueError.
+        """
+        start = threading.Barrier(len(targets))
+        outcomes = []
+
+        def run(target):
+            try:
+                start.wait()
+                for _ in range(50):
+                    try:
+                        action(target)
+                        outcomes.append("placed")
+                    except ValueError:
+                        outcomes.append("out of stock")
+                    except OperationalError:
+                        # SQLite reports lock contention instead of waiting; try again.
+                        time.sleep(0.01)
+                        continue
+                    return
+                outcomes.append("gave up")
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=run, args=(target,)) for target in targets]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return outcomes
+
+    def test_concurrent_checkouts_never_oversell(self):
+        seller = User.objects.create(username="seller")
+        category = Category.objects.create(name="Music", description="")
+        item = create_item(seller, category, quantity_available=self.stock)
+        carts = [
+            create_cart(User.objects.create(username=f"buyer{n}"), [(item, 1)]) for n in range(self.buyers)
+        ]
+
+        outcomes = self.run_concurrently(lambda order: order.checkout(), carts)
+
+        item.refresh_from_db()
+        self.assertEqual(outcomes.count("placed"), self.stock)
+        self.assertEqual(outcomes.count("out of stock"), self.buyers - self.stock)
+        self.assertEqual(item.quantity_available, 0)
+        self.assertEqual(Order.objects.filter(status="shipped").count(), self.stock)
+
+    def test_concurrent_redemptions_respect_usage_limit(self):
+        for shard_count in (0, 4):
+            discount = Discount.objects.create(
+                code=f"PROMO{shard_count}", discount_type="fixed", amount=Decimal("5"),
+                usage_limit=self.stock, shard_count=shard_count,
+            )
+            outcomes = self.run_concurrently(lambda d: d.redeem(), [discount] * self.buyers)
+            self.assertEqual(outcomes.count("placed"), self.stock)
+            self.assertEqual(Discount.objects.get(pk=discount.pk).times_used(), self.stock)
+
+
+class CartTotalTests(TestCase):
+    """
+    Tests that cart changes keep the order total up to date without re-reading every line.
+    """
+    def setUp(self):
+        seller = User.objects.create(username="seller")
+        category = Category.objects.create(name="Music", description="")
+        self.guitar = create_item(seller, category, quantity_available=10, price="100.00", title="Guitar")
+        self.amp = create_item(seller, category, quantity_available=10, price="40.00", title="Amp")
+        self.order = Order.objects.create(buyer=User.objects.create(username="buyer"), status="cart")
+
+    def assertTotalsConsistent(self):
+        order = Order.objects.get(pk=self.order.pk)
+        subtotal, total = order.subtotal_amount, order.total_amount
+        order.calculate_total()
+        self.assertEqual((subtotal, total), (order.subtotal_amount, order.total_amount))
+
+    def test_cart_changes_keep_totals_consistent(self):
+        self.order.add_item(self.guitar, 1)
+        self.order.add_item(self.amp, 2)
+        self.order.add_item(self.guitar, 1)
+        self.assertEqual(self.order.total_amount, Decimal("280.00"))
+        self.assertTotalsConsistent()
+
+        amp_line = self.order.orderitem_set.get(item=self.amp)
+        self.order.update_quantity(amp_line.id, 1)
+        self.assertEqual(self.order.total_amount, Decimal("240.00"))
+
+        Discount.objects.create(code="SAVE10", discount_type="percentage", amount=Decimal("10"))
+        self.order.apply_discount_code("SAVE10")
+        self.assertEqual(self.order.total_amount, Decimal("216.00"))
+        self.assertTotalsConsistent()
+
+        self.order.remove_item(amp_line.id)
+        self.assertEqual(self.order.total_amount, Decimal("180.00"))
+        self.order.remove_discount()
+        self.assertEqual(self.order.total_amount, Decimal("200.00"))
+        self.assertTotalsConsistent()
+
+    def test_adding_an_item_does_not_read_the_other_lines(self):
+        # Line insert and subtotal update, plus the savepoints of the nested transactions.
+        self.order.add_item(self.guitar, 1)
+        with self.assertNumQueries(11):
+            self.order.add_item(self.amp, 1)
+
+        for n in range(10):
+            self.order.add_item(create_item(self.guitar.seller, self.guitar.category, title=f"Pick {n}"), 1)
+        strap = create_item(self.guitar.seller, self.guitar.category, title="Strap")
+        with self.assertNumQueries(11):
+            self.order.add_item(strap, 1)
+        self.assertTotalsConsistent()
+
+    def test_update_quantities_in_one_batch(self):
+        self.order.add_item(self.guitar, 1)
+        self.order.add_item(self.amp, 1)
+        lines = {line.item_id: line.id for line in self.order.orderitem_set.all()}
+
+        # One read of the lines, one bulk write and the subtotal update, plus savepoints.
+        with self.assertNumQueries(9):
+            self.order.update_quantities({lines[self.guitar.id]: 2, lines[self.amp.id]: 3})
+        self.assertEqual(self.order.total_amount, Decimal("320.00"))
+        self.assertTotalsConsistent()
+
+        with self.assertRaisesMessage(ValueError, "exceeds available stock for Amp."):
+            self.order.update_quantities({lines[self.guitar.id]: 1, lines[self.amp.id]: 11})
+        self.assertEqual(self.order.orderitem_set.get(item=self.guitar).quantity, 2)
+        self.assertTotalsConsistent()
+
+    def test_cart_update_rejects_quantities_below_one(self):
+        self.order.add_item(self.guitar, 1)
+        self.order.add_item(self.amp, 1)
+        lines = {line.item_id: line.id for line in self.order.orderitem_set.all()}
+        self.client.force_login(self.order.buyer)
+
+        for quantity in ("0", "-1"):
+            with self.subTest(quantity=quantity):
+                response = self.client.post(reverse("update_cart"), {
+                    f"quantity_{lines[self.guitar.id]}": "2", f"quantity_{lines[self.amp.id]}": quantity,
+                }, follow=True)
+                self.assertContains(response, "Quantities must be at least 1.")
+                self.assertEqual(
+                    sorted(self.order.orderitem_set.values_list("quantity", flat=True)), [1, 1]
+                )
+        self.assertTotalsConsistent()
+
+
+class ProfileViewTests(TestCase):
+    """
+    Tests that the profile page is built from the same number of queries however many orders it lists.
+    """
+    def setUp(self):
+        cache.clear()
+        self.buyer = User.objects.create(username="buyer")
+        UserProfile.objects.create(user=self.buyer, address="1 Main St")
+        seller = User.objects.create(username="seller")
+        category = Category.objects.create(name="Music", description="")
+        self.items = [
+            create_item(seller, category, quantity_available=50, title=f"Guitar {n}") for n in range(3)
+        ]
+        self.client.force_login(self.buyer)
+
+    def place_orders(self, count):
+        for _ in range(count):
+            create_cart(self.buyer, [(item, 2) for item in self.items]).checkout()
+
+    def test_query_count_does_not_grow_with_orders(self):
+        # Session, user, profile, the two page counts, the page of orders with their totals, and their lines.
+        self.place_orders(1)
+        self.client.get(reverse("profile"))  # Fills the navbar's category and cart summary caches.
+        with self.assertNumQueries(7):
+            self.client.get(reverse("profile"))
+
+        self.place_orders(9)
+        with self.assertNumQueries(7):
+            response = self.client.get(reverse("profile"))
+        self.assertEqual(len(response.context["purchase_orders"]), 10)
+        self.assertContains(response, "Guitar 2 (Quantity: 2)", count=10)
+
+
+class QueryPlanTests(TestCase):
+    """
+    Runs EXPLAIN on every query the catalog, cart and profile pages make against a seeded catalog and
+    fails if any of them reads a whole marketplace table instead of using an index.
+    """
+    # Tables that grow with the marketplace; a full scan of any of them is a regression.
+    hot_tables = ("finalproject_item", "finalproject_order", "finalproject_orderitem", "finalproject_category")
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.buyer = User.objects.create(username="buyer")
+        UserProfile.objects.create(user=cls.buyer, address="1 Main St")
+        seller = User.objects.create(username="seller")
+        categories = Category.objects.bulk_create(
+            [Category(name=f"Category {n}", description="") for n in range(20)]
+        )
+        Item.objects.bulk_create([
+            Item(
+                title=f"Item {n}", description="vintage guitar" if n % 7 == 0 else "", price=Decimal(n % 500),
+                seller=seller, category=categories[n % len(categories)], quantity_available=n % 5,
+                image="items/item.jpg",
+            )
+            for n in range(2000)
+        ])
+        call_command("reconcile_category_counts", stdout=StringIO())
+        cls.category = categories[0]
+        in_stock = list(Item.objects.filter(quantity_available__gt=0)[:3])
+        for n in range(30):
+            create_cart(User.objects.create(username=f"other{n}"), [(item, 1) for item in in_stock])
+        create_cart(cls.buyer, [(item, 1) for item in in_stock])
+
+    def full_scans(self, sql):
+        """
+        Returns the hot tables that the plan for sql reads in full.
+        """
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                plan = [row[-1] for row in cursor.fetchall()]
+                # "SCAN finalproject_item" is a full scan; "SCAN ... USING INDEX" walks an index instead.
+                # Older SQLite versions write "SCAN TABLE finalproject_item".
+                matches = [re.match(r"SCAN (?:TABLE )?(\w+)", line) for line in plan if "USING" not in line]
+                scanned = [match.group(1) for match in matches if match]
+            else:
+                # Small test tables make sequential scans look cheap; only fall back to one when no index fits.
+                cursor.execute("SET LOCAL enable_seqscan = off")
+                cursor.execute(f"EXPLAIN {sql}")
+                plan = [row[0] for row in cursor.fetchall()]
+                scanned = [line.split("Seq Scan on ")[1].split()[0] for line in plan if "Seq Scan on " in line]
+        return [table for table in scanned if table in self.hot_tables]
+
+    def assertNoFullScans(self, url):
+        self.client.force_login(self.buyer)
+        # Starts from empty caches so cached counts (listing totals, facets) are queried and explained too.
+        cache.clear()
+        # Loading the per-process category cache reads the whole (small) table once per category change,
+        # not once per page.
+        get_categories()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        for query in queries.captured_queries:
+            if query["sql"].startswith("SELECT"):
+                scans = self.full_scans(query["sql"])
+                self.assertFalse(scans, f"{url} fully scans {', '.join(scans)}:\n{query['sql']}")
+
+    def test_item_list(self):
+        for sort in ("date_new", "date_old", "price_asc", "price_desc"):
+            with self.subTest(sort=sort):
+                self.assertNoFullScans(f"{reverse('item_list')}?sort={sort}&page=3")
+                self.assertNoFullScans(f"{reverse('item_list')}?sort={sort}&cursor=")
+
+    def test_category_pages(self):
+        self.assertNoFullScans(reverse("category_list"))
+        for sort in ("date_new", "price_asc"):
+            with self.subTest(sort=sort):
+                self.assertNoFullScans(f"{reverse('category_detail', args=[self.category.pk])}?sort={sort}")
+
+    def test_search(self):
+        self.assertNoFullScans(f"{reverse('search')}?q=vintage+guitar")
+        self.assertNoFullScans(f"{reverse('search')}?q=")
+
+    def test_cart_and_profile(self):
+        self.assertNoFullScans(reverse("view_cart"))
+        self.assertNoFullScans(reverse("profile"))
+
+
+class ItemCardCacheTests(TestCase):
+    """
+    Tests that listing cards are served from the cache and replaced when their item changes.
+    """
+    def setUp(self):
+        cache.clear()
+        seller = User.objects.create(username="seller")
+        category = Category.objects.create(name="Music", description="")
+        self.items = [create_item(seller, category, title=f"Guitar {n}") for n in range(3)]
+
+    def render(self):
+        return Template("{% load card_tags %}{% item_cards items %}").render(Context({"items": self.items}))
+
+    def test_cards_are_cached_and_follow_edits(self):
+        first = self.render()
+        self.assertIn("Guitar 0", first)
+        with mock.patch("finalproject.templatetags.card_tags.render_to_string") as render_card:
+            self.assertEqual(self.render(), first)
+        render_card.assert_not_called()
+
+        self.items[1].title = "Bass"
+        self.items[1].save()
+        second = self.render()
+        self.assertIn("Bass", second)
+        self.assertNotIn("Guitar 1", second)
+
+
+class AnonymousPageCacheTests(TestCase):
+    """
+    Tests the whole-page cache and conditional GET support for logged-out visitors.
+    """
+    def setUp(self):
+        cache.clear()
+        self.category = Category.objects.create(name="Music", description="")
+        self.item = create_item(User.objects.create(username="seller"), self.category, title="Guitar")
+
+    def test_repeat_visit_is_served_from_cache_and_revalidated(self):
+        url = reverse("item_detail", args=[self.item.pk])
+        first = self.client.get(url)
+        self.assertContains(first, "Guitar")
+        self.assertTrue(first.has_header("ETag"))
+        self.assertTrue(first.has_header("Last-Modified"))
+
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url).content, first.content)
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_item_and_category_changes_invalidate_pages(self):
+        url = reverse("item_detail", args=[self.item.pk])
+        etag = self.client.get(url)["ETag"]
+
+        self.item.title = "Bass"
+        self.item.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertContains(response, "Bass")
+        self.assertNotEqual(response["ETag"], etag)
+
+        self.category.name = "Instruments"
+        self.category.save()
+        self.assertContains(self.client.get(url), "Instruments")
+
+    def test_logged_in_visitors_bypass_the_cache(self):
+        url = reverse("item_list")
+        self.client.get(url)
+        self.client.force_login(User.objects.create(username="buyer"))
+        response = self.client.get(url)
+        self.assertFalse(response.has_header("ETag"))
+        self.assertContains(response, "Logout")
+
+
+class ThumbnailTests(TestCase):
+    """
+    Tests the resized image variants generated for item uploads.
+    """
+    def upload(self, size=(1200, 800)):
+        buffer = BytesIO()
+        PILImage.new("RGB", size, "red").save(buffer, "JPEG")
+        return SimpleUploadedFile("guitar.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+    def test_variants_cover_every_width_and_format(self):
+        variants = render_variants("items/guitar.jpg", self.upload().read())
+        self.assertEqual(len(variants), len(THUMBNAIL_WIDTHS) * 2)
+        with PILImage.open(BytesIO(variants["thumbnails/items/guitar-320w.webp"])) as variant:
+            self.assertEqual((variant.format, variant.size), ("WEBP", (320, 213)))
+        with PILImage.open(BytesIO(variants["thumbnails/items/guitar-960w.jpg"])) as variant:
+            self.assertEqual((variant.format, variant.width), ("JPEG", 960))
+
+    def test_new_upload_is_queued_and_resets_ready_flag(self):
+        category = Category.objects.create(name="Music", description="")
+        item = create_item(User.objects.create(username="seller"), category)
+        Item.objects.filter(pk=item.pk).update(thumbnails_ready=True)
+        item.refresh_from_db()
+        data = {"title": "Guitar", "description": "Red", "price": "10.00", "category": category.pk,
+                "quantity_available": 1}
+
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            with mock.patch("finalproject.forms.schedule_thumbnails") as schedule:
+                with self.captureOnCommitCallbacks(execute=True):
+                    ItemForm(data, {"image": self.upload()}, instance=item).save()
+        schedule.assert_called_once_with(item)
+        self.assertFalse(Item.objects.get(pk=item.pk).thumbnails_ready)
+
+    def test_failed_variants_are_logged(self):
+        category = Category.objects.create(name="Music", description="")
+        item = create_item(User.objects.create(username="seller"), category)
+        failed = Future()
+        failed.set_exception(OSError("No space left on device"))
+
+        with tempfile.TemporaryDirectory() as media_root, self.settings(MEDIA_ROOT=media_root):
+            os.makedirs(f"{media_root}/items")
+            with open(f"{media_root}/{item.image.name}", "wb") as image_file:
+                image_file.write(self.upload().read())
+            # The callback closes its thread's connection, which here is the test's own.
+            with mock.patch("finalproject.thumbnails.get_executor") as get_executor:
+                get_executor.return_value.submit.return_value = failed
+                with mock.patch("finalproject.thumbnails.connection"):
+                    with self.assertLogs("finalproject.thumbnails", "ERROR") as logs:
+                        schedule_thumbnails(item)
+
+        self.assertIn(f"Generating thumbnails for item {item.pk} (items/item.jpg) failed.", logs.output[0])
+        self.assertIsInstance(logs.records[0].exc_info[1], OSError)
+        self.assertFalse(Item.objects.get(pk=item.pk).thumbnails_ready)
+
+    def test_variants_of_a_replaced_image_are_not_marked_ready(self):
+        category = Category.objects.create(name="Music", description="")
+        item = create_item(User.objects.create(username="seller"), category)
+        Item.objects.filter(pk=item.pk).update(image="items/new.jpg")
+        self.assertEqual(mark_thumbnails_ready([(item.pk, "items/old.jpg")]), 0)
+        self.assertFalse(Item.objects.get(pk=item.pk).thumbnails_ready)
+
+        self.assertEqual(mark_thumbnails_ready([(item.pk, "items/new.jpg")]), 1)
+        self.assertTrue(Item.objects.get(pk=item.pk).thumbnails_ready)
+
+
+class ImportItemsTests(TestCase):
+    """
+    Tests the import_items bulk import command.
+    """
+    def setUp(self):
+        self.seller = User.objects.create(username="seller")
+        self.music = Category.objects.create(name="Music", description="")
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        with open(f"{self.directory.name}/guitar.jpg", "wb") as image_file:
+            image_file.write(b"jpeg")
+
+    def run_import(self, filename, content):
+        path = f"{self.directory.name}/{filename}"
+        with open(path, "w") as input_file:
+            input_file.write(content)
+        stdout, stderr = StringIO(), StringIO()
+        with self.settings(MEDIA_ROOT=f"{self.directory.name}/media"):
+            call_command("import_items", path, seller="seller", chunk_size=2, stdout=stdout, stderr=stderr)
+        return stderr.getvalue()
+
+    def test_csv_import_creates_items_and_categories(self):
+        errors = self.run_import("items.csv", (
+            "title,description,price,category,quantity_available,image\n"
+            "Guitar,Red,199.99,Music,2,guitar.jpg\n"
+            "Drum,,50,Music,0,guitar.jpg\n"
+            "Lamp,Brass,20,Home,1,guitar.jpg\n"
+            "Broken,,abc,Home,1,guitar.jpg\n"
+            "Missing,,5,Home,1,missing.jpg\n"
+            "Nan,,NaN,Home,1,guitar.jpg\n"
+            "Huge,,123456789,Home,1,guitar.jpg\n"
+        ))
+
+        self.assertIn("Row 5: invalid price 'abc'", errors)
+        self.assertIn("Row 6: can't read image missing.jpg", errors)
+        self.assertIn("Row 7: invalid price 'NaN'", errors)
+        self.assertIn("Row 8: price '123456789' is too large", errors)
+        self.assertEqual(sorted(Item.objects.values_list("title", flat=True)), ["Drum", "Guitar", "Lamp"])
+        self.assertEqual(Item.objects.get(title="Guitar").price, Decimal("199.99"))
+        self.music.refresh_from_db()
+        self.assertEqual(self.music.in_stock_item_count, 1)
+        self.assertEqual(Category.objects.get(name="Home").in_stock_item_count, 1)
+        self.assertTrue(Item.objects.get(title="Lamp").image.name.startswith("items/guitar"))
+
+    def test_jsonl_import(self):
+        errors = self.run_import("items.jsonl", (
+            '{"title": "Guitar", "price": 199.99, "category": "Music", "quantity_available": 3, "image": "guitar.jpg"}\n'
+            "\n"
+            "not json\n"
+        ))
+
+        self.assertIn("Row 3: invalid JSON", errors)
+        self.assertEqual(Item.objects.get().quantity_available, 3)
+
+    def test_bad_image_values_skip_their_rows(self):
+        outside = tempfile.NamedTemporaryFile(suffix=".jpg")
+        self.addCleanup(outside.close)
+        rows = [
+            {"title": "Url", "price": 5, "category": "Music", "image": "http://example.com/a b.jpg"},
+            {"title": "Nul", "price": 5, "category": "Music", "image": "guitar\u0000.jpg"},
+            {"title": "Absolute", "price": 5, "category": "Music", "image": outside.name},
+            {"title": "Parent", "price": 5, "category": "Music", "image": f"../{os.path.basename(outside.name)}"},
+            {"title": "Guitar", "price": 5, "category": "Music", "image": "guitar.jpg"},
+        ]
+        errors = self.run_import("items.jsonl", "".join(json.dumps(row) + "\n" for row in rows))
+
+        self.assertIn("Row 1: can't read image http://example.com/a b.jpg", errors)
+        self.assertIn("Row 2: can't read image guitar\x00.jpg (embedded null byte)", errors)
+        self.assertIn(f"Row 3: image {outside.name} is outside the image root", errors)
+        self.assertIn("Row 4: image ../", errors)
+        self.assertEqual(list(Item.objects.values_list("title", flat=True)), ["Guitar"])
+        self.assertEqual(len(os.listdir(f"{self.directory.name}/media/items")), 1)
+
+    def test_failed_chunk_removes_its_images(self):
+        with mock.patch.object(Item.objects, "bulk_create", side_effect=OperationalError("database is locked")):
+            with self.assertRaises(OperationalError):
+                self.run_import("items.csv", (
+                    "title,description,price,category,quantity_available,image\n"
+                    "Guitar,Red,199.99,Music,2,guitar.jpg\n"
+                ))
+
+        self.assertEqual(os.listdir(f"{self.directory.name}/media/items"), [])
+
+
+class OrderExportTests(TestCase):
+    """
+    Tests the streaming order line exports.
+    """
+    def setUp(self):
+        self.seller = User.objects.create(username="seller")
+        self.buyer = User.objects.create(username="buyer")
+        category = Category.objects.create(name="Music", description="")
+        self.guitar = create_item(self.seller, category, quantity_available=5, price="100.00", title="Guitar")
+        other = create_item(User.objects.create(username="other"), category, title="Drum")
+        self.order = create_cart(self.buyer, [(self.guitar, 2), (other, 1)])
+        self.order.checkout()
+        create_cart(self.buyer, [(self.guitar, 1)])
+
+    def test_seller_export_streams_only_their_shipped_lines(self):
+        self.client.force_login(self.seller)
+
+        response = self.client.get(reverse("sales_export"), {"format": "csv"})
+
+        self.assertTrue(response.streaming)
+        rows = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(rows[0], "order_id,order_date,status,buyer,item_id,item_title,quantity,unit_price,line_total")
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(rows[1].endswith(",shipped,buyer,%d,Guitar,2,100.00,200.00" % self.guitar.pk))
+
+    def test_command_exports_jsonl(self):
+        stdout = StringIO()
+        with self.assertNumQueries(1):
+            call_command("export_orders", format="jsonl", chunk_size=1, stdout=stdout)
+
+        lines = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual([line["item_title"] for line in lines], ["Guitar", "Drum"])
+        self.assertEqual(lines[0]["order_id"], self.order.pk)
+
+
+class LoadTestTests(LiveServerTestCase):
+    """
+    Runs a short loadtest against the live test server.
+    """
+    def test_journeys_reach_checkout(self):
+        seller = User.objects.create(username="seller")
+        category = Category.objects.create(name="Music", description="")
+        for n in range(3):
+            create_item(seller, category, quantity_available=10, title=f"Guitar {n}")
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = f"{directory}/results.json"
+            # One shopper: with in-memory SQLite the live server threads share a single connection.
+            call_command(
+                "loadtest", base_url=self.live_server_url, users=1, journeys=4, output=output, stdout=StringIO()
+            )
+            with open(output) as results_file:
+                results = json.load(results_file)
+
+        self.assertEqual(results["total"]["errors"], 0)
+        self.assertEqual(results["pages"]["checkout"]["requests"], 8)
+        self.assertEqual(Order.objects.filter(status="shipped").count(), 4)
+        self.assertLessEqual(results["pages"]["item_list"]["p50_ms"], results["pages"]["item_list"]["p99_ms"])
+
+
+class RequestInstrumentationTests(TestCase):
+    """
+    Tests the per-request query and timing instrumentation.
+    """
+    def setUp(self):
+        seller = User.objects.create(username="seller")
+        category = Category.objects.create(name="Music", description="")
+        self.items = [create_item(seller, category, title=f"Guitar {n}") for n in range(3)]
+
+    def test_logs_queries_and_sends_server_timing(self):
+        with self.settings(SERVER_TIMING_HEADER=True), self.assertLogs("finalproject.requests", "INFO") as logs:
+            response = self.client.get(reverse("item_detail", args=[self.items[0].pk]))
+
+        self.assertRegex(response["Server-Timing"], r'^db;desc="\d+ queries";dur=[\d.]+, tpl;dur=[\d.]+, total;dur=')
+        fields = logs.records[0].request_metrics
+        self.assertEqual((fields["url_name"], fields["status"]), ("item_detail", 200))
+        self.assertGreater(fields["queries"], 0)
+        self.assertGreater(fields["template_ms"], 0)
+
+    def test_streamed_export_is_logged_with_its_queries(self):
+        self.client.force_login(self.items[0].seller)
+        with self.assertLogs("finalproject.requests", "INFO") as logs:
+            response = self.client.get(reverse("sales_export"))
+            self.assertEqual(logs.records, [])
+            b"".join(response.streaming_content)
+
+        fields = logs.records[0].request_metrics
+        self.assertEqual(fields["url_name"], "sales_export")
+        self.assertGreater(fields["queries"], 0)
+
+    def test_async_streamed_body_is_logged_when_consumed(self):
+        async def rows():
+            yield b"a,"
+            yield b"b"
+
+        async def consume(response):
+            return b"".join([chunk async for chunk in response.streaming_content])
+
+        middleware = RequestInstrumentationMiddleware(lambda request: StreamingHttpResponse(rows()))
+        with self.assertLogs("finalproject.requests", "INFO") as logs:
+            response = middleware(RequestFactory().get("/rows/"))
+            self.assertEqual(logs.records, [])
+            self.assertEqual(async_to_sync(consume)(response), b"a,b")
+
+        self.assertEqual(logs.records[0].request_metrics["status"], 200)
+
+    def test_over_budget_request_logs_duplicate_queries_and_stack(self):
+        def list_sellers(request):
+            # An N+1 loop: one query per item for its seller.
+            names = [item.seller.username for item in Item.objects.all()]
+            return HttpResponse(", ".join(names))
+
+        request = RequestFactory().get("/sellers/")
+        with self.settings(QUERY_BUDGET=2), self.assertLogs("finalproject.requests", "INFO") as logs:
+            RequestInstrumentationMiddleware(list_sellers)(request)
+
+        fields = logs.records[0].request_metrics
+        self.assertEqual((fields["queries"], fields["duplicate_queries"]), (4, 2))
+        self.assertEqual(fields["duplicate_patterns"][0]["count"], 3)
+        warning = logs.records[1]
+        self.assertEqual(warning.levelname, "WARNING")
+        self.assertIn("ran 4 queries (budget 2)", warning.getMessage())
+        self.assertIn("list_sellers", warning.getMessage())
+
+
+class SeedMarketplaceTests(TestCase):
+    """
+    Tests the seed_marketplace synthetic data generator.
+    """
+    def seed(self, prefix):
+        call_command(
+            "seed_marketplace", users=20, categories=4, items=300, discounts=6, orders=80, seed=7, prefix=prefix,
+            chunk_size=1000, stdout=StringIO(),
+        )
+        return User.objects.filter(username__startswith=f"{prefix}-user-")
+
+    def test_same_seed_generates_same_data(self):
+        first_users = self.seed("first")
+        first_items = list(Item.objects.order_by("pk").values_list("title", "price", "quantity_available"))
+        second_users = self.seed("second")
+        second_items = list(Item.objects.order_by("pk").values_list("title", "price", "quantity_available"))
+
+        self.assertEqual(len(first_items), 300)
+        self.assertEqual(second_items[300:], first_items)
+        self.assertEqual(
+            list(OrderItem.objects.filter(order__buyer__in=first_users).order_by("pk").values_list("quantity")),
+            list(OrderItem.objects.filter(order__buyer__in=second_users).order_by("pk").values_list("quantity")),
+        )
+
+    def test_counters_and_totals_are_consistent(self):
+        users = self.seed("seed")
+
+        self.assertEqual(UserProfile.objects.filter(user__in=users).count(), 20)
+        for category in Category.objects.all():
+            self.assertEqual(
+                category.in_stock_item_count, category.item_set.filter(quantity_available__gt=0).count()
+            )
+        order = Order.objects.filter(discount=None).first()
+        seeded_subtotal = order.subtotal_amount
+        order.calculate_total()
+        self.assertEqual(order.subtotal_amount, seeded_subtotal)
+        self.assertEqual(order.total_amount, seeded_subtotal)
+
+
+class SessionStorageTests(TestCase):
+    """
+    Tests that the cart flow doesn't write the session table.
+    """
+    def setUp(self):
+        self.buyer = User.objects.create(username="buyer")
+        category = Category.objects.create(name="Music", description="")
+        self.item = create_item(User.objects.create(username="seller"), category, quantity_available=5)
+
+    def test_cart_flow_shows_messages_without_session_writes(self):
+        for engine in ("django.contrib.sessions.backends.db", "django.contrib.sessions.backends.cached_db"):
+            with self.subTest(engine=engine), self.settings(SESSION_ENGINE=engine):
+                self.client.force_login(self.buyer)
+                with CaptureQueriesContext(connection) as queries:
+                    response = self.client.post(
+                        reverse("add_to_cart", args=[self.item.pk]), {"quantity": 1}, follow=True
+                    )
+
+                self.assertContains(response, "Added 1 x Item to your cart.")
+                session_writes = [
+                    query["sql"] for query in queries
+                    if "django_session" in query["sql"] and not query["sql"].startswith("SELECT")
+                ]
+                self.assertEqual(session_writes, [])
+
+
+class CartViewTests(TestCase):
+    """
+    Tests the read-only cart page and the navbar cart summary.
+    """
+    def setUp(self):
+        self.buyer = User.objects.create(username="buyer")
+        category = Category.objects.create(name="Music", description="")
+        seller = User.objects.create(username="seller")
+        self.items = [create_item(seller, category, quantity_available=5, title=f"Guitar {n}") for n in range(3)]
+        self.client.force_login(self.buyer)
+        cache.clear()
+
+    def test_viewing_empty_cart_does_not_create_one(self):
+        response = self.client.get(reverse("view_cart"))
+
+        self.assertContains(response, "Your cart is empty.")
+        self.assertFalse(Order.objects.exists())
+
+    def test_cart_page_reads_cart_in_two_queries(self):
+        create_cart(self.buyer, [(item, 1) for item in self.items])
+        self.client.get(reverse("view_cart"))  # Caches the navbar summary.
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("view_cart"))
+
+        self.assertContains(response, "Guitar 2")
+        cart_queries = [query["sql"] for query in queries if "finalproject_" in query["sql"]]
+        self.assertEqual(len(cart_queries), 2, cart_queries)
+
+    def test_navbar_summary_is_cached_and_follows_cart_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("add_to_cart", args=[self.items[0].pk]), {"quantity": 2})
+        self.assertEqual(Order.cart_summary(self.buyer.pk), {"count": 2, "total": Decimal("20.00")})
+
+        with self.assertNumQueries(0):
+            Order.cart_summary(self.buyer.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("add_to_cart", args=[self.items[1].pk]), {"quantity": 1})
+        response = self.client.get(reverse("item_list"))
+
+        self.assertContains(response, '<span class="badge bg-primary">3</span>')
+        with self.captureOnCommitCallbacks(execute=True):
+            Order.get_cart(self.buyer).checkout()
+        self.assertEqual(Order.cart_summary(self.buyer.pk)["count"], 0)
+
+
+class CategoryCacheTests(TestCase):
+    """
+    Tests that category pages, the navbar and the item form read categories from the per-process cache.
+    """
+    def setUp(self):
+        cache.clear()
+        self.seller = User.objects.create(username="seller")
+        self.music = Category.objects.create(name="Music", description="")
+        self.books = Category.objects.create(name="Books", description="")
+        with self.captureOnCommitCallbacks(execute=True):
+            create_item(self.seller, self.music, title="Guitar")
+
+    def category_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [query["sql"] for query in queries if 'FROM "finalproject_category"' in query["sql"]]
+
+    def test_cached_categories_need_no_queries(self):
+        get_categories()
+
+        self.assertEqual(self.category_queries(reverse("category_list")), [])
+        self.assertEqual(self.category_queries(reverse("category_detail", args=[self.music.pk])), [])
+
+    def test_navbar_lists_in_stock_categories(self):
+        response = self.client.get(reverse("category_list"))
+
+        self.assertContains(response, reverse("category_detail", args=[self.music.pk]))
+        self.assertNotContains(response, reverse("category_detail", args=[self.books.pk]))
+
+    def test_changes_reload_the_cache(self):
+        get_categories()
+        self.music.refresh_from_db()
+        self.music.name = "Instruments"
+        self.music.save()
+
+        self.assertEqual(len(self.category_queries(reverse("category_list"))), 1)
+        self.assertEqual(get_categories()[self.music.pk].name, "Instruments")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_item(self.seller, self.books, title="Novel")
+        self.assertEqual([category.name for category in in_stock_categories()], ["Books", "Instruments"])
+
+    def test_missing_category_is_404(self):
+        response = self.client.get(reverse("category_detail", args=[self.books.pk + 100]))
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_item_form_choices_come_from_the_cache(self):
+        get_categories()
+
+        with self.assertNumQueries(0):
+            choices = [label for _, label in ItemForm().fields["category"].choices]
+        self.assertEqual(choices, ["---------", "Books", "Music"])
+
+
+class FacetTests(TestCase):
+    """
+    Tests the facet filters on the catalog listings and that their counts come from one cached query.
+    """
+    def setUp(self):
+        cache.clear()
+        seller = User.objects.create(username="seller")
+        self.music = Category.objects.create(name="Music", description="")
+        self.books = Category.objects.create(name="Books", description="")
+        create_item(seller, self.music, price="10.00", title="Harmonica")
+        create_item(seller, self.music, price="50.00", title="Guitar amp")
+        create_item(seller, self.music, price="900.00", quantity_available=0, title="Guitar")
+        create_item(seller, self.books, price="20.00", title="Guitar songbook")
+        old = create_item(seller, self.books, price="30.00", title="Old novel")
+        Item.objects.filter(pk=old.pk).update(date_listed=timezone.now() - timedelta(days=10))
+
+    def facet_counts(self, response):
+        return {
+            facet["name"]: {option["label"]: option["count"] for option in facet["options"]}
+            for facet in response.context["facets"]
+        }
+
+    def titles(self, response):
+        return sorted(item.title for item in response.context["items"])
+
+    def test_counts_use_one_cached_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("item_list"))
+        facet_queries = [query["sql"] for query in queries if "GROUP BY" in query["sql"]]
+        self.assertEqual(len(facet_queries), 1, facet_queries)
+        self.assertEqual(self.facet_counts(response), {
+            "category": {"Books": 2, "Music": 2},
+            "price": {"Under $25": 2, "$25 to $100": 2},
+            "listed": {"Past day": 3, "Past week": 3, "Past month": 4},
+            "availability": {"In stock": 4, "Include sold out": 5},
+        })
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(f"{reverse('item_list')}?category={self.books.pk}&price=25-100")
+        self.assertFalse([query["sql"] for query in queries if "GROUP BY" in query["sql"]])
+
+    def test_facets_filter_the_listing_and_each_other(self):
+        response = self.client.get(f"{reverse('item_list')}?category={self.music.pk}&availability=all")
+
+        self.assertEqual(self.titles(response), ["Guitar", "Guitar amp", "Harmonica"])
+        counts = self.facet_counts(response)
+        # A facet's own choice doesn't narrow its counts; the other facets' choices do.
+        self.assertEqual(counts["category"], {"Books": 2, "Music": 3})
+        self.assertEqual(counts["price"], {"Under $25": 1, "$25 to $100": 1, "$500 and up": 1})
+
+        response = self.client.get(f"{reverse('item_list')}?listed=7d&price=under-25")
+        self.assertEqual(self.titles(response), ["Guitar songbook", "Harmonica"])
+
+    def test_search_results_are_faceted(self):
+        response = self.client.get(f"{reverse('search')}?q=guitar&category={self.music.pk}")
+
+        self.assertEqual(self.titles(response), ["Guitar amp"])
+        self.assertEqual(self.facet_counts(response)["category"], {"Books": 1, "Music": 1})
+        category_links = response.context["facets"][0]["options"]
+        self.assertTrue(all("q=guitar" in option["querystring"] for option in category_links))
+
+    def test_relevance_ordered_search_keeps_numbered_pages(self):
+        with self.settings(CATALOG_CURSOR_PAGINATION=True):
+            response = self.client.get(f"{reverse('search')}?q=guitar&cursor=")
+            self.assertFalse(response.context["cursor_pagination"])
+            self.assertEqual(response.context["paginator"].count, 2)
+
+            response = self.client.get(f"{reverse('search')}?q=guitar&sort=price_asc")
+            self.assertTrue(response.context["cursor_pagination"])
+            self.assertEqual([item.title for item in response.context["items"]], ["Guitar songbook", "Guitar amp"])
+
+
+class SearchTests(TestCase):
+    """
+    Tests the full-text item search and the triggers that keep its index in sync with the item table.
+    """
+    def setUp(self):
+        self.seller = User.objects.create(username="seller")
+        self.music = Category.objects.create(name="Music", description="")
+
+    def search(self, query):
+        return [item.title for item in search_items(Item.objects.all(), query)]
+
+    def test_title_matches_rank_above_description_matches(self):
+        create_item(self.seller, self.music, title="Drum kit")
+        Item.objects.filter(title="Drum kit").update(description="Comes with a guitar strap")
+        create_item(self.seller, self.music, title="Red guitar")
+        create_item(self.seller, self.music, title="Lamp")
+
+        self.assertEqual(self.search("guitar"), ["Red guitar", "Drum kit"])
+
+    def test_tokens_match_as_prefixes(self):
+        create_item(self.seller, self.music, title="Vintage guitars")
+        create_item(self.seller, self.music, title="Guitar amp")
+
+        self.assertEqual(sorted(self.search("guit")), ["Guitar amp", "Vintage guitars"])
+        self.assertEqual(self.search("vint guit"), ["Vintage guitars"])
+        # Index query syntax in the input is treated as plain words.
+        self.assertEqual(self.search('amp" OR "lamp'), [])
+        self.assertEqual(len(self.search("")), 2)
+
+    def test_index_follows_inserts_updates_and_deletes(self):
+        item = create_item(self.seller, self.music, title="Banjo")
+        Item.objects.bulk_create([
+            Item(title="Ukulele", description="", price=Decimal("5.00"), seller=self.seller, category=self.music,
+                 quantity_available=1, image="items/item.jpg"),
+        ])
+        self.assertEqual(self.search("banjo"), ["Banjo"])
+        self.assertEqual(self.search("ukulele"), ["Ukulele"])
+
+        item.title = "Mandolin"
+        item.save()
+        self.assertEqual((self.search("banjo"), self.search("mandolin")), ([], ["Mandolin"]))
+
+        Item.objects.filter(title="Ukulele").update(description="Soprano")
+        Item.objects.filter(title="Ukulele").update(title="Harp")
+        self.assertEqual((self.search("ukulele"), self.search("harp soprano")), ([], ["Harp"]))
+        # Updates to other columns leave the index entry as it is.
+        Item.objects.filter(title="Harp").update(quantity_available=0)
+        self.assertEqual(self.search("harp"), ["Harp"])
+
+        item.delete()
+        Item.objects.filter(title="Harp").delete()
+        self.assertEqual((self.search("mandolin"), self.search("harp")), ([], []))
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT COUNT(*) FROM {FTS_TABLE}")
+                self.assertEqual(cursor.fetchone()[0], 0)
+
+
+class SearchSuggestTests(TestCase):
+    """
+    Tests the search suggestion endpoint and the in-memory index behind it.
+    """
+    def setUp(self):
+        cache.clear()
+        suggestions._suggestions = None
+        self.seller = User.objects.create(username="seller")
+        self.category = Category.objects.create(name="Music", description="")
+        self.guitar = create_item(self.seller, self.category, title="Vintage Guitar")
+        create_item(self.seller, self.category, title="Guitar strings")
+        create_item(self.seller, self.category, title="Guitar strings")
+        create_item(self.seller, self.category, quantity_available=0, title="Guitar case")
+
+    def suggest(self, query):
+        response = self.client.get(reverse("search_suggest"), {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return response.json()["suggestions"]
+
+    def test_completes_titles_and_words_without_queries(self):
+        self.assertEqual(self.suggest("gui"), ["Guitar strings", "Vintage Guitar"])
+
+        with self.assertNumQueries(0):
+            self.assertEqual(suggestions.suggest("vintage g"), ["Vintage Guitar"])
+            self.assertEqual(suggestions.suggest("str"), ["Guitar strings"])
+            self.assertEqual(suggestions.suggest("drum"), [])
+            self.assertEqual(suggestions.suggest("  "), [])
+
+    def test_follows_item_changes(self):
+        self.suggest("gui")
+
+        create_item(self.seller, self.category, title="Guitar amp")
+        self.guitar.quantity_available = 0
+        self.guitar.save()
+        self.assertEqual(self.suggest("gui"), ["Guitar amp", "Guitar strings"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Item.objects.filter(title="Guitar amp").delete()
+        self.assertEqual(self.suggest("gui"), ["Guitar strings"])
+
+    def test_syncs_read_only_new_changes_and_logged_deletions(self):
+        self.suggest("gui")
+        amp = create_item(self.seller, self.category, title="Guitar amp")
+        self.assertEqual(self.suggest("amp"), ["Guitar amp"])
+        # The watermark moved past the amp, so the next sync reads no rows.
+        bump_item_generation()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.suggest("amp"), ["Guitar amp"])
+        self.assertEqual(len(queries), 1)
+        self.assertIn('"updated_at" >', queries[0]["sql"])
+
+        # A deletion made by another process reaches this one through the shared log.
+        suggestions.record_deletion(amp.pk)
+        Item.objects.filter(pk=amp.pk).delete()
+        self.assertEqual(self.suggest("amp"), [])
+
+    def test_lost_deletions_reload_the_index_in_the_background(self):
+        self.suggest("gui")
+        loaded = suggestions._suggestions
+        # The deletion log restarted (say, the cache was flushed), so some deletions may have been missed.
+        cache.set(suggestions.DELETED_KEY, 0, timeout=None)
+        bump_item_generation()
+
+        with mock.patch.object(suggestions, "load", return_value=suggestions.Suggestions(
+            suggestions.PrefixIndex([(1, "Banjo")]), suggestions.get_item_generation(), None, 0
+        )):
+            # The lookup is answered from the old index while the new one loads.
+            self.assertEqual(self.suggest("gui"), ["Guitar strings", "Vintage Guitar"])
+            self.assertTrue(suggestions._load_lock.acquire(timeout=5))
+            suggestions._load_lock.release()
+        self.assertTrue(loaded.deletions_lost)
+        self.assertEqual(suggestions.suggest("ban"), ["Banjo"])
+
+
+class OrderItemSnapshotTests(TestCase):
+    """
+    Tests that order lines keep the price and title they were ordered at.
+    """
+    def setUp(self):
+        self.buyer = User.objects.create(username="buyer")
+        UserProfile.objects.create(user=self.buyer, address="1 Main St")
+        seller = User.objects.create(username="seller")
+        category = Category.objects.create(name="Music", description="")
+        self.guitar = create_item(seller, category, quantity_available=5, price="100.00", title="Guitar")
+
+    def test_placed_orders_keep_their_prices(self):
+        cart = Order.objects.create(buyer=self.buyer, status="cart")
+        cart.add_item(self.guitar, 2)
+        # A price change while the item sits in the cart stops the checkout and updates the cart for review.
+        self.guitar.price = Decimal("80.00")
+        self.guitar.save()
+        with self.assertRaisesMessage(ValueError, "Some prices in your cart have changed."):
+            cart.checkout()
+        cart.refresh_from_db()
+        self.assertEqual((cart.status, cart.total_amount), ("cart", Decimal("160.00")))
+        self.guitar.refresh_from_db()
+        self.assertEqual(self.guitar.quantity_available, 5)
+
+        cart.checkout()
+
+        self.guitar.price = Decimal("500.00")
+        self.guitar.title = "Renamed guitar"
+        self.guitar.save()
+        line = cart.orderitem_set.get()
+        self.assertEqual((line.unit_price, line.title, line.total_price()), (Decimal("80.00"), "Guitar", 160))
+        cart.calculate_total()
+        self.assertEqual(cart.total_amount, Decimal("160.00"))
+
+    def test_profile_renders_orders_without_reading_items(self):
+        order = create_cart(self.buyer, [(self.guitar, 1)])
+        order.checkout()
+        self.client.force_login(self.buyer)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("profile"))
+
+        self.assertContains(response, "Guitar (Quantity: 1) - $100.00")
+        order_queries = [query["sql"] for query in queries if "finalproject_orderitem" in query["sql"]]
+        self.assertTrue(order_queries)
+        self.assertFalse([sql for sql in order_queries if '"finalproject_item"' in sql])
+
+
+CSRF_TOKEN = re.compile(rb'name="csrfmiddlewaretoken" value="[^"]*"')
+
+
+class AsyncViewTests(TestCase):
+    """
+    Tests that the async catalog views render the same pages as their sync versions.
+    """
+    @classmethod
+    def setUpTestData(cls):
+        # A logged-in visitor, so pages are rendered rather than served from the anonymous page cache.
+        cls.user = User.objects.create(username="buyer")
+        seller = User.objects.create(username="seller")
+        cls.category = Category.objects.create(name="Music", description="")
+        cls.items = [
+            create_item(seller, cls.category, price=f"{n}.00", title=f"Guitar {n}") for n in range(1, 16)
+        ]
+
+    def get(self, view_class, path, params=None, **kwargs):
+        request = RequestFactory().get(path, params or {})
+        request.user = self.user
+        return view_class.as_view()(request, **kwargs)
+
+    async def test_async_views_render_the_same_pages(self):
+        cases = [
+            (views.ItemListView, views.AsyncItemListView, "/items/", {"page": "2"}, {}),
+            (views.ItemListView, views.AsyncItemListView, "/items/", {"cursor": "", "sort": "price_asc"}, {}),
+            (views.SearchView, views.AsyncSearchView, "/search/", {"q": "guitar"}, {}),
+            (views.ItemDetailView, views.AsyncItemDetailView, "/items/", None, {"pk": self.items[0].pk}),
+            (views.CategoryListView, views.AsyncCategoryListView, "/categories/", None, {}),
+            (views.CategoryDetailView, views.AsyncCategoryDetailView, "/categories/", {"sort": "price_desc"},
+             {"pk": self.category.pk}),
+        ]
+        for sync_view, async_view, path, params, kwargs in cases:
+            with self.subTest(view=async_view.__name__, params=params):
+                expected = await sync_to_async(
+                    lambda: self.get(sync_view, path, params, **kwargs).render().content
+                )()
+                response = await self.get(async_view, path, params, **kwargs)
+                await sync_to_async(response.render)()
+                # CSRF tokens are masked differently on every request.
+                self.assertEqual(CSRF_TOKEN.sub(b"", response.content), CSRF_TOKEN.sub(b"", expected))
+
+    async def test_missing_item_is_a_404(self):
+        with self.assertRaises(Http404):
+            await self.get(views.AsyncItemDetailView, "/items/", pk=0)
+
+    async def test_async_views_work_with_a_cold_category_cache(self):
+        cases = [
+            (views.AsyncItemListView, "/items/", None, {}),
+            (views.AsyncItemListView, "/items/", {"category": str(self.category.pk)}, {}),
+            (views.AsyncSearchView, "/search/", {"q": "guitar"}, {}),
+            (views.AsyncCategoryListView, "/categories/", None, {}),
+            (views.AsyncCategoryDetailView, "/categories/", None, {"pk": self.category.pk}),
+        ]
+        for async_view, path, params, kwargs in cases:
+            with self.subTest(view=async_view.__name__, params=params):
+                # A category change (or a fresh worker) leaves the per-process category cache to be reloaded.
+                await sync_to_async(bump_category_generation)()
+                response = await self.get(async_view, path, params, **kwargs)
+                await sync_to_async(response.render)()
+                # Every page shows the category, in the navbar menu at least.
+                self.assertContains(response, "Music")
@@ -0,0 +1,124 @@
+# File: thumbnails.py
+# Author: Crosby Nash (crosbyn@bu.edu), 10/18/2026
+# Description: Resized WebP/JPEG variants of item images for responsive srcsets. Variants are rendered in a
+# process pool so uploads don't hold up the request, then written to the default storage.
+import io
+import logging
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .caching import bump_item_generation
+from .models import Item
+
+logger = logging.getLogger(__name__)
+
+# Widths (in pixels) of the variants generated for every item image.
+THUMBNAIL_WIDTHS = (320, 640, 960)
+# Variant formats, by file extension, with the Pillow format name used to encode them.
+THUMBNAIL_FORMATS = {"webp": "WEBP", "jpg": "JPEG"}
+THUMBNAIL_QUALITY = 80
+THUMBNAIL_DIR = "thumbnails"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_name(image_name, width, extension):
+    """
+    Returns the storage name of one variant, e.g. items/guitar.jpg -> thumbnails/items/guitar-320w.webp.
+    """
+    stem = os.path.splitext(image_name)[0]
+    return f"{THUMBNAIL_DIR}/{stem}-{width}w.{extension}"
+
+
+def render_variants(image_name, data):
+    """
+    Decodes an original image and returns {variant name: encoded bytes} for every width and format.
+    Runs in a worker process, so it only takes and returns plain values.
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        # Applies the camera's EXIF rotation, which is lost once the image is re-encoded.
+        original = ImageOps.exif_transpose(original)
+        variants = {}
+        for width in THUMBNAIL_WIDTHS:
+            resized = original.copy()
+            # Never upscales; a small original is just re-encoded at its own size.
+            resized.thumbnail((width, width * 10), Image.LANCZOS)
+            for extension, image_format in THUMBNAIL_FORMATS.items():
+                mode = "RGBA" if image_format == "WEBP" and resized.mode in ("RGBA", "LA", "P") else "RGB"
+                buffer = io.BytesIO()
+                resized.convert(mode).save(buffer, image_format, quality=THUMBNAIL_QUALITY, optimize=True)
+                variants[variant_name(image_name, width, extension)] = buffer.getvalue()
+        return variants
+
+
+def save_variants(variants):
+    """
+    Writes rendered variants to the default storage, replacing older versions with the same name.
+    """
+    for name, data in variants.items():
+        if default_storage.exists(name):
+            default_storage.delete(name)
+        default_storage.save(name, ContentFile(data))
+
+
+def mark_thumbnails_ready(rendered):
+    """
+    Flags items as having variants and invalidates their cached cards and pages, which gain a srcset.
+    Takes (item id, image name) pairs; an item whose image has changed since it was rendered is left as is,
+    as part of the same UPDATE, so a new upload can't be flagged with the old image's variants.
+    """
+    condition = Q(pk__in=[])
+    for item_id, image_name in rendered:
+        condition |= Q(pk=item_id, image=image_name)
+    updated = Item.objects.filter(condition).update(
+        thumbnails_ready=True, card_version=F("card_version") + 1, updated_at=timezone.now()
+    )
+    if updated:
+        bump_item_generation()
+    return updated
+
+
+def get_executor():
+    """
+    Returns this process's thumbnail worker pool, starting it on first use.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=settings.THUMBNAIL_WORKERS)
+        return _executor
+
+
+def schedule_thumbnails(item):
+    """
+    Queues variant generation for an item's current image and returns without waiting for it.
+    The item is flagged as ready once the variants are stored, unless its image has changed again by then.
+    """
+    image_name = item.image.name
+    with item.image.open("rb") as image_file:
+        data = image_file.read()
+    future = get_executor().submit(render_variants, image_name, data)
+
+    def finish(future):
+        # Runs on a pool management thread, which needs its own database connection.
+        try:
+            save_variants(future.result())
+            mark_thumbnails_ready([(item.pk, image_name)])
+        except Exception:
+            # The item stays flagged as not ready, so generate_thumbnails picks it up again.
+            logger.exception("Generating thumbnails for item %s (%s) failed.", item.pk, image_name)
+        finally:
+            connection.close()
+
+    future.add_done_callback(finish)
+    return future
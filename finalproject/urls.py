@@ -1,11 +1,26 @@
 # File: urls.py
 # Author: Crosby Nash (crosbyn@bu.edu), 12/26/2024
 # Defines the URL patterns for the marketplace platform, mapping URLs to their corresponding views.
+from django.conf import settings
 from django.urls import path
 from . import views
 
+# The read-heavy catalog pages have async versions for ASGI deployments (see ASYNC_READ_VIEWS in settings).
+if settings.ASYNC_READ_VIEWS:
+    ItemListView = views.AsyncItemListView
+    ItemDetailView = views.AsyncItemDetailView
+    SearchView = views.AsyncSearchView
+    CategoryListView = views.AsyncCategoryListView
+    CategoryDetailView = views.AsyncCategoryDetailView
+else:
+    ItemListView = views.ItemListView
+    ItemDetailView = views.ItemDetailView
+    SearchView = views.SearchView
+    CategoryListView = views.CategoryListView
+    CategoryDetailView = views.CategoryDetailView
+
 urlpatterns = [
-    path('', views.ItemListView.as_view(), name='home'),
+    path('', ItemListView.as_view(), name='home'),
     
     # Authentication
     path('register/', views.RegisterView.as_view(), name='register'),
@@ -18,9 +33,9 @@ urlpatterns = [
     path('profile/change_password/', views.ChangePasswordView.as_view(), name='change_password'),
     
     # Items
-    path('items/', views.ItemListView.as_view(), name='item_list'),
+    path('items/', ItemListView.as_view(), name='item_list'),
     # '<int:pk>' is a path converter that captures the primary key (ID) of the item.
-    path('items/<int:pk>/', views.ItemDetailView.as_view(), name='item_detail'),
+    path('items/<int:pk>/', ItemDetailView.as_view(), name='item_detail'),
     path('items/create/', views.ItemCreateView.as_view(), name='item_create'),
     path('items/<int:pk>/update/', views.ItemUpdateView.as_view(), name='item_update'),
     path('items/<int:pk>/delete/', views.ItemDeleteView.as_view(), name='item_delete'),
@@ -31,11 +46,13 @@ urlpatterns = [
     path('cart/update/', views.UpdateCartView.as_view(), name='update_cart'),
     path('checkout/', views.CheckoutView.as_view(), name='checkout'),
     path('orders/', views.OrderHistoryView.as_view(), name='order_history'),
+    path('sales/export/', views.SalesExportView.as_view(), name='sales_export'),
     
     # Search
-    path('search/', views.SearchView.as_view(), name='search'),
+    path('search/', SearchView.as_view(), name='search'),
+    path('search/suggest/', views.SearchSuggestView.as_view(), name='search_suggest'),
     
     # Categories
-    path('categories/', views.CategoryListView.as_view(), name='category_list'),
-    path('categories/<int:pk>/', views.CategoryDetailView.as_view(), name='category_detail'),
+    path('categories/', CategoryListView.as_view(), name='category_list'),
+    path('categories/<int:pk>/', CategoryDetailView.as_view(), name='category_detail'),
 ]
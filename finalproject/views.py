@@ -3,17 +3,30 @@
 # Description: Django views for managing user authentication, item listings, 
 # shopping cart functionality, and user profiles in a marketplace platform.
 
+from decimal import Decimal
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.urls import reverse, reverse_lazy
 from django.views.generic import (
     CreateView, ListView, DetailView, UpdateView, DeleteView, TemplateView, View
 )
 from django.contrib.auth.views import LoginView, LogoutView, PasswordChangeView
 from django.shortcuts import get_object_or_404, redirect, render
+from django.http import Http404, JsonResponse
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib import messages
-from django.db.models import Q, Count
-from django.db import transaction
-from .models import Discount, Item, Category, Order, OrderItem, UserProfile
+from django.core.paginator import Paginator
+from django.db.models import DecimalField, F, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils.cache import patch_cache_control
+from .exports import EXPORT_FORMATS, export_response, order_lines
+from .facets import FacetedCatalogMixin
+from .category_cache import get_category, in_stock_categories
+from .models import Item, Category, Order, UserProfile
+from .page_cache import AnonymousPageCacheMixin
+from .pagination import SORT_ORDERINGS, CatalogPaginationMixin
+from .search import search_items, tokenize
+from .suggestions import suggest
 from .forms import (
     UserRegistrationForm,
     ItemForm,
@@ -63,21 +76,28 @@ class UserLogoutView(LogoutView):
     """
     template_name = "registration/logout.html"
 
-class ItemListView(ListView):
+class ItemListView(AnonymousPageCacheMixin, FacetedCatalogMixin, CatalogPaginationMixin, ListView):
     """
-    Displays a paginated list of available items for sale.
+    Displays a paginated list of available items for sale, narrowed by the selected facets.
     """
     template_name = "items/item_list.html"
     context_object_name = "items"
     paginate_by = 12
 
+    def get_facet_queryset(self):
+        """
+        The whole catalog; facets (including availability) narrow it down.
+        """
+        return Item.objects.all()
+
     def get_queryset(self):
         """
-        Retrieves items with available stock, ordered by the listing date.
+        Retrieves items matching the selected facets (items with available stock by default), ordered by the
+        listing date unless another sort is selected.
         """
-        return Item.objects.filter(quantity_available__gt=0).order_by("-date_listed")
+        return self.filter_facets(self.get_facet_queryset()).order_by(self.get_sort_ordering())
 
-class ItemDetailView(DetailView):
+class ItemDetailView(AnonymousPageCacheMixin, DetailView):
     """
     Displays detailed information about a specific item.
     """
@@ -161,13 +181,21 @@ class ItemDeleteView(LoginRequiredMixin, DeleteView):
         messages.success(request, "Item deleted successfully.")
         return super().delete(request, *args, **kwargs)
 
-class SearchView(ListView):
+class SearchView(FacetedCatalogMixin, CatalogPaginationMixin, ListView):
     """
-    Handles item search functionality based on user input.
+    Handles item search functionality based on user input, narrowed by the selected facets.
     """
     template_name = "search_results.html"
     context_object_name = "items"
     paginate_by = 12
+    # Broad queries can match most of the catalog, so their count may be capped and shown as an estimate.
+    count_estimate_limit = settings.SEARCH_COUNT_ESTIMATE_LIMIT
+
+    def get_facet_queryset(self):
+        """
+        Every item matching the search query, before facets (including availability) are applied.
+        """
+        return search_items(Item.objects.all(), self.request.GET.get("q", ""))
 
     def get_queryset(self):
         """
@@ -175,10 +203,26 @@ class SearchView(ListView):
         """
         # Retrieves the value of the 'q' parameter from the URL query string.
         query = self.request.GET.get("q", "")
-        # Filters items that match the search query in their title or description and have available stock.
-        return Item.objects.filter(
-            Q(title__icontains=query) | Q(description__icontains=query), quantity_available__gt=0
-        ).distinct()  # ensures duplicate results are not included.
+        # Looks the query up in the full-text index, restricted to the selected facets (items with
+        # available stock by default), with the most relevant matches first.
+        items = search_items(self.filter_facets(Item.objects.all()), query)
+        # An explicit sort choice replaces the relevance ordering.
+        if not self.ranks_by_relevance():
+            items = items.order_by(self.get_sort_ordering())
+        return items
+
+    def ranks_by_relevance(self):
+        """
+        Checks whether the results are ordered by relevance, i.e. there is a query and no explicit sort.
+        """
+        return bool(tokenize(self.request.GET.get("q", ""))) and self.request.GET.get("sort") not in SORT_ORDERINGS
+
+    def uses_cursor_pagination(self):
+        """
+        Keyset cursors seek on a stored sort field, which a relevance rank isn't, so relevance-ordered
+        results always use numbered pages.
+        """
+        return super().uses_cursor_pagination() and not self.ranks_by_relevance()
 
     def get_context_data(self, **kwargs):
         """
@@ -188,6 +232,20 @@ class SearchView(ListView):
         context["query"] = self.request.GET.get("q", "")
         return context
 
+class SearchSuggestView(View):
+    """
+    Returns title completions for the navbar search box as JSON.
+    """
+    def get(self, request, *args, **kwargs):
+        """
+        Looks the 'q' parameter up in the in-memory suggestion index.
+        """
+        query = request.GET.get("q", "")
+        response = JsonResponse({"query": query, "suggestions": suggest(query)})
+        # Lets the browser reuse completions when the same prefix is typed again shortly after.
+        patch_cache_control(response, public=True, max_age=30)
+        return response
+
 class AddToCartView(LoginRequiredMixin, View):
     """
     Handles adding items to the shopping cart for logged-in users.
@@ -211,23 +269,10 @@ class AddToCartView(LoginRequiredMixin, View):
                 )
                 return redirect("item_detail", item.pk)
 
-            # Ensures all database updates occur as a single unit.
-            # since modifications to the database are being made, this ensures that the changes will
-            # only happen if all operations run without any errors
-            with transaction.atomic():
-                # Finds an existing cart or creates a new one for the user.
-                order, _ = Order.objects.get_or_create(buyer=request.user, status="cart")
-                # Adds the item to the cart or updates its quantity if it already exists.
-                order_item, _ = OrderItem.objects.get_or_create(
-                    order=order, item=item, defaults={"quantity": 0}
-                )
-                # Update the quantity of item.
-                order_item.quantity += quantity
-                order_item.save()
-
-                # Update the total cost of the cart.
-                order.total_amount += item.price * quantity
-                order.save()
+            # Finds an existing cart or creates a new one for the user.
+            order, _ = Order.objects.get_or_create(buyer=request.user, status="cart")
+            # Adds the item to the cart (or increases its quantity) and updates the cart total in one transaction.
+            order.add_item(item, quantity)
 
             messages.success(request, f"Added {quantity} x {item.title} to your cart.")
             return redirect("view_cart")
@@ -246,10 +291,11 @@ class CartView(LoginRequiredMixin, TemplateView):
         Adds order and order item details to the context for rendering the cart.
         """
         context = super().get_context_data(**kwargs)
-        # Retrieves the user's current cart or creates a new one if it doesn't exist.
-        order, _ = Order.objects.get_or_create(buyer=self.request.user, status="cart")
-        order_items = OrderItem.objects.filter(order=order)
-        total = order.total_amount 
+        # Reads the cart without creating one, so viewing an empty cart never writes. Two queries at most:
+        # the order (with its discount) and its lines (with their items).
+        order = Order.get_cart(self.request.user)
+        order_items = list(order.orderitem_set.select_related("item")) if order else []
+        total = order.total_amount if order else Decimal("0.00")
 
         # Prepares forms for updating item quantities in the cart.
         update_forms = {
@@ -273,8 +319,11 @@ class UpdateCartView(LoginRequiredMixin, View):
         """
         Updates the cart based on user actions (e.g., changing quantities or applying discount codes).
         """
-        # Fetch the current cart or create one if it doesn't exist.
-        order, _ = Order.objects.get_or_create(buyer=request.user, status="cart")
+        # Carts only exist once something has been added; there is nothing to update without one.
+        order = Order.get_cart(request.user)
+        if order is None:
+            messages.error(request, "Your cart is empty.")
+            return redirect("view_cart")
 
         # Removes any applied discount from the cart.
         if request.POST.get("remove_discount"):
@@ -292,19 +341,23 @@ class UpdateCartView(LoginRequiredMixin, View):
                 messages.error(request, "An error occurred while removing the item.")
             return redirect("view_cart")
 
-        updated = False  # Tracks if any item quantities were updated.
-
-        # Process each form field in the POST data.
+        # Collects the requested quantity of each line from the form fields in the POST data.
+        quantities = {}
         for key, value in request.POST.items():
             if key.startswith("quantity_"):
-                order_item_id = key.split("_")[1]
                 try:
-                    quantity = int(value)
-                    order.update_quantity(order_item_id, quantity)  # Updates the item quantity.
-                    updated = True
+                    quantities[int(key.split("_")[1])] = int(value)
                 except ValueError as e:
                     messages.error(request, str(e))
 
+        updated = False  # Tracks if any item quantities were updated.
+        if quantities:
+            try:
+                # Checks and writes every line in one go, then updates the cart total once.
+                updated = order.update_quantities(quantities) > 0
+            except ValueError as e:
+                messages.error(request, str(e))
+
         # Apply a discount code if provided.
         if discount_code := request.POST.get("discount_code"):
             try:
@@ -314,7 +367,6 @@ class UpdateCartView(LoginRequiredMixin, View):
                 messages.error(request, str(e))
 
         if updated:
-            order.calculate_total()  # Recalculates the total cost after updates.
             messages.success(request, "Cart updated successfully.")
         return redirect("view_cart")
 
@@ -343,20 +395,12 @@ class CheckoutView(LoginRequiredMixin, TemplateView):
         Finalizes the checkout process and updates item stock quantities.
         """
         order = self.get_order()
-        with transaction.atomic():
-            # Marks the order as 'shipped'.
-            order.status = "shipped"
-            order.save()
-
-            for order_item in OrderItem.objects.filter(order=order):
-                item = order_item.item
-                # Ensures sufficient stock is available before reducing quantities.
-                if item.quantity_available >= order_item.quantity:
-                    item.quantity_available -= order_item.quantity
-                    item.save()
-                else:
-                    messages.error(request, f"Not enough stock for {item.title}.")
-                    return redirect("view_cart")
+        try:
+            # Marks the order as shipped and reduces stock in one all-or-nothing transaction.
+            order.checkout()
+        except ValueError as e:
+            messages.error(request, str(e))
+            return redirect("view_cart")
 
         messages.success(request, "Checkout successful! Your order has been placed.")
         return redirect("profile")
@@ -375,42 +419,63 @@ class OrderHistoryView(LoginRequiredMixin, ListView):
         # Excludes the "cart" status because those are incomplete orders.
         return Order.objects.filter(buyer=self.request.user).exclude(status="cart").order_by("-order_date")
 
+class SalesExportView(LoginRequiredMixin, View):
+    """
+    Downloads the logged-in seller's sold order lines as CSV or JSON Lines (?format=csv|jsonl).
+    """
+    def get(self, request):
+        """
+        Streams the export, so sellers with a long sales history don't tie up the worker.
+        """
+        export_format = request.GET.get("format", "csv")
+        if export_format not in EXPORT_FORMATS:
+            raise Http404("Unknown export format.")
+        return export_response(order_lines(seller=request.user), export_format, "sales")
+
 class ProfileView(LoginRequiredMixin, TemplateView):
     """
     Displays the user's profile, including personal information, items for sale, and purchase history.
+    Both lists are paginated, and the page is built from a fixed number of queries however many orders the user has.
     """
     template_name = "profile.html"
+    items_per_page = 10
+    orders_per_page = 10
 
     def get_context_data(self, **kwargs):
         """
-        Adds user details, items for sale, and order history to the context.
+        Adds user details, a page of items for sale, and a page of order history to the context.
         """
         context = super().get_context_data(**kwargs)
         user = self.request.user  # Retrieves the currently logged-in user.
         user_profile = get_object_or_404(UserProfile, user=user)
-        items_for_sale = Item.objects.filter(seller=user)
-        # Retrieves past orders for the user (excluding the cart).
-        purchase_orders = Order.objects.filter(buyer=user).exclude(status="cart").order_by("-order_date")
-
-        # Adds order totals for each order, including discounts.
-        orders_with_totals = []
-        for order in purchase_orders:
-            order_items = OrderItem.objects.filter(order=order)
-            total_without_discount = sum(order_item.item.price * order_item.quantity for order_item in order_items)
-            orders_with_totals.append({
-                "order": order,
-                "total_without_discount": total_without_discount,
-                "discount": order.discount,
-                "discount_amount": order.discount_amount,
-                "final_total": order.total_amount
-            })
+        items_for_sale = Paginator(
+            Item.objects.filter(seller=user).order_by("-date_listed"), self.items_per_page
+        ).get_page(self.request.GET.get("items_page"))
+
+        # Retrieves past orders for the user (excluding the cart). The pre-discount total is summed by the
+        # database, and the line items of the orders on this page are fetched in a single extra query; their
+        # price and title snapshots mean the items themselves aren't read.
+        purchase_orders = (
+            Order.objects.filter(buyer=user).exclude(status="cart")
+            .select_related("discount")
+            .annotate(total_without_discount=Coalesce(
+                Sum(F("orderitem__unit_price") * F("orderitem__quantity")),
+                Value(Decimal("0.00")),
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            ))
+            .prefetch_related("orderitem_set")
+            .order_by("-order_date", "-id")
+        )
+        purchase_orders = Paginator(purchase_orders, self.orders_per_page).get_page(
+            self.request.GET.get("orders_page")
+        )
 
         # Updates the context with all required data.
         context.update({
             "user": user,
             "user_profile": user_profile,
             "items_for_sale": items_for_sale,
-            "purchase_orders": orders_with_totals,
+            "purchase_orders": purchase_orders,
         })
         return context
 
@@ -471,7 +536,7 @@ class ChangePasswordView(PasswordChangeView):
         messages.error(self.request, "Please correct the errors below.")
         return super().form_invalid(form)
 
-class CategoryListView(ListView):
+class CategoryListView(AnonymousPageCacheMixin, ListView):
     """
     Displays a list of categories with the count of in-stock items in each category.
     """
@@ -482,40 +547,115 @@ class CategoryListView(ListView):
         """
         Retrieves categories that have at least one item in stock, sorted alphabetically.
         """
-        # 'annotate' adds in-stock item count field to the query
-        return Category.objects.annotate(
-            in_stock_item_count=Count("item", filter=Q(item__quantity_available__gt=0))
-        ).filter(in_stock_item_count__gt=0).order_by("name")
+        # Served from this process's category cache, with the maintained in-stock counters.
+        return in_stock_categories()
 
-class CategoryDetailView(DetailView):
+class CategoryDetailView(AnonymousPageCacheMixin, CatalogPaginationMixin, DetailView):
     """
-    Displays detailed information about a specific category and its items.
+    Displays detailed information about a specific category and a paginated list of its items.
     """
     template_name = "categories/category_detail.html"
     model = Category
     context_object_name = "category"
 
+    def get_object(self, queryset=None):
+        """
+        Returns the category from this process's category cache.
+        """
+        category = get_category(self.kwargs["pk"])
+        if category is None:
+            raise Http404("No category found matching the query.")
+        return category
+
+    def get_items(self):
+        """
+        Returns the items in the current category with available stock, sorted by the chosen option
+        (newest first by default).
+        """
+        return Item.objects.filter(category=self.object, quantity_available__gt=0).order_by(self.get_sort_ordering())
+
     def get_context_data(self, **kwargs):
         """
-        Adds a list of items in the category to the context, sorted based on user selection.
+        Adds a page of items in the category to the context, sorted based on user selection.
         """
         context = super().get_context_data(**kwargs)
-        # Retrieves the sorting option chosen by the user (if any).
-        sort_option = self.request.GET.get("sort", "")
-        # Filters items in the current category with available stock.
-        items = Item.objects.filter(category=self.object, quantity_available__gt=0)
-
-        # Sorts the items based on the selected option.
-        if sort_option == "price_asc":
-            items = items.order_by("price")
-        elif sort_option == "price_desc":
-            items = items.order_by("-price")
-        elif sort_option == "date_new":
-            items = items.order_by("-date_listed")
-        elif sort_option == "date_old":
-            items = items.order_by("date_listed")
-        else:
-            items = items.order_by("-date_listed")  # Default sorting by newest first.
+        # Uses the page an async view has already fetched, if any.
+        page = self.current_page if self.current_page is not None else self.paginate_items(self.get_items())
+
+        context.update({
+            "items": page.object_list,
+            "page_obj": page,
+            "is_paginated": page.has_other_pages(),
+        })
+        return context
 
-        context["items"] = items
-        return context
\ No newline at end of file
+
+# Async read views
+# Served in place of the sync views above when ASYNC_READ_VIEWS is set and the site runs under ASGI
+# (see ecommerce/gunicorn.conf.py). They read through the async ORM, so one worker keeps serving other
+# requests while a request waits on the database. Templates still render in a worker thread.
+
+class AsyncItemListView(ItemListView):
+    """
+    Async version of ItemListView.
+    """
+    async def get(self, request, *args, **kwargs):
+        """
+        Fetches the facet counts and the requested page of items, then renders them.
+        """
+        # Resolving the selected facets may reload the category cache, so it can't run on the event loop.
+        await sync_to_async(self.load_facets)()
+        self.object_list = self.get_queryset()
+        self.current_page = await self.apaginate_items(self.object_list)
+        return self.render_to_response(self.get_context_data())
+
+class AsyncSearchView(SearchView):
+    """
+    Async version of SearchView.
+    """
+    async def get(self, request, *args, **kwargs):
+        """
+        Fetches the facet counts and the requested page of search results, then renders them.
+        """
+        # Resolving the selected facets may reload the category cache, so it can't run on the event loop.
+        await sync_to_async(self.load_facets)()
+        self.object_list = self.get_queryset()
+        self.current_page = await self.apaginate_items(self.object_list)
+        return self.render_to_response(self.get_context_data())
+
+class AsyncItemDetailView(ItemDetailView):
+    """
+    Async version of ItemDetailView.
+    """
+    async def get(self, request, *args, **kwargs):
+        """
+        Fetches the item with its category and seller (both shown on the page), then renders it.
+        """
+        try:
+            self.object = await self.get_queryset().select_related("category", "seller").aget(pk=kwargs["pk"])
+        except Item.DoesNotExist:
+            raise Http404("No item found matching the query.")
+        return self.render_to_response(self.get_context_data(object=self.object))
+
+class AsyncCategoryListView(CategoryListView):
+    """
+    Async version of CategoryListView.
+    """
+    async def get(self, request, *args, **kwargs):
+        """
+        Fetches the categories with items in stock, then renders them.
+        """
+        self.object_list = await sync_to_async(self.get_queryset)()
+        return self.render_to_response(self.get_context_data())
+
+class AsyncCategoryDetailView(CategoryDetailView):
+    """
+    Async version of CategoryDetailView.
+    """
+    async def get(self, request, *args, **kwargs):
+        """
+        Fetches the category and the requested page of its items, then renders them.
+        """
+        self.object = await sync_to_async(self.get_object)()
+        self.current_page = await self.apaginate_items(self.get_items())
+        return self.render_to_response(self.get_context_data(object=self.object))